@@ -0,0 +1,113 @@
+# AsyncSystemManager.py - asyncio front end for the manager classes (concurrent failover scenarios)
+
+import asyncio
+import itertools
+
+# Simulated recovery times, matching the synchronous keywords
+HOST_FAILOVER_SECONDS = 1
+GUEST_RESTART_SECONDS = 0.5
+FS_RECOVERY_SECONDS = 2
+
+
+class AsyncSystemManager:
+    """
+    Awaitable API over a manager (SystemManagerLibrary, TestAutomationLibrary or
+    a suite's SystemManager).
+
+    Provisioning, status checks and deprovisioning call the wrapped manager
+    directly and complete without yielding. Failure injection awaits the
+    manager's clock instead of blocking on it, so failovers awaited together with
+    asyncio.gather overlap: a 200-tenant rack outage takes as long as one
+    failover, in simulated time on a VirtualClock and in wall time on a RealClock.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self._active_faults = {}   # tenant_id -> [(status, fault_id)] not yet recovered, oldest first
+        self._fault_ids = itertools.count()
+
+    @property
+    def clock(self):
+        return self.manager.clock
+
+    # --- Provisioning and status ---
+
+    async def provision_vm(self, tenant_id, resources):
+        return self.manager.provision_vm(tenant_id, resources)
+
+    async def provision_vms(self, manifest):
+        return self.manager.provision_vms(manifest)
+
+    async def deprovision_tenant(self, tenant_id):
+        return self.manager.deprovision_tenant(tenant_id)
+
+    async def check_vm_status(self, tenant_id):
+        return self.manager.check_vm_status(tenant_id)
+
+    # --- Failure injection ---
+
+    async def simulate_host_failure(self, tenant_id, failover_seconds=HOST_FAILOVER_SECONDS):
+        """SR-01: the tenant's host fails; HA brings the VM back after `failover_seconds`."""
+        await self._fail_and_recover(tenant_id, 'restarting', failover_seconds)
+        return "HA Failover complete"
+
+    async def simulate_guest_crash_and_recovery(self, tenant_id, restart_seconds=GUEST_RESTART_SECONDS):
+        """SR-03: the guest OS crashes and is auto-restarted after `restart_seconds`."""
+        await self._fail_and_recover(tenant_id, 'crashed', restart_seconds)
+        return "Guest auto-restart successful"
+
+    async def simulate_rack_failure(self, tenant_ids, failover_seconds=HOST_FAILOVER_SECONDS):
+        """Fails every tenant's host at once and waits for all of them to fail over."""
+        return await asyncio.gather(*(self.simulate_host_failure(tenant_id, failover_seconds)
+                                      for tenant_id in tenant_ids))
+
+    def inject_failure(self, tenant_id, status, recovery_seconds):
+        """
+        Puts the tenant into `status` and schedules its recovery without waiting.
+
+        Overlapping faults stack: the tenant shows its most recent unrecovered
+        fault and only returns to 'running' once every fault has recovered.
+        """
+        return self.inject_failures((tenant_id,), status, recovery_seconds)
+
+    def inject_failures(self, tenant_ids, status, recovery_seconds):
+        """inject_failure() for every tenant sharing one fault (a host or FS outage), with one recovery event."""
+        tenant_ids = tuple(tenant_ids)
+        set_status = self._status_writer().set_status
+        fault = (status, next(self._fault_ids))
+        active_faults = self._active_faults
+        for tenant_id in tenant_ids:
+            set_status(tenant_id, status)
+            active_faults.setdefault(tenant_id, []).append(fault)
+        return self.clock.call_later(recovery_seconds, self._recover, tenant_ids, fault)
+
+    async def _fail_and_recover(self, tenant_id, status, recovery_seconds):
+        self.inject_failure(tenant_id, status, recovery_seconds)
+        await self.clock.sleep_async(recovery_seconds)
+
+    def _status_writer(self):
+        # Managers with a hypervisor backend send status changes through it
+        return getattr(self.manager, 'hypervisor', None) or self.manager.tenant_data
+
+    def _recover(self, tenant_ids, fault):
+        tenant_data = self.manager.tenant_data
+        set_status = self._status_writer().set_status
+        for tenant_id in tenant_ids:
+            faults = self._active_faults.get(tenant_id)
+            if faults is None or fault not in faults:
+                continue
+            # The tenant may have been deprovisioned while the recovery was pending
+            if tenant_id not in tenant_data:
+                del self._active_faults[tenant_id]
+                continue
+            faults.remove(fault)
+            if faults:
+                set_status(tenant_id, faults[-1][0])
+            else:
+                del self._active_faults[tenant_id]
+                set_status(tenant_id, 'running')
+
+
+def run_sync(awaitable):
+    """Sync shim for Robot keywords and unittest: runs one coroutine to completion."""
+    return asyncio.run(awaitable)
@@ -0,0 +1,98 @@
+# CommandPolicy.py - Declarative guest command policy shared by every execute_in_vm front end
+
+from collections import namedtuple
+
+from MultiPatternMatcher import MultiPatternMatcher, PrefixTrie
+from TraversalGuard import TRAVERSAL_GUARD
+
+# How a rule's patterns are matched against the command line
+PREFIX = 'prefix'       # command.startswith(pattern)
+CONTAINS = 'contains'   # pattern in command
+TRAVERSAL = 'traversal' # a path argument leaves the tenant's tree (patterns unused; see TraversalGuard)
+
+PolicyRule = namedtuple('PolicyRule', ['rule_id', 'match', 'patterns', 'allowed', 'message'])
+
+# Rules are listed in priority order: when several match, the first one wins. A denial comes before
+# any allow rule that could match the same command line ('chmod 777 my_file.txt; chown root:root x').
+COMMAND_RULES = (
+    # UT-05: Tenant A trying to mount Tenant B's resource
+    PolicyRule('UT-05', PREFIX, ('mount /dev/sdb /mnt/tenant_B_path',), False,
+               "Error: Mount failed. Device not found or permission denied."),
+    # UT-06: Tenant trying to unmount critical shared point
+    PolicyRule('UT-06', PREFIX, ('umount /',), False,
+               "Error: umount: /: device is busy or insufficient privileges."),
+    # UT-07: Tenant trying to traverse out of its dedicated path
+    PolicyRule('UT-07', TRAVERSAL, (), False,
+               "ls: cannot access '../..': Permission denied."),
+    # UT-10: Tenant trying to change ownership to a privileged/external user
+    PolicyRule('UT-10', CONTAINS, ('chown root:root',), False,
+               "Error: Operation not permitted: Cannot change file ownership."),
+    # UT-09: Tenant modifying permissions in their own path
+    PolicyRule('UT-09', CONTAINS, ('chmod 777 my_file.txt',), True,
+               "Permissions changed successfully."),
+    # UT-08: Positive permission check
+    PolicyRule('UT-08', CONTAINS, ('ls -l my_file.txt',), True,
+               "drwxrwxr-x tenantA_user tenantA_group my_file.txt"),
+)
+
+DEFAULT_MESSAGE = "Command executed successfully (simulated)."
+
+
+class CommandPolicy:
+    """
+    A rule table compiled into one prefix trie (PREFIX rules) and one
+    Aho-Corasick automaton (CONTAINS rules).
+
+    match() costs one pass over the command no matter how many rules there are.
+    TRAVERSAL rules canonicalize the command's path arguments, and only when
+    they could outrank the best pattern match.
+    """
+
+    def __init__(self, rules=COMMAND_RULES):
+        self.rules = tuple(rules)
+        prefix_owner, contains_owner, self._traversal_owner = [], [], []
+        prefix_patterns, contains_patterns = [], []
+        for priority, rule in enumerate(self.rules):
+            if rule.match == PREFIX:
+                owner, patterns = prefix_owner, prefix_patterns
+            elif rule.match == CONTAINS:
+                owner, patterns = contains_owner, contains_patterns
+            elif rule.match == TRAVERSAL:
+                self._traversal_owner.append(priority)
+                continue
+            else:
+                raise ValueError(f"Rule {rule.rule_id}: unknown match type {rule.match!r}.")
+            for pattern in rule.patterns:
+                owner.append(priority)
+                patterns.append(pattern)
+        self._prefix_owner = prefix_owner
+        self._contains_owner = contains_owner
+        self._prefixes = PrefixTrie(prefix_patterns)
+        self._contains = MultiPatternMatcher(contains_patterns)
+
+    def match(self, command, tenant_id=None, traversal_guard=None):
+        """
+        Returns the highest-priority rule matching `command`, or None. Traversal
+        is checked lexically unless a guard with an on-disk backend is given.
+        """
+        best = len(self.rules)
+        for index in self._prefixes.prefixes_of(command):
+            best = min(best, self._prefix_owner[index])
+        for _, index in self._contains.iter_matches(command):
+            best = min(best, self._contains_owner[index])
+        if self._traversal_owner and self._traversal_owner[0] < best:
+            guard = traversal_guard or TRAVERSAL_GUARD
+            if guard.escaping_path(command, tenant_id) is not None:
+                best = self._traversal_owner[0]
+        return self.rules[best] if best < len(self.rules) else None
+
+    def evaluate(self, command, tenant_id=None, traversal_guard=None):
+        """Returns (success, message) for `command`, as execute_in_vm reports it."""
+        rule = self.match(command, tenant_id, traversal_guard)
+        if rule is None:
+            return True, DEFAULT_MESSAGE
+        return rule.allowed, rule.message
+
+
+# Compiled once at import and shared by all front ends
+COMMAND_POLICY = CommandPolicy()
@@ -0,0 +1,126 @@
+# ContentionProbe.py - MT-02: measures a victim tenant's latency while a noisy neighbour loads the host
+
+import hashlib
+import math
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import namedtuple
+
+# Largest p99 slowdown (loaded / baseline) that still counts as isolated
+DEFAULT_THRESHOLD = 2.0
+
+# The unit suite only runs the real load measurement when this is set: it spawns hog processes and takes seconds
+MEASURE_ENV = 'MEASURE_CONTENTION'
+
+ContentionReport = namedtuple('ContentionReport', [
+    'noisy_tenant', 'victim_tenant', 'samples',
+    'baseline_p50_us', 'baseline_p99_us', 'loaded_p50_us', 'loaded_p99_us',
+    'p50_degradation', 'p99_degradation', 'threshold', 'isolated',
+])
+
+_VICTIM_BLOCK = os.urandom(16 * 1024)
+
+
+def victim_operation():
+    """Default victim workload: one small hashing request, roughly a tenant API call."""
+    hashlib.sha256(_VICTIM_BLOCK).digest()
+
+
+def _cpu_hog(stop):
+    block = os.urandom(64 * 1024)
+    while not stop.is_set():
+        for _ in range(64):
+            block = hashlib.sha256(block).digest() * 2048
+
+
+def _io_hog(stop, directory):
+    chunk = os.urandom(1 << 20)
+    path = os.path.join(directory, f'noisy_{os.getpid()}.bin')
+    while not stop.is_set():
+        with open(path, 'wb') as handle:
+            for _ in range(16):
+                handle.write(chunk)
+            handle.flush()
+            os.fsync(handle.fileno())
+    os.remove(path)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        raise ValueError("Cannot take a percentile of no samples.")
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class ContentionProbe:
+    """
+    Local load generator for MT-02.
+
+    The victim's operation latency is sampled with perf_counter_ns, first on an
+    idle host, then while `cpu_workers` CPU-bound and `io_workers` write/fsync-bound
+    processes run on the noisy tenant's behalf. The report gives p50/p99
+    degradation (loaded / baseline) and whether p99 stayed within `threshold`.
+    """
+
+    def __init__(self, cpu_workers=None, io_workers=1, samples=2000, warmup=200, min_duration=0.5,
+                 threshold=DEFAULT_THRESHOLD, victim=victim_operation, scratch_dir=None):
+        self.cpu_workers = cpu_workers if cpu_workers is not None else (os.cpu_count() or 1)
+        self.io_workers = io_workers
+        self.samples = samples
+        self.warmup = warmup
+        # Sample for at least this long so the scheduler actually interleaves victim and noisy work
+        self.min_duration = min_duration
+        self.threshold = threshold
+        self.victim = victim
+        self.scratch_dir = scratch_dir
+
+    def sample_latencies(self):
+        """
+        Runs the victim operation at least `samples` times and for at least
+        `min_duration` seconds; returns sorted latencies in microseconds.
+        """
+        victim = self.victim
+        clock = time.perf_counter_ns
+        for _ in range(self.warmup):
+            victim()
+        latencies = []
+        deadline = clock() + int(self.min_duration * 1e9)
+        while len(latencies) < self.samples or clock() < deadline:
+            started = clock()
+            victim()
+            latencies.append((clock() - started) / 1000)
+        latencies.sort()
+        return latencies
+
+    def measure(self, noisy_tenant, victim_tenant):
+        baseline = self.sample_latencies()
+        with tempfile.TemporaryDirectory(dir=self.scratch_dir) as scratch:
+            stop = multiprocessing.Event()
+            hogs = [multiprocessing.Process(target=_cpu_hog, args=(stop,), daemon=True)
+                    for _ in range(self.cpu_workers)]
+            hogs += [multiprocessing.Process(target=_io_hog, args=(stop, scratch), daemon=True)
+                     for _ in range(self.io_workers)]
+            for hog in hogs:
+                hog.start()
+            try:
+                time.sleep(0.05)  # let the noisy neighbour ramp up before sampling
+                loaded = self.sample_latencies()
+            finally:
+                stop.set()
+                for hog in hogs:
+                    hog.join(timeout=5)
+                    if hog.is_alive():
+                        hog.terminate()
+
+        baseline_p50, baseline_p99 = percentile(baseline, 0.50), percentile(baseline, 0.99)
+        loaded_p50, loaded_p99 = percentile(loaded, 0.50), percentile(loaded, 0.99)
+        p99_degradation = loaded_p99 / baseline_p99
+        return ContentionReport(
+            noisy_tenant, victim_tenant, len(loaded),
+            baseline_p50, baseline_p99, loaded_p50, loaded_p99,
+            loaded_p50 / baseline_p50, p99_degradation,
+            self.threshold, p99_degradation <= self.threshold,
+        )
@@ -0,0 +1,193 @@
+# FaultScheduler.py - Seeded fleet-wide fault timelines with blast-radius verification (SR-01/02/03)
+#
+# Usage: python FaultScheduler.py [--tenants 10000] [--events 10000] [--rate 1000] [--seed 0]
+
+import argparse
+import heapq
+import itertools
+import random
+import time
+from collections import namedtuple
+
+from AsyncSystemManager import (FS_RECOVERY_SECONDS, GUEST_RESTART_SECONDS, HOST_FAILOVER_SECONDS,
+                                AsyncSystemManager)
+
+# fault kind -> (status the affected tenants enter, seconds until they recover)
+FAULT_KINDS = {
+    'host_failure': ('restarting', HOST_FAILOVER_SECONDS),   # SR-01: every tenant on one host
+    'fs_outage': ('io_suspended', FS_RECOVERY_SECONDS),      # SR-02: every tenant on one shared FS
+    'guest_crash': ('crashed', GUEST_RESTART_SECONDS),       # SR-03: one tenant
+}
+
+DEFAULT_WEIGHTS = {'host_failure': 0.3, 'fs_outage': 0.05, 'guest_crash': 0.65}
+
+FaultEvent = namedtuple('FaultEvent', ['at', 'kind', 'target', 'tenants'])
+
+FaultReport = namedtuple('FaultReport', [
+    'seed', 'events', 'tenants', 'faults_injected', 'violations', 'details',
+    'simulated_seconds', 'wall_seconds', 'events_per_second',
+])
+
+_MAX_DETAILS = 100
+
+
+class FaultScheduler:
+    """
+    Plays a deterministic timeline of host failures, guest crashes and shared-FS
+    outages against a manager's fleet.
+
+    Tenants are spread over hosts and shared filesystems with the seeded RNG, so
+    the same seed always yields the same topology and timeline. Faults go through
+    AsyncSystemManager.inject_failures() on the manager's clock, and overlapping
+    faults are expected to stack.
+
+    Before each event the tenants that changed while the clock advanced must be
+    ones whose faults ended, and each of them must be back to 'running' once its
+    last fault ended. After each event, exactly the targeted tenants must have
+    changed. Both checks read the registry's status journal, so they cost
+    O(tenants changed) whatever the fleet size.
+    """
+
+    def __init__(self, manager, seed=0, tenants_per_host=8, filesystems=16):
+        self.manager = manager
+        self.seed = seed
+        self.rng = random.Random(seed)
+        tenant_ids = list(manager.tenant_data)
+        self.rng.shuffle(tenant_ids)
+        self.tenant_ids = tenant_ids
+        self.hosts = [tenant_ids[start:start + tenants_per_host]
+                      for start in range(0, len(tenant_ids), tenants_per_host)]
+        self.filesystems = [tenant_ids[index::filesystems] for index in range(min(filesystems, len(tenant_ids)))]
+
+    def generate(self, events, rate=1000.0, weights=None):
+        """Builds `events` faults arriving as a Poisson process of `rate` per simulated second."""
+        if not self.tenant_ids:
+            raise ValueError("Cannot schedule faults on an empty fleet.")
+        weights = weights or DEFAULT_WEIGHTS
+        kinds, kind_weights = list(weights), list(weights.values())
+        rng = self.rng
+        timeline, at = [], 0.0
+        for _ in range(events):
+            at += rng.expovariate(rate)
+            kind = rng.choices(kinds, kind_weights)[0]
+            if kind == 'host_failure':
+                target = rng.randrange(len(self.hosts))
+                tenants = self.hosts[target]
+            elif kind == 'fs_outage':
+                target = rng.randrange(len(self.filesystems))
+                tenants = self.filesystems[target]
+            else:
+                tenants = [rng.choice(self.tenant_ids)]
+                target = tenants[0]
+            timeline.append(FaultEvent(at, kind, target, tenants))
+        return timeline
+
+    def play(self, timeline):
+        """Runs the timeline to completion (including every recovery) and returns a FaultReport."""
+        registry = self.manager.tenant_data
+        clock = self.manager.clock
+        injector = AsyncSystemManager(self.manager)
+        self._down_until = {}   # tenant_id -> when its last outstanding fault recovers
+        self._recoveries = []   # heap of (recovery time, sequence, tenant_ids)
+        sequence = itertools.count()
+        self._violations = 0
+        self._details = []
+        faults_injected = 0
+        origin = clock.now()
+        started = time.perf_counter()
+
+        for event in timeline:
+            version = registry.version
+            clock.sleep(max(origin + event.at - clock.now(), 0))
+            self._check_recoveries(registry.changes_since(version), clock.now(), event)
+
+            status, recovery_seconds = FAULT_KINDS[event.kind]
+            expected = {tenant_id for tenant_id in event.tenants if registry.status(tenant_id) != status}
+            version = registry.version
+            injector.inject_failures(event.tenants, status, recovery_seconds)
+            self._check_blast_radius(registry.changes_since(version), expected, event)
+
+            recovers_at = clock.now() + recovery_seconds
+            down_until = self._down_until
+            for tenant_id in event.tenants:
+                if recovers_at > down_until.get(tenant_id, float('-inf')):
+                    down_until[tenant_id] = recovers_at
+            heapq.heappush(self._recoveries, (recovers_at, next(sequence), event.tenants))
+            faults_injected += len(event.tenants)
+
+        version = registry.version
+        clock.run_until_idle()
+        self._check_recoveries(registry.changes_since(version), float('inf'), None)
+
+        wall_seconds = time.perf_counter() - started
+        return FaultReport(
+            self.seed, len(timeline), len(self.tenant_ids), faults_injected,
+            self._violations, self._details, clock.now() - origin, wall_seconds,
+            len(timeline) / wall_seconds if wall_seconds else float('inf'),
+        )
+
+    def run(self, events, rate=1000.0, weights=None):
+        return self.play(self.generate(events, rate, weights))
+
+    # --- Verification ---
+
+    def _check_recoveries(self, changes, now, event):
+        registry = self.manager.tenant_data
+        ended = set()
+        while self._recoveries and self._recoveries[0][0] <= now:
+            ended.update(heapq.heappop(self._recoveries)[2])
+        when = f"before {event.kind} at t={event.at:.6f}" if event else "after the timeline drained"
+        for tenant_id, (old, new) in changes.items():
+            if tenant_id not in ended:
+                self._violation(f"{tenant_id} changed {old} -> {new} {when} with no fault ending")
+        for tenant_id in ended:
+            status = registry.status(tenant_id)
+            if self._down_until.get(tenant_id, now) <= now:
+                self._down_until.pop(tenant_id, None)
+                if status != 'running':
+                    self._violation(f"{tenant_id} is {status}, not running, {when} after its last fault ended")
+            elif status == 'running':
+                self._violation(f"{tenant_id} is running {when} while a fault is still outstanding")
+
+    def _check_blast_radius(self, changes, expected, event):
+        for tenant_id, (old, new) in changes.items():
+            if tenant_id not in expected:
+                self._violation(f"{event.kind} on {event.target} at t={event.at:.6f} spread to "
+                                f"{tenant_id} ({old} -> {new})")
+        for tenant_id in expected.difference(changes):
+            self._violation(f"{event.kind} on {event.target} at t={event.at:.6f} did not reach {tenant_id}")
+
+    def _violation(self, message):
+        self._violations += 1
+        if len(self._details) < _MAX_DETAILS:
+            self._details.append(message)
+
+
+def main():
+    from SystemManager import SystemManager
+
+    parser = argparse.ArgumentParser(description="Seeded fleet-wide fault injection with blast-radius checks")
+    parser.add_argument('--tenants', type=int, default=10000)
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--rate', type=float, default=1000.0, help="Fault arrivals per simulated second")
+    parser.add_argument('--tenants-per-host', type=int, default=8)
+    parser.add_argument('--filesystems', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    manager = SystemManager()
+    manager.provision_vms((f'Fleet{index}', {'cpu': 1, 'mem': 2}) for index in range(args.tenants))
+    scheduler = FaultScheduler(manager, args.seed, args.tenants_per_host, args.filesystems)
+    report = scheduler.run(args.events, args.rate)
+    print(f"Seed {report.seed}: {report.events} events, {report.faults_injected} tenant faults "
+          f"across {report.tenants} tenants")
+    print(f"  simulated : {report.simulated_seconds:9.3f} s")
+    print(f"  wall      : {report.wall_seconds:9.3f} s ({report.events_per_second:,.0f} events/s)")
+    print(f"  violations: {report.violations}")
+    for detail in report.details[:10]:
+        print(f"    {detail}")
+    return 1 if report.violations else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -2,11 +2,9 @@ class HardwareAndVMConfig(unittest.TestCase):
     """Test Suite for Hardware and VM/Container Configuration Changes."""
 
     def setUp(self):
-        self.manager = system_manager
-        # Provision a dedicated VM for config testing
+        # TenantCONFIG (the dedicated VM for config testing) and TenantCONTROL come from the baseline fleet
+        self.manager = baseline(system_manager)
         self.config_tenant_id = 'TenantCONFIG'
-        self.manager.provision_vm(self.config_tenant_id, {'cpu': 1, 'mem': 2, 'storage': 50})
-        self.manager.provision_vm('TenantCONTROL', {'cpu': 1, 'mem': 2, 'storage': 50})
 
     def test_HC_02_storage_pool_limit(self):
         """Verify provisioning fails when storage capacity is exceeded."""
@@ -21,10 +19,6 @@ class HardwareAndVMConfig(unittest.TestCase):
         """Verify Snapshot/Checkpoint and Rollback is tenant-local and non-disruptive."""
         print(f"  Running VC-01: Snapshot/Rollback Isolation.")
         
-        # Mocking specific functions for config management
-        self.manager.take_snapshot = MagicMock(return_value=True)
-        self.manager.rollback_vm = MagicMock(return_value=True)
-        
         # 1. Take snapshot of TenantCONFIG
         self.assertTrue(self.manager.take_snapshot(self.config_tenant_id), "Snapshot failed.")
         
@@ -37,7 +31,8 @@ class HardwareAndVMConfig(unittest.TestCase):
         # 4. Verify isolation (TenantCONTROL should be running)
         self.assertEqual(self.manager.check_vm_status('TenantCONTROL'), 'running', "TenantCONTROL was affected by TenantCONFIG's rollback.")
         
-        # In a real test, verify that '/new_file' no longer exists after rollback
+        # 5. Verify that '/new_file' no longer exists after rollback
+        self.assertFalse(self.manager.file_exists(self.config_tenant_id, '/new_file'), "'/new_file' survived the rollback.")
 
     def test_VC_03_security_hardening_isolation(self):
         """Verify security policy application (e.g., SELinux profile) is isolated."""
@@ -54,8 +49,3 @@ class HardwareAndVMConfig(unittest.TestCase):
         
         # 3. Verify policy is NOT applied to the control tenant
         self.assertEqual(self.manager.check_policy_status('TenantCONTROL'), 'DISABLED', "Policy leaked to other tenant.")
-
-    def tearDown(self):
-        self.manager.deprovision_tenant(self.config_tenant_id)
-        self.manager.deprovision_tenant('TenantCONTROL')
-        self.manager.deprovision_tenant('TenantOVER') # Clean up failed provisioning attempts as well
\ No newline at end of file
@@ -0,0 +1,387 @@
+# HypervisorBackend.py - Where a manager's VMs live: in memory, or behind the stand-in orchestrator's HTTP API
+#
+# Usage: python HypervisorBackend.py [--tenants 10000] [--queries 2000] [--pool 4]   (RPC overhead benchmark)
+#
+# A backend owns a manager's VMs. Managers create, change and delete them through it:
+#     provision(tenant_id, resources)     creates the VM, or replaces an existing one
+#     provision_many(entries)             provision() for every (tenant_id, resources), in one round of requests
+#     deprovision(tenant_id)
+#     set_status(tenant_id, status)
+# and query them:
+#     status(tenant_id) -> str            ('unknown' if the VM does not exist)
+#     statuses(tenant_ids) -> [str]       one answer per ID, batched
+#     sync()                              pushes changes made to the registry directly (fixture resets,
+#                                         resources restored by a rollback)
+#     close()
+#
+# The manager's TenantRegistry is the backend's local copy: mutations write it, then reach the
+# hypervisor before they return. A mutation that raises leaves the registry as it was. Managers are not thread-safe. When one is driven from several
+# threads, pass the lock its callers hold around every manager call; mutations run under it
+# already, and queries take it only while reading the registry.
+
+import http.client
+import json
+import queue
+import socket
+import threading
+import time
+from contextlib import nullcontext
+from urllib.parse import quote, urlsplit
+
+# Tenant IDs or changes per request; larger batches are split and the requests pipelined
+BATCH_SIZE = 1000
+DEFAULT_POOL_SIZE = 4
+DEFAULT_TIMEOUT = 10.0
+
+
+class InMemoryHypervisor:
+    """The in-process mock: the manager's own registry is the hypervisor's state."""
+
+    def __init__(self, registry, lock=None):
+        self.registry = registry
+        self.lock = lock if lock is not None else nullcontext()
+
+    def provision(self, tenant_id, resources):
+        self.registry.add(tenant_id, resources)
+
+    def provision_many(self, entries):
+        self.registry.add_many(entries)
+
+    def deprovision(self, tenant_id):
+        del self.registry[tenant_id]
+
+    def set_status(self, tenant_id, status):
+        self.registry.set_status(tenant_id, status)
+
+    def status(self, tenant_id):
+        with self.lock:
+            return self.registry.status(tenant_id)
+
+    def statuses(self, tenant_ids):
+        status = self.registry.status
+        with self.lock:
+            return [status(tenant_id) for tenant_id in tenant_ids]
+
+    def sync(self):
+        return 0
+
+    def close(self):
+        pass
+
+
+class _SharedReader:
+    """The connection's read buffer as handed to each HTTPResponse, which closes it when done."""
+
+    def __init__(self, stream):
+        self.read = stream.read
+        self.readline = stream.readline
+        self.readinto = stream.readinto
+
+    def close(self):
+        pass
+
+
+class _Connection:
+    """A keep-alive socket whose responses are parsed from one shared read buffer."""
+
+    def __init__(self, host, port, timeout):
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream = self.sock.makefile('rb')
+        self._reader = _SharedReader(self.stream)
+
+    def makefile(self, *args, **kwargs):
+        # http.client.HTTPResponse calls this per response; sharing one buffer keeps pipelined
+        # responses that arrived in the same read from being lost between them
+        return self._reader
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+
+class HttpHypervisor:
+    """
+    Client for the stand-in orchestrator (StandInOrchestrator.py).
+
+    Every mutation updates the local registry and then sends the registry's
+    net changes since the last sync, so it has reached the orchestrator when it
+    returns. The changes are diffed from the status journal and the edit log:
+    each tenant whose status or resources changed is sent with its current
+    status and resources. provision_many() sends a whole manifest as a few
+    batched requests, not one per tenant. Queries run the same sync first,
+    which also carries changes written to the registry directly.
+
+    If a mutation's request fails, the registry change is undone before the
+    error propagates, and the next sync sends the whole fleet, since the
+    orchestrator may or may not have applied the lost request.
+
+    Connections are HTTP/1.1 keep-alive and pooled. At most `pool_size` are
+    open, and idle ones are reused most-recent first. Several requests are
+    pipelined: all of them are written on one connection before any response
+    is read, so a large batch costs one round trip rather than one per chunk.
+    A request that fails on a reused connection (the server closed it while it
+    was idle) is retried once on a new one; every request is idempotent.
+    """
+
+    def __init__(self, url, registry, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, batch_size=BATCH_SIZE,
+                 lock=None):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.registry = registry
+        self.lock = lock if lock is not None else nullcontext()
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._sync_lock = threading.Lock()
+        self._synced = None   # (status version, edit version) the orchestrator reflects; None before the first sync
+        self.connections_opened = 0
+
+    # --- Mutations (under the caller's lock) ---
+
+    def provision(self, tenant_id, resources):
+        saved = self._save([tenant_id])
+        self.registry.add(tenant_id, resources)
+        self._send_or_restore(saved)
+
+    def provision_many(self, entries):
+        entries = list(entries)
+        saved = self._save(tenant_id for tenant_id, _ in entries)
+        self.registry.add_many(entries)
+        self._send_or_restore(saved)
+
+    def deprovision(self, tenant_id):
+        saved = self._save([tenant_id])
+        del self.registry[tenant_id]
+        self._send_or_restore(saved)
+
+    def set_status(self, tenant_id, status):
+        saved = self._save([tenant_id])
+        self.registry.set_status(tenant_id, status)
+        self._send_or_restore(saved)
+
+    def _save(self, tenant_ids):
+        registry = self.registry
+        return {tenant_id: {'vm_status': registry.status(tenant_id), 'fs_path': registry.fs_path(tenant_id),
+                            'resources': _resources(registry, tenant_id)} if tenant_id in registry else None
+                for tenant_id in tenant_ids}
+
+    def _send_or_restore(self, saved):
+        try:
+            self._send(*self._pending_changes())
+        except BaseException:
+            registry = self.registry
+            for tenant_id, record in saved.items():
+                if record is not None:
+                    registry[tenant_id] = record
+                elif tenant_id in registry:
+                    del registry[tenant_id]
+            self._synced = None
+            raise
+
+    # --- Queries ---
+
+    def status(self, tenant_id):
+        self.sync()
+        return self.request('GET', f"/vms/{quote(tenant_id, safe='')}")['status']
+
+    def statuses(self, tenant_ids):
+        self.sync()
+        tenant_ids = list(tenant_ids)
+        responses = self.pipeline([('POST', '/vms:status', {'ids': tenant_ids[start:start + self.batch_size]})
+                                   for start in range(0, len(tenant_ids), self.batch_size)])
+        return [status for response in responses for status in response['statuses']]
+
+    def health(self):
+        return self.request('GET', '/health')
+
+    # --- Changes ---
+
+    def sync(self):
+        """Sends the registry's net status and resource changes since the last sync; returns how many were sent."""
+        with self.lock:
+            pending = self._pending_changes()
+        return self._send(*pending)
+
+    def _send(self, mark, changes, reset):
+        # Never holds the caller's lock while waiting for _sync_lock, so mutations may send under it
+        if changes is None:
+            return 0
+        with self._sync_lock:
+            if not reset and self._synced is not None and all(map(int.__le__, mark, self._synced)):
+                return 0   # a concurrent sync already carried these states
+            requests = [('POST', '/vms:sync', {'changes': changes[start:start + self.batch_size],
+                                               'reset': reset and start == 0})
+                        for start in range(0, max(len(changes), 1), self.batch_size)]
+            self.pipeline(requests)
+            self._synced = mark
+            return len(changes)
+
+    def _pending_changes(self):
+        registry = self.registry
+        mark = (registry.version, registry.edit_version)
+        if mark == self._synced:
+            return mark, None, False
+        reset = self._synced is None
+        if not reset:
+            try:
+                changed = registry.changes_since(self._synced[0])
+                edited = registry.edited_since(self._synced[1])
+            except ValueError:
+                # The journal or edit log was trimmed past the last sync: send the whole fleet again
+                reset = True
+        if reset:
+            changes = [[tenant_id, registry.status(tenant_id), _resources(registry, tenant_id)]
+                       for tenant_id in registry]
+        else:
+            changes = [[tenant_id, new, _resources(registry, tenant_id) if new is not None else None]
+                       for tenant_id, (_, new) in changed.items()]
+            # Resources changed without a net status change: the current record replaces the orchestrator's
+            changes += [[tenant_id, registry.status(tenant_id), _resources(registry, tenant_id)]
+                        for tenant_id in edited.difference(changed) if tenant_id in registry]
+        return mark, changes, reset
+
+    # --- Transport ---
+
+    def request(self, method, path, payload=None):
+        return self.pipeline([(method, path, payload)])[0]
+
+    def pipeline(self, requests):
+        """Sends every (method, path, payload) on one connection, then reads the JSON responses in order."""
+        with self._slots:
+            connection, reused = self._acquire()
+            try:
+                responses = self._exchange(connection, requests)
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                if not reused:
+                    raise
+                connection = self._open()
+                try:
+                    responses = self._exchange(connection, requests)
+                except BaseException:
+                    connection.close()
+                    raise
+            except BaseException:
+                connection.close()
+                raise
+            self._idle.put(connection)
+        for (method, path, _), (code, body) in zip(requests, responses):
+            if isinstance(body, bytes):
+                raise ConnectionError(f"Orchestrator answered {code} to {method} {path} with a non-JSON body: "
+                                      f"{body[:200]!r}")
+            if code != 200:
+                raise ConnectionError(f"Orchestrator answered {code} to {method} {path}: {body.get('error', body)}")
+        return [body for _, body in responses]
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._open(), False
+
+    def _open(self):
+        self.connections_opened += 1
+        return _Connection(self.host, self.port, self.timeout)
+
+    def _exchange(self, connection, requests):
+        connection.sock.sendall(b''.join(self._encode(*request) for request in requests))
+        responses = []
+        for method, _, _ in requests:
+            response = http.client.HTTPResponse(connection, method=method)
+            response.begin()
+            responses.append((response.status, _decode(response.read())))
+            if response.will_close:
+                raise http.client.HTTPException("Orchestrator closed a keep-alive connection.")
+        return responses
+
+    def _encode(self, method, path, payload):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        head = (f'{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n'
+                f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n')
+        return head.encode() + body
+
+
+def _resources(registry, tenant_id):
+    return dict(registry[tenant_id]['resources'])
+
+
+def _decode(data):
+    # A proxy or a crashed handler may answer with HTML or nothing; the raw bytes go into the error
+    try:
+        return json.loads(data)
+    except ValueError:
+        return data
+
+
+def main():
+    import argparse
+
+    from StandInOrchestrator import start_orchestrator
+    from TenantRegistry import TenantRegistry
+
+    parser = argparse.ArgumentParser(description="RPC overhead of the HTTP hypervisor backend")
+    parser.add_argument('--tenants', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=2000, help="Single-tenant status queries to time")
+    parser.add_argument('--pool', type=int, default=DEFAULT_POOL_SIZE)
+    args = parser.parse_args()
+
+    process, url = start_orchestrator()
+    try:
+        registry = TenantRegistry()
+        client = HttpHypervisor(url, registry, pool_size=args.pool)
+        registry.add_many((f'Tenant{index}', {'cpu': 1, 'mem': 2}) for index in range(args.tenants))
+        started = time.perf_counter()
+        sent = client.sync()
+        seconds = time.perf_counter() - started
+        print(f"sync: {sent:,} tenants in {seconds * 1e3:.1f} ms ({sent / seconds:,.0f} tenants/s)")
+
+        tenant_ids = list(registry)
+        started = time.perf_counter()
+        for index in range(args.queries):
+            client.status(tenant_ids[index % len(tenant_ids)])
+        seconds = time.perf_counter() - started
+        print(f"status, keep-alive: {seconds / args.queries * 1e6:.0f} us/query "
+              f"over {client.connections_opened} connection(s)")
+
+        fresh = HttpHypervisor(url, registry, pool_size=1)
+        fresh._synced = (registry.version, registry.edit_version)
+        started = time.perf_counter()
+        for index in range(min(args.queries, 500)):
+            fresh.status(tenant_ids[index % len(tenant_ids)])
+            fresh.close()
+        seconds = time.perf_counter() - started
+        print(f"status, new connection each: {seconds / min(args.queries, 500) * 1e6:.0f} us/query")
+
+        started = time.perf_counter()
+        statuses = client.statuses(tenant_ids)
+        seconds = time.perf_counter() - started
+        print(f"batched statuses, pipelined: {len(statuses):,} tenants in {seconds * 1e3:.1f} ms "
+              f"({len(statuses) / seconds:,.0f} tenants/s)")
+
+        threads = [threading.Thread(target=lambda: [client.status(tenant_id) for tenant_id in tenant_ids[:250]])
+                   for _ in range(args.pool * 2)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - started
+        print(f"{len(threads)} threads x 250 queries: {len(threads) * 250 / seconds:,.0f} queries/s, "
+              f"{client.connections_opened} connection(s) opened in total")
+        client.close()
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+# KeywordTracer.py - Opt-in tracing of manager/library keyword calls, exported as Chrome trace-event JSON
+#
+# Usage:
+#   KEYWORD_TRACE=trace.json python Test_automation_Suite.py      # trace.json + trace.summary.json at exit
+#   robot --listener KeywordTracer.RobotListener:trace.json MultiTenancy.robot
+#
+# Open trace.json in chrome://tracing or https://ui.perfetto.dev.
+
+import atexit
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+TRACE_ENV = 'KEYWORD_TRACE'
+DEFAULT_CAPACITY = 1 << 16
+
+
+def _tenant_locator(function):
+    """
+    Returns a function (args, kwargs) -> tenant ID string or None for calls of
+    `function` without self: the first parameter whose name mentions a tenant
+    (tenant_id, tenant_a, noisy_tenant, *tenant_ids).
+    """
+    import inspect  # only needed once tracing is on
+    parameters = [parameter for parameter in inspect.signature(function).parameters.values()
+                  if parameter.name != 'self']
+    for index, parameter in enumerate(parameters):
+        if 'tenant' not in parameter.name:
+            continue
+        if parameter.kind is parameter.VAR_POSITIONAL:
+            return lambda args, kwargs: ','.join(map(str, args[index:])) or None
+        name = parameter.name
+        return lambda args, kwargs: str(args[index]) if len(args) > index else kwargs.get(name)
+    return lambda args, kwargs: None
+
+
+class KeywordTracer:
+    """
+    Records keyword spans (name, tenant ID, wall and CPU time, nesting depth)
+    into a fixed-size ring buffer.
+
+    Disabled, it costs nothing per call: instrument() leaves objects untouched,
+    so their methods are the plain class functions. Enabled, instrument()
+    shadows each public method of an object with a wrapper bound at that point
+    (class-level patches made afterwards do not reach it). Writers never take a
+    lock: a slot is claimed with next() on an itertools.count, which is atomic
+    under the GIL, and filled with a single list store. When the buffer wraps,
+    the oldest spans are overwritten and counted as dropped.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, enabled=False):
+        if capacity & (capacity - 1):
+            raise ValueError(f"capacity must be a power of two, got {capacity}.")
+        self.capacity = capacity
+        self.enabled = enabled
+        self._mask = capacity - 1
+        self._buffer = [None] * capacity
+        self._sequence = itertools.count()
+        self._local = threading.local()
+        self._origin = time.perf_counter_ns()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self._buffer = [None] * self.capacity
+        self._sequence = itertools.count()
+
+    # --- Recording ---
+
+    def instrument(self, target, category='keyword'):
+        """Wraps the public methods of `target` when tracing is enabled; returns `target`."""
+        if not self.enabled:
+            return target
+        import inspect
+        owner = type(target)
+        for name in dir(owner):
+            function = getattr(owner, name, None)
+            if name.startswith('_') or not inspect.isfunction(function) or inspect.iscoroutinefunction(function):
+                continue
+            setattr(target, name, self.wrap(getattr(target, name), f'{owner.__name__}.{name}', category,
+                                            _tenant_locator(function)))
+        return target
+
+    def wrap(self, method, name, category='keyword', locate_tenant=None):
+        # begin()/end() inlined: this runs on every traced call
+        tracer, local = self, self._local
+        wall_clock, cpu_clock, get_ident = time.perf_counter_ns, time.thread_time_ns, threading.get_ident
+        locate_tenant = locate_tenant or _tenant_locator(method)
+
+        @functools.wraps(method)
+        def traced(*args, **kwargs):
+            depth = getattr(local, 'depth', 0)
+            local.depth = depth + 1
+            started, cpu_started = wall_clock(), cpu_clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                cpu, now = cpu_clock(), wall_clock()
+                local.depth = depth
+                sequence = next(tracer._sequence)
+                tracer._buffer[sequence & tracer._mask] = (
+                    sequence, name, category, locate_tenant(args, kwargs), started - tracer._origin,
+                    now - started, cpu - cpu_started, depth, get_ident())
+        return traced
+
+    def begin(self):
+        """Opens a span on the calling thread; pass the token to end()."""
+        local = self._local
+        depth = getattr(local, 'depth', 0)
+        local.depth = depth + 1
+        return time.perf_counter_ns(), time.thread_time_ns(), depth
+
+    def end(self, token, name, category, tenant_id=None):
+        cpu = time.thread_time_ns()
+        now = time.perf_counter_ns()
+        started, cpu_started, depth = token
+        self._local.depth = depth
+        sequence = next(self._sequence)
+        self._buffer[sequence & self._mask] = (sequence, name, category, tenant_id, started - self._origin,
+                                               now - started, cpu - cpu_started, depth,
+                                               threading.get_ident())
+
+    def spans(self):
+        """Returns the buffered spans, oldest first, and how many were overwritten."""
+        spans = sorted(span for span in list(self._buffer) if span is not None)
+        dropped = spans[-1][0] + 1 - len(spans) if spans else 0
+        return spans, dropped
+
+    # --- Export ---
+
+    def chrome_trace(self):
+        """Trace-event JSON object: one complete ('X') event per span, timestamps in microseconds."""
+        spans, dropped = self.spans()
+        pid = os.getpid()
+        events = []
+        for _, name, category, tenant_id, started, wall, cpu, depth, thread in spans:
+            arguments = {'cpu_us': cpu / 1e3, 'depth': depth}
+            if tenant_id is not None:
+                arguments['tenant_id'] = tenant_id
+            events.append({'name': name, 'cat': category, 'ph': 'X', 'ts': started / 1e3, 'dur': wall / 1e3,
+                           'pid': pid, 'tid': thread, 'args': arguments})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'dropped_spans': dropped}}
+
+    def summary(self):
+        """
+        Per-keyword statistics: call count, total wall/CPU time, p50/p99/max,
+        and a histogram of wall times in power-of-two microsecond buckets.
+        """
+        spans, _ = self.spans()
+        walls, cpus = {}, {}
+        for _, name, category, _, _, wall, cpu, _, _ in spans:
+            key = f'{category}:{name}'
+            walls.setdefault(key, []).append(wall)
+            cpus[key] = cpus.get(key, 0) + cpu
+        summary = {}
+        for key, durations in sorted(walls.items()):
+            durations.sort()
+            histogram = {}
+            for duration in durations:
+                bound = 1 << max(0, (duration // 1000).bit_length())
+                histogram[bound] = histogram.get(bound, 0) + 1
+            summary[key] = {
+                'calls': len(durations),
+                'total_ms': sum(durations) / 1e6,
+                'cpu_ms': cpus[key] / 1e6,
+                'p50_us': durations[len(durations) // 2] / 1e3,
+                'p99_us': durations[min(int(len(durations) * 0.99), len(durations) - 1)] / 1e3,
+                'max_us': durations[-1] / 1e3,
+                'histogram_us': {f'<{bound}': count for bound, count in sorted(histogram.items())},
+            }
+        return summary
+
+    def format_summary(self):
+        lines = [f"{'keyword':<58} {'calls':>7} {'total ms':>10} {'cpu ms':>9} {'p50 us':>9} {'p99 us':>9}"]
+        for key, row in sorted(self.summary().items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f"{key:<58} {row['calls']:>7} {row['total_ms']:>10.2f} {row['cpu_ms']:>9.2f} "
+                         f"{row['p50_us']:>9.1f} {row['p99_us']:>9.1f}")
+        return '\n'.join(lines)
+
+    def write(self, path):
+        """Writes the Chrome trace to `path` and the per-keyword summary next to it (.summary.json)."""
+        with open(path, 'w') as handle:
+            json.dump(self.chrome_trace(), handle)
+        with open(f'{os.path.splitext(path)[0]}.summary.json', 'w') as handle:
+            json.dump(self.summary(), handle, indent=2)
+
+
+class RobotListener:
+    """
+    Robot Framework listener (API v2) that turns TRACER on for the run.
+
+    Listeners are created before any library is imported, so the libraries'
+    keywords are instrumented as usual and carry their tenant IDs. The listener
+    adds suite, test and Robot keyword spans around them on the same buffer,
+    and writes the trace when the run closes.
+    """
+
+    ROBOT_LISTENER_API_VERSION = 2
+
+    def __init__(self, output='keyword_trace.json'):
+        self.output = output
+        self._open = []
+        TRACER.enable()
+
+    def start_suite(self, name, attributes):
+        self._open.append(TRACER.begin())
+
+    def end_suite(self, name, attributes):
+        TRACER.end(self._open.pop(), name, 'suite')
+
+    def start_test(self, name, attributes):
+        self._open.append(TRACER.begin())
+
+    def end_test(self, name, attributes):
+        TRACER.end(self._open.pop(), name, 'test')
+
+    def start_keyword(self, name, attributes):
+        self._open.append(TRACER.begin())
+
+    def end_keyword(self, name, attributes):
+        TRACER.end(self._open.pop(), name, 'robot')
+
+    def close(self):
+        TRACER.write(self.output)
+        sys.__stdout__.write(f"Keyword trace: {os.path.abspath(self.output)}\n")
+
+
+def _write_at_exit(path):
+    TRACER.write(path)
+    sys.stderr.write(f"\n{TRACER.format_summary()}\nKeyword trace written to {path}\n")
+
+
+# Shared by the libraries and managers; enabled by KEYWORD_TRACE=<path> or the Robot listener
+TRACER = KeywordTracer(enabled=bool(os.environ.get(TRACE_ENV)))
+if os.environ.get(TRACE_ENV):
+    atexit.register(_write_at_exit, os.environ[TRACE_ENV])
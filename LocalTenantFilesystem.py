@@ -0,0 +1,157 @@
+# LocalTenantFilesystem.py - Tenant fs_path trees on a local directory, with boundary checks (MT-01/SR-02)
+
+import errno
+import hashlib
+import os
+import shutil
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_NOFOLLOW', 0)
+_READ_FLAGS = os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0)
+
+
+class LocalTenantFilesystem:
+    """
+    Each tenant's fs_path as a real directory under a local `root`.
+
+    Guest paths are resolved against a tenant's tree, and an operation is only
+    allowed when the result lies inside the caller's own tree: writing into
+    another tenant's path, climbing out with '..' or following a symlink out of
+    the tree all raise PermissionError. The final path component is opened
+    with O_NOFOLLOW, so a symlinked file cannot redirect a write either.
+
+    The managers keep their in-memory TenantFilesystem as the record that
+    snapshots read, and write through to this class; replace() brings a tree
+    back in line after a rollback. Backups stream the tree itself, and files()
+    brings the in-memory record back in line after a restore.
+
+    Only the resolved tree root is cached per tenant. The parent directory of
+    every target is resolved again on each call, because a guest can replace
+    any directory in its tree with a symlink between two writes.
+    """
+
+    def __init__(self, root, registry):
+        os.makedirs(root, exist_ok=True)
+        self.root = os.path.realpath(root)
+        self.registry = registry
+        self._boundaries = {}   # tenant_id -> (resolved tree root, root + os.sep)
+        # Tenants whose trees were written; cleared by the fixture pool
+        self.edited = set()
+
+    # --- Boundaries ---
+
+    def tenant_root(self, tenant_id):
+        """Returns the tenant's resolved tree on disk, creating it on first use."""
+        return self._boundary(tenant_id)[0]
+
+    def resolve(self, tenant_id, path, owner=None):
+        """
+        Maps guest `path` in `owner`'s tree (default: the caller's own) to a host
+        path, or raises PermissionError if it falls outside `tenant_id`'s tree.
+        """
+        root, prefix = self._boundary(tenant_id)
+        if owner is not None and owner != tenant_id:
+            root = self._boundary(owner)[0]
+        target = os.path.normpath(os.path.join(root, path.lstrip('/')))
+        if not target.startswith(prefix):
+            raise PermissionError(f"Permission Denied: {tenant_id} cannot access {path!r} "
+                                  f"in {owner or tenant_id}'s filesystem.")
+        resolved = os.path.realpath(os.path.dirname(target))
+        if resolved != prefix[:-1] and not resolved.startswith(prefix):
+            raise PermissionError(f"Permission Denied: {path!r} resolves outside {tenant_id}'s filesystem.")
+        return target
+
+    def forget(self, tenant_id):
+        """Drops the tenant's cached tree root; it is resolved again on next use."""
+        self._boundaries.pop(tenant_id, None)
+
+    def _boundary(self, tenant_id):
+        boundary = self._boundaries.get(tenant_id)
+        if boundary is None:
+            tree = os.path.join(self.root, self.registry.fs_path(tenant_id).lstrip('/'))
+            os.makedirs(tree, exist_ok=True)
+            root = os.path.realpath(tree)
+            if not root.startswith(os.path.join(self.root, '')):
+                raise PermissionError(f"{tenant_id}'s fs_path resolves outside {self.root}.")
+            boundary = self._boundaries[tenant_id] = (root, os.path.join(root, ''))
+        return boundary
+
+    # --- File operations ---
+
+    def write(self, tenant_id, path, data, owner=None):
+        """Writes `data` (str or bytes) as `tenant_id`; returns the number of bytes written."""
+        target = self.resolve(tenant_id, path, owner)
+        self.edited.add(tenant_id)
+        if isinstance(data, str):
+            data = data.encode()
+        try:
+            handle = os.open(target, _WRITE_FLAGS, 0o644)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            handle = os.open(target, _WRITE_FLAGS, 0o644)
+        except OSError as error:
+            if error.errno != errno.ELOOP:
+                raise
+            # O_NOFOLLOW: the final component is a symlink
+            raise PermissionError(f"Permission Denied: {path!r} in {tenant_id}'s filesystem is not a regular file.") from error
+        try:
+            return os.write(handle, data)
+        finally:
+            os.close(handle)
+
+    def read(self, tenant_id, path, owner=None):
+        target = self.resolve(tenant_id, path, owner)
+        try:
+            handle = os.open(target, _READ_FLAGS)
+        except OSError as error:
+            if error.errno != errno.ELOOP:
+                raise
+            raise PermissionError(f"Permission Denied: {path!r} in {tenant_id}'s filesystem is not a regular file.") from error
+        with os.fdopen(handle, 'rb') as stream:
+            return stream.read()
+
+    def exists(self, tenant_id, path):
+        return os.path.isfile(self.resolve(tenant_id, path))
+
+    def replace(self, tenant_id, files):
+        """Makes {guest path: data} the tenant's entire tree (after a rollback or restore)."""
+        root = self.tenant_root(tenant_id)
+        shutil.rmtree(root, ignore_errors=True)
+        os.makedirs(root, exist_ok=True)
+        self.edited.add(tenant_id)
+        for path, data in files.items():
+            self.write(tenant_id, path, data)
+
+    def files(self, tenant_id):
+        """Returns the tenant's tree as {guest path: bytes}; symlinks are skipped."""
+        root = self.tenant_root(tenant_id)
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                if os.path.isfile(path) and not os.path.islink(path):
+                    with open(path, 'rb') as handle:
+                        files['/' + os.path.relpath(path, root).replace(os.sep, '/')] = handle.read()
+        return files
+
+    def digest(self, tenant_id):
+        """SHA-256 over the tenant's tree (paths and contents), for before/after integrity checks."""
+        root = self.tenant_root(tenant_id)
+        digest = hashlib.sha256()
+        for directory, directories, names in os.walk(root):
+            directories.sort()
+            for name in sorted(names):
+                path = os.path.join(directory, name)
+                digest.update(os.path.relpath(path, root).encode() + b'\0')
+                with open(path, 'rb') as handle:
+                    for block in iter(lambda: handle.read(1 << 20), b''):
+                        digest.update(block)
+                digest.update(b'\0')
+        return digest.hexdigest()
+
+    def drop(self, tenant_id):
+        """Removes the tenant's tree (deprovisioning)."""
+        if tenant_id in self._boundaries:
+            shutil.rmtree(self._boundaries[tenant_id][0], ignore_errors=True)
+        elif tenant_id in self.registry:
+            shutil.rmtree(os.path.join(self.root, self.registry.fs_path(tenant_id).lstrip('/')), ignore_errors=True)
+        self.forget(tenant_id)
@@ -0,0 +1,100 @@
+# LogLeakageScanner.py - UT-02: streams tenant logs and reports every foreign tenant identifier
+
+import mmap
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from MultiPatternMatcher import MultiPatternMatcher
+
+Leak = namedtuple('Leak', ['path', 'offset', 'owner', 'tenant_id'])
+
+_IDENTIFIER_BYTES = frozenset(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-')
+
+
+class LogLeakageScanner:
+    """
+    Finds every occurrence of any known tenant ID in logs owned by another tenant.
+
+    All N tenant IDs are compiled into one Aho-Corasick automaton, so a log is
+    read once no matter how many tenants there are. Files are memory-mapped, so
+    the OS pages them in as the scan advances instead of loading them whole, and
+    scan_files() spreads files over a process pool.
+    """
+
+    def __init__(self, tenant_ids, whole_words=True):
+        self.tenant_ids = list(dict.fromkeys(tenant_ids))
+        self.whole_words = whole_words
+        self._matcher = MultiPatternMatcher([tenant_id.encode() for tenant_id in self.tenant_ids])
+        # Bytes that can start a tenant ID; the automaton skips straight to them while idle
+        first_bytes = bytes(sorted(self._matcher.first_characters()))
+        self._skip = re.compile(b'[' + re.escape(first_bytes) + b']') if first_bytes else re.compile(b'(?!)')
+
+    def scan_text(self, text, owner=None, path=None):
+        """Scans an in-memory log (str or bytes)."""
+        data = text.encode() if isinstance(text, str) else text
+        return self._scan_buffer(data, owner, path)
+
+    def scan_file(self, path, owner=None):
+        """Scans one log file; `owner` defaults to the file name without extension."""
+        if owner is None:
+            owner = os.path.splitext(os.path.basename(path))[0]
+        with open(path, 'rb') as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return self._scan_buffer(data, owner, path)
+
+    def scan_files(self, files, workers=None):
+        """
+        Scans many logs in parallel.
+
+        `files` is a {path: owner} mapping or an iterable of paths (owner taken
+        from the file name). Leaks are returned grouped by file in input order.
+        """
+        items = list(files.items()) if isinstance(files, dict) else [(path, None) for path in files]
+        if not items:
+            return []
+        workers = min(workers or os.cpu_count() or 1, len(items))
+        if workers == 1:
+            return [leak for path, owner in items for leak in self.scan_file(path, owner)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as pool:
+            results = pool.map(_scan_in_worker, [path for path, _ in items], [owner for _, owner in items])
+            return [leak for leaks in results for leak in leaks]
+
+    def scan_directory(self, log_dir, suffix='.log', workers=None):
+        """Scans every `<tenant_id><suffix>` file in `log_dir`."""
+        paths = sorted(os.path.join(log_dir, name) for name in os.listdir(log_dir) if name.endswith(suffix))
+        return self.scan_files(paths, workers=workers)
+
+    def _scan_buffer(self, data, owner, path):
+        leaks = []
+        size = len(data)
+        for start, index in self._matcher.scan_skipping(data, self._skip):
+            tenant_id = self.tenant_ids[index]
+            if tenant_id == owner:
+                continue
+            if self.whole_words and not self._is_whole_word(data, start, start + len(self._matcher.patterns[index]), size):
+                continue
+            leaks.append(Leak(path, start, owner, tenant_id))
+        return leaks
+
+    @staticmethod
+    def _is_whole_word(data, start, end, size):
+        # 'TenantA' inside 'TenantAB' is a different tenant, not a leak
+        if start > 0 and data[start - 1] in _IDENTIFIER_BYTES:
+            return False
+        return end >= size or data[end] not in _IDENTIFIER_BYTES
+
+
+_worker_scanner = None
+
+
+def _init_worker(scanner):
+    global _worker_scanner
+    _worker_scanner = scanner
+
+
+def _scan_in_worker(path, owner):
+    return _worker_scanner.scan_file(path, owner)
@@ -0,0 +1,117 @@
+# MountTable.py - Indexed VM mount table; persistent mounts are kept in an append-only log replayed at boot
+
+import json
+import os
+
+DEFAULT_COMPACT_AFTER = 1024
+
+
+class MountTable:
+    """
+    The mounts of one VM, held in a hash index (name -> mount path).
+
+    Persistent mounts (the VM's fstab) are also appended to a small log on disk:
+    one JSON record per mount or unmount. Opening the table replays the log, so
+    a new process sees the same persistent mounts a rebooted VM would. Within a
+    process, a second index holds exactly what replaying the log would give, and
+    restart() swaps it in as a dict copy instead of re-reading the log or
+    scanning the mounts to find the persistent ones.
+
+    Once the log holds more than `compact_after` records and at least twice as
+    many records as live persistent mounts, it is rewritten with only the live
+    ones (into a temporary file, then os.replace), so replay cost tracks the
+    number of persistent mounts rather than the mount history.
+    """
+
+    def __init__(self, log_path, compact_after=DEFAULT_COMPACT_AFTER):
+        self.log_path = log_path
+        self.compact_after = compact_after
+        self._persistent = {}   # name -> path, what replaying the log yields
+        self._records = 0       # records in the log file
+        clean = self._replay()
+        self._mounts = dict(self._persistent)
+        self._log = open(log_path, 'a', encoding='utf-8')
+        if not clean:
+            self.compact()
+
+    def __contains__(self, name):
+        return name in self._mounts
+
+    def __len__(self):
+        return len(self._mounts)
+
+    def __iter__(self):
+        return iter(self._mounts)
+
+    def path(self, name):
+        return self._mounts.get(name)
+
+    def is_persistent(self, name):
+        return name in self._persistent
+
+    # --- Changes ---
+
+    def mount(self, name, path, persistent=False):
+        """Returns False if `name` is already mounted."""
+        if name in self._mounts:
+            return False
+        self._mounts[name] = path
+        if persistent:
+            self._persistent[name] = path
+            self._append(['+', name, path])
+        return True
+
+    def unmount(self, name):
+        """Returns False if `name` is not mounted."""
+        if self._mounts.pop(name, None) is None:
+            return False
+        if self._persistent.pop(name, None) is not None:
+            self._append(['-', name])
+        return True
+
+    def restart(self):
+        """Drops every non-persistent mount, as a VM reboot does."""
+        self._mounts = dict(self._persistent)
+
+    # --- Log ---
+
+    def compact(self):
+        """Rewrites the log with one record per live persistent mount."""
+        self._log.close()
+        partial = f'{self.log_path}.{os.getpid()}.tmp'
+        with open(partial, 'w', encoding='utf-8') as handle:
+            for name, path in self._persistent.items():
+                handle.write(json.dumps(['+', name, path]) + '\n')
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(partial, self.log_path)
+        self._records = len(self._persistent)
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+
+    def close(self):
+        self._log.close()
+
+    def _append(self, record):
+        self._log.write(json.dumps(record) + '\n')
+        self._log.flush()
+        self._records += 1
+        if self._records > self.compact_after and self._records >= 2 * len(self._persistent):
+            self.compact()
+
+    def _replay(self):
+        """Loads the persistent index from the log; returns False if it ended in a torn record."""
+        if not os.path.exists(self.log_path):
+            return True
+        with open(self.log_path, encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A record torn by a crash mid-append; everything before it is intact
+                    return False
+                if record[0] == '+':
+                    self._persistent[record[1]] = record[2]
+                else:
+                    self._persistent.pop(record[1], None)
+                self._records += 1
+        return True
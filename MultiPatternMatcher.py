@@ -0,0 +1,137 @@
+# MultiPatternMatcher.py - Prefix trie and Aho-Corasick automaton shared by the policy and log scanners
+
+from collections import deque
+
+
+class PrefixTrie:
+    """
+    Trie over a fixed set of patterns, used for anchored (startswith) matching.
+
+    prefixes_of(text) walks the trie once along the text, so the cost depends on
+    the length of the longest matching prefix, not on the number of patterns.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._children = [{}]
+        self._terminal = [()]
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                child = self._children[node].get(char)
+                if child is None:
+                    child = len(self._children)
+                    self._children[node][char] = child
+                    self._children.append({})
+                    self._terminal.append(())
+                node = child
+            self._terminal[node] += (index,)
+
+    def prefixes_of(self, text):
+        """Returns the indices of every pattern that `text` starts with, shortest first."""
+        found = list(self._terminal[0])
+        children = self._children
+        node = 0
+        for char in text:
+            node = children[node].get(char)
+            if node is None:
+                break
+            found.extend(self._terminal[node])
+        return found
+
+
+class MultiPatternMatcher:
+    """
+    Aho-Corasick automaton matching every pattern in a single pass over the text.
+
+    Patterns are compiled once. iter_matches() is O(len(text) + number of matches)
+    regardless of how many patterns were compiled.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                raise ValueError("Empty patterns cannot be matched.")
+            node = 0
+            for char in pattern:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][char] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                node = child
+            self._output[node] += (index,)
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Fold the suffix's matches in so reporting never has to chase links
+                self._output[child] += self._output[self._fail[child]]
+
+    def iter_matches(self, text, offset=0):
+        """Yields (start, pattern_index) for every occurrence, ordered by end position."""
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                end = offset + position + 1
+                for index in output[node]:
+                    yield end - len(patterns[index]), index
+
+    def first_characters(self):
+        """Returns the set of characters (or byte values) that can start a match."""
+        return set(self._goto[0])
+
+    def scan_skipping(self, data, skip, start=0, end=None):
+        """
+        Scans data[start:end] in one pass, skipping ahead while the automaton is idle.
+
+        `skip` is a compiled regex matching positions where a pattern may begin
+        (e.g. a class of first_characters()). Whenever the automaton is back at
+        its root, re's C search jumps to the next such position instead of
+        stepping one character at a time, so text with few candidate starts is
+        scanned at close to regex speed. Returns [(start, pattern_index), ...].
+        """
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        end = len(data) if end is None else end
+        search = skip.search
+        matches = []
+        node = 0
+        position = start
+        while position < end:
+            if not node:
+                found = search(data, position, end)
+                if found is None:
+                    break
+                position = found.start()
+            char = data[position]
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            position += 1
+            if output[node]:
+                for index in output[node]:
+                    matches.append((position - len(patterns[index]), index))
+        return matches
+
+    def matched_indices(self, text):
+        """Returns the set of pattern indices that occur anywhere in `text`."""
+        return {index for _, index in self.iter_matches(text)}
@@ -1,13 +1,9 @@
 class MultiTenancy(unittest.TestCase):
     """Test Suite for Multi-tenancy Isolation and Security."""
 
-    @classmethod
-    def setUpClass(cls):
-        """Setup initial tenants for cross-tenant testing."""
-        cls.manager = system_manager
-        print("\n--- Setting up MultiTenancy Test Suite ---")
-        cls.manager.provision_vm('TenantA', {'cpu': 2, 'mem': 4})
-        cls.manager.provision_vm('TenantB', {'cpu': 4, 'mem': 8})
+    def setUp(self):
+        """Restore the baseline fleet (TenantA and TenantB included) for cross-tenant testing."""
+        self.manager = baseline(system_manager)
 
     def test_MT_01_data_isolation(self):
         """Verify Tenant A cannot read/write Tenant B's filesystem data."""
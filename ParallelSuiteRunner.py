@@ -0,0 +1,175 @@
+# ParallelSuiteRunner.py - Runs unittest suites across a process pool
+
+import importlib
+import os
+import time
+import traceback
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+
+class _RecordingResult(unittest.TestResult):
+    """Collects picklable outcome records inside a worker process."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self._started = {}
+
+    def _record(self, test, outcome, detail=''):
+        duration = time.perf_counter() - self._started.pop(test.id(), time.perf_counter())
+        self.records.append((test.id(), str(test), test.shortDescription(), outcome, detail, duration))
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started[test.id()] = time.perf_counter()
+
+    def addSuccess(self, test):
+        self._record(test, 'success')
+
+    def addFailure(self, test, err):
+        self._record(test, 'failure', self._exc_info_to_string(err, test))
+
+    def addError(self, test, err):
+        self._record(test, 'error', self._exc_info_to_string(err, test))
+
+    def addSkip(self, test, reason):
+        self._record(test, 'skip', reason)
+
+    def addExpectedFailure(self, test, err):
+        self._record(test, 'expected_failure', self._exc_info_to_string(err, test))
+
+    def addUnexpectedSuccess(self, test):
+        self._record(test, 'unexpected_success')
+
+    def addSubTest(self, test, subtest, err):
+        # Only failing subtests are reported, matching TextTestRunner
+        if err is not None:
+            outcome = 'failure' if issubclass(err[0], test.failureException) else 'error'
+            self.records.append((subtest.id(), str(subtest), subtest.shortDescription(), outcome,
+                                 self._exc_info_to_string(err, subtest), 0.0))
+
+
+def run_shard(module_name, test_names, manager_attr='system_manager', manager_factory='SystemManager'):
+    """
+    Worker entry point: runs `test_names` from `module_name` against a fresh manager.
+
+    The module-global manager is rebound before the shard starts, so no two shards
+    ever mutate the same tenant_data.
+    """
+    module = importlib.import_module(module_name)
+    if manager_attr:
+        setattr(module, manager_attr, getattr(module, manager_factory)())
+    suite = unittest.defaultTestLoader.loadTestsFromNames(test_names, module)
+    result = _RecordingResult()
+    try:
+        suite.run(result)
+    except Exception:
+        result.records.append((module_name, module_name, None, 'error', traceback.format_exc(), 0.0))
+    return result.records
+
+
+class _RemoteFailure(Exception):
+    """Carries a traceback that was already formatted in the worker."""
+
+
+class _RemoteTest:
+    """Stands in for a TestCase that ran in another process."""
+
+    def __init__(self, test_id, name, description):
+        self._id = test_id
+        self._name = name
+        self._description = description
+
+    def id(self):
+        return self._id
+
+    def shortDescription(self):
+        return self._description
+
+    def __str__(self):
+        return self._name
+
+
+class _MergedResult(unittest.TextTestResult):
+    """TextTestResult that prints worker tracebacks verbatim."""
+
+    def _exc_info_to_string(self, err, test):
+        if isinstance(err[1], _RemoteFailure):
+            return str(err[1])
+        return super()._exc_info_to_string(err, test)
+
+
+class ParallelSuite:
+    """
+    A test that shards its cases across a process pool.
+
+    Pass it to unittest.TextTestRunner like any other suite; worker results are
+    replayed into the runner's result in shard order, so the merged report reads
+    exactly like a single-process run.
+    """
+
+    def __init__(self, module_name, test_case_names, workers=None, shard_by='class',
+                 manager_attr='system_manager', manager_factory='SystemManager'):
+        if shard_by not in ('class', 'method'):
+            raise ValueError(f"shard_by must be 'class' or 'method', got {shard_by!r}.")
+        self.module_name = module_name
+        self.test_case_names = list(test_case_names)
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_by = shard_by
+        self.manager_attr = manager_attr
+        self.manager_factory = manager_factory
+
+    def shards(self):
+        """Returns the list of test-name lists handed to the workers."""
+        if self.shard_by == 'class':
+            return [[name] for name in self.test_case_names]
+        module = importlib.import_module(self.module_name)
+        loader = unittest.defaultTestLoader
+        return [[f'{name}.{method}']
+                for name in self.test_case_names
+                for method in loader.getTestCaseNames(getattr(module, name))]
+
+    def countTestCases(self):
+        module = importlib.import_module(self.module_name)
+        return sum(len(unittest.defaultTestLoader.getTestCaseNames(getattr(module, name)))
+                   for name in self.test_case_names)
+
+    def run_records(self):
+        """Runs every shard and returns a list of outcome records per shard."""
+        shards = self.shards()
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(shards) or 1)) as pool:
+            return list(pool.map(run_shard, [self.module_name] * len(shards), shards,
+                                 [self.manager_attr] * len(shards), [self.manager_factory] * len(shards)))
+
+    def __call__(self, result):
+        for records in self.run_records():
+            replay_records(records, result)
+        return result
+
+
+def replay_records(records, result):
+    """Feeds worker outcome records into a unittest result object."""
+    for test_id, name, description, outcome, detail, _duration in records:
+        test = _RemoteTest(test_id, name, description)
+        result.startTest(test)
+        if outcome == 'success':
+            result.addSuccess(test)
+        elif outcome == 'failure':
+            result.addFailure(test, (_RemoteFailure, _RemoteFailure(detail), None))
+        elif outcome == 'error':
+            result.addError(test, (_RemoteFailure, _RemoteFailure(detail), None))
+        elif outcome == 'skip':
+            result.addSkip(test, detail)
+        elif outcome == 'expected_failure':
+            result.addExpectedFailure(test, (_RemoteFailure, _RemoteFailure(detail), None))
+        elif outcome == 'unexpected_success':
+            result.addUnexpectedSuccess(test)
+        result.stopTest(test)
+
+
+def run_parallel(module_name, test_case_names, workers=None, shard_by='class', verbosity=2):
+    """Runs the suite across `workers` processes and prints a TextTestRunner report."""
+    suite = ParallelSuite(module_name, test_case_names, workers=workers, shard_by=shard_by)
+    runner = unittest.TextTestRunner(verbosity=verbosity, resultclass=_MergedResult)
+    return runner.run(suite)
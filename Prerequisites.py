@@ -1,6 +1,13 @@
 import unittest
-import time
-from unittest.mock import MagicMock
+
+from HypervisorBackend import HttpHypervisor, InMemoryHypervisor
+from KeywordTracer import TRACER
+from StoragePool import StoragePoolAllocator
+from TenantManifest import STORAGE_LIMIT, find_storage_violations, parse_manifest
+from TenantFilesystem import TenantFilesystem
+from TenantFixturePool import TenantFixturePool
+from TenantRegistry import TenantRegistry
+from VirtualClock import VirtualClock
 
 # --- Placeholder API/System Interaction Class ---
 # In a real environment, this class would connect to your
@@ -9,29 +16,72 @@ from unittest.mock import MagicMock
 # and Management Tools.
 class SystemManager:
     """Mock class for interacting with the underlying system components."""
-    def __init__(self):
-        self.tenant_data = {}
+    def __init__(self, clock=None, storage_pools=None, orchestrator_url=None):
+        self.tenant_data = TenantRegistry()
+        self.clock = clock if clock is not None else VirtualClock()
+        # Hypervisor API: the registry itself, or the stand-in orchestrator over HTTP (StandInOrchestrator.py)
+        self.hypervisor = (HttpHypervisor(orchestrator_url, self.tenant_data) if orchestrator_url
+                           else InMemoryHypervisor(self.tenant_data))
+        # HC-02: aggregate pool accounting ({pool name: capacity}); deprovision_tenant releases reservations
+        self.storage = StoragePoolAllocator(storage_pools)
+        # VC-01: tenant files written by write_fs, with copy-on-write snapshots
+        self.filesystem = TenantFilesystem()
+        # Opt-in keyword tracing (KEYWORD_TRACE=<path>); a no-op otherwise
+        TRACER.instrument(self)
 
     def provision_vm(self, tenant_id, resources):
         print(f"  -> Provisioning VM for Tenant {tenant_id}...")
-        if resources.get('storage') > 500:
-            return False, "Error: Storage limit exceeded."
-        self.tenant_data[tenant_id] = {'vm_status': 'running', 'fs_path': f'/mnt/shared/tenant_{tenant_id}/'}
+        storage = resources.get('storage', 0)
+        if storage > STORAGE_LIMIT:
+            return False, f"Error: VM storage limit exceeded (requested {storage}, limit {STORAGE_LIMIT})."
+        if self.storage.reserve(tenant_id, storage) is None:
+            return False, f"Error: Pool storage limit exceeded (requested {storage}, largest free {self.storage.largest_free()})."
+        self.hypervisor.provision(tenant_id, None)
+        return True, "Success"
+
+    def provision_vms(self, manifest):
+        entries = parse_manifest(manifest)
+        print(f"  -> Provisioning {len(entries)} tenant VMs...")
+        violations = find_storage_violations(entries)
+        if violations:
+            return False, f"Error: VM storage limit exceeded for {', '.join(violations)}."
+        rejected = self.storage.reserve_many((tenant_id, resources['storage']) for tenant_id, resources in entries)
+        if rejected:
+            return False, f"Error: Pool storage limit exceeded for {', '.join(rejected)}."
+        self.hypervisor.provision_many((tenant_id, None) for tenant_id, _ in entries)
         return True, "Success"
 
     def write_fs(self, tenant_id, path, data, target_tenant):
         if target_tenant != tenant_id:
             # Simulate ACL/permission check failure for cross-tenant access
             return False, f"Permission Denied: Tenant {tenant_id} cannot access {target_tenant}'s data."
+        self.filesystem.write(tenant_id, path, data)
         return True, "Data written successfully."
 
+    def file_exists(self, tenant_id, path):
+        return self.filesystem.exists(tenant_id, path)
+
+    def take_snapshot(self, tenant_id):
+        # VC-01: O(1) copy-on-write checkpoint of the tenant's files and resource config
+        return self.filesystem.snapshot(tenant_id, dict(self.tenant_data[tenant_id]['resources']))
+
+    def rollback_vm(self, tenant_id, snapshot_id=None):
+        try:
+            resources = self.filesystem.rollback(tenant_id, snapshot_id)
+        except LookupError:
+            return False
+        self.tenant_data[tenant_id]['resources'] = resources
+        return True
+
     def check_isolation(self, tenant_id_a, tenant_id_b):
         # Simulate checking resource usage; assumes isolation is maintained
         return True
 
     def deprovision_tenant(self, tenant_id):
         if tenant_id in self.tenant_data:
-            del self.tenant_data[tenant_id]
+            self.hypervisor.deprovision(tenant_id)
+            self.storage.release(tenant_id)
+            self.filesystem.drop(tenant_id)
             return True
         return False
 
@@ -45,11 +95,28 @@ class SystemManager:
 
     def simulate_host_failure(self):
         print("  -> Simulating Host Failure. Initiating HA failover...")
-        time.sleep(2) # Simulate failover time
+        self.clock.sleep(2) # Simulate failover time
         return True # Assume HA successfully recovers
 
     def check_vm_status(self, tenant_id):
-        return self.tenant_data.get(tenant_id, {}).get('vm_status', 'unknown')
+        return self.hypervisor.status(tenant_id)
 
 # Initialize the mock system manager
-system_manager = SystemManager()
\ No newline at end of file
+system_manager = SystemManager()
+
+# Tenants the suites start every test from; provisioned once per session
+BASELINE_TENANTS = {'TenantA': {'cpu': 2, 'mem': 4},
+                    'TenantB': {'cpu': 4, 'mem': 8},
+                    'TenantCONFIG': {'cpu': 1, 'mem': 2, 'storage': 50},
+                    'TenantCONTROL': {'cpu': 1, 'mem': 2, 'storage': 50},
+                    'TenantHA': {'cpu': 1, 'mem': 2}}
+
+
+def baseline(manager):
+    """Session-scoped fixture: provisions BASELINE_TENANTS on first use, then restores them in O(tenants touched)."""
+    pool = getattr(manager, 'fixture_pool', None)
+    if pool is None:
+        pool = manager.fixture_pool = TenantFixturePool(manager, BASELINE_TENANTS)
+    else:
+        pool.reset()
+    return manager
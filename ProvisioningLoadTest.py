@@ -0,0 +1,208 @@
+# ProvisioningLoadTest.py - Open-loop provisioning churn against the stand-in orchestrator
+#
+# Usage:
+#   python ProvisioningLoadTest.py --rate 500 --concurrency 8 --duration 10          # one fixed-rate run
+#   python ProvisioningLoadTest.py --ramp --rate 100 --max-rate 20000 --slo-ms 50    # find the saturation point
+#   add --backend memory to leave the HTTP backend out; --json report.json to keep the results
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from collections import namedtuple
+
+from ContentionProbe import percentile
+from HypervisorBackend import HttpHypervisor, InMemoryHypervisor
+from StandInOrchestrator import start_orchestrator
+from SystemManager import SystemManager
+
+# A step counts as sustained while it completes at least this share of the offered operations per second
+SUSTAINED_FRACTION = 0.95
+PERCENTILES = (0.5, 0.9, 0.99, 0.999)
+LOAD_RESOURCES = {'cpu': 1, 'mem': 2, 'storage': 10}
+
+StepResult = namedtuple('StepResult', [
+    'target_rate', 'achieved_rate', 'operations', 'errors', 'seconds',
+    'provision_ms', 'deprovision_ms', 'latency_ms', 'service_ms', 'sustained',
+])
+
+
+class ProvisioningLoad:
+    """
+    Drives provision_vm/deprovision_tenant churn at a fixed offered rate.
+
+    The load is open-loop: operation i is due at start + i / rate, whether or
+    not earlier operations have finished. Operations come in pairs. A worker
+    claims the next pair, provisions a fresh tenant when the first one is due,
+    waits for the backend to report it 'running', then deprovisions it when the
+    second one is due and waits for 'unknown'. At most `concurrency` operations
+    are in flight.
+
+    Latency is measured from the scheduled start, not from when a worker got
+    around to the operation. This corrects for coordinated omission: when the
+    system stalls, the operations queued behind the stall are charged for the
+    wait. Service time (actual start to finish) is kept alongside for
+    comparison; the gap between the two is queueing.
+    """
+
+    def __init__(self, manager, lock, concurrency=8):
+        self.manager = manager
+        self.lock = lock
+        self.concurrency = concurrency
+        self._tenant_ids = itertools.count()
+
+    def run(self, rate, duration, slo_ms=None):
+        """
+        Offers `rate` operations/s for `duration` seconds; returns a StepResult once
+        every operation finished. With `slo_ms`, a p99 above it makes the step unsustained.
+        """
+        pairs = max(int(rate * duration) // 2, 1)
+        claims = itertools.count()
+        samples = [[] for _ in range(self.concurrency)]
+        errors = [0] * self.concurrency
+        start = time.perf_counter() + 0.05   # let every worker reach its first deadline
+
+        def worker(index):
+            recorded = samples[index]
+            while True:
+                pair = next(claims)
+                if pair >= pairs:
+                    return
+                tenant_id = f'TenantLOAD{next(self._tenant_ids)}'
+                for kind, due in (('provision', start + 2 * pair / rate), ('deprovision', start + (2 * pair + 1) / rate)):
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    began = time.perf_counter()
+                    if not self._operate(kind, tenant_id):
+                        errors[index] += 1
+                    finished = time.perf_counter()
+                    recorded.append((kind, finished - due, finished - began, finished))
+
+        threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self._result(rate, start, [sample for recorded in samples for sample in recorded], sum(errors), slo_ms)
+
+    def ramp(self, rate, max_rate, duration, factor=2.0, slo_ms=None, refine=3):
+        """
+        Doubles (by `factor`) the offered rate from `rate` until a step is not
+        sustained or `max_rate` is passed, then bisects `refine` times between the
+        last sustained and the first unsustained rate. Returns (steps, saturation
+        rate); the saturation rate is None if even the first step was not sustained.
+        """
+        steps, sustained, failed = [], None, None
+        while rate <= max_rate:
+            step = self.run(rate, duration, slo_ms)
+            steps.append(step)
+            if not step.sustained:
+                failed = rate
+                break
+            sustained = rate
+            rate *= factor
+        if sustained is not None and failed is not None:
+            for _ in range(refine):
+                middle = (sustained + failed) / 2
+                step = self.run(middle, duration, slo_ms)
+                steps.append(step)
+                if step.sustained:
+                    sustained = middle
+                else:
+                    failed = middle
+        return steps, sustained
+
+    def _operate(self, kind, tenant_id):
+        manager = self.manager
+        if kind == 'provision':
+            with self.lock:
+                success, _ = manager.provision_vm(tenant_id, dict(LOAD_RESOURCES))
+            return success and manager.check_vm_status(tenant_id) == 'running'
+        with self.lock:
+            success = manager.deprovision_tenant(tenant_id)
+        return success and manager.check_vm_status(tenant_id) == 'unknown'
+
+    def _result(self, rate, start, samples, errors, slo_ms):
+        seconds = max(sample[3] for sample in samples) - start
+
+        def distribution(values):
+            values = sorted(values)
+            return {f'p{fraction * 100:g}': percentile(values, fraction) * 1e3 for fraction in PERCENTILES} | {
+                'max': values[-1] * 1e3}
+
+        achieved = len(samples) / seconds
+        latency_ms = distribution(latency for _, latency, _, _ in samples)
+        return StepResult(
+            target_rate=rate, achieved_rate=achieved, operations=len(samples), errors=errors, seconds=seconds,
+            provision_ms=distribution(latency for kind, latency, _, _ in samples if kind == 'provision'),
+            deprovision_ms=distribution(latency for kind, latency, _, _ in samples if kind == 'deprovision'),
+            latency_ms=latency_ms,
+            service_ms=distribution(service for _, _, service, _ in samples),
+            sustained=(achieved >= SUSTAINED_FRACTION * rate and errors == 0
+                       and (slo_ms is None or latency_ms['p99'] <= slo_ms)))
+
+
+STEP_HEADER = (f"{'offered/s':>9} {'done/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'p99.9 ms':>8} {'max ms':>8} "
+               f"{'svc p99 ms':>10} {'errors':>6} {'sustained':>9}")
+
+
+def format_step(step):
+    latency, service = step.latency_ms, step.service_ms
+    return (f"{step.target_rate:>9,.0f} {step.achieved_rate:>9,.0f} {latency['p50']:>8.2f} {latency['p99']:>8.2f} "
+            f"{latency['p99.9']:>8.2f} {latency['max']:>8.2f} {service['p99']:>10.2f} {step.errors:>6} "
+            f"{'yes' if step.sustained else 'NO':>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop provisioning throughput test")
+    parser.add_argument('--rate', type=float, default=200, help="Offered operations/s (the first step with --ramp)")
+    parser.add_argument('--concurrency', type=int, default=8, help="Operations in flight at most")
+    parser.add_argument('--duration', type=float, default=5, help="Seconds per step")
+    parser.add_argument('--backend', choices=('http', 'memory'), default='http')
+    parser.add_argument('--ramp', action='store_true', help="Raise the rate until it is no longer sustained")
+    parser.add_argument('--max-rate', type=float, default=50000)
+    parser.add_argument('--factor', type=float, default=2.0, help="Rate multiplier between ramp steps")
+    parser.add_argument('--slo-ms', type=float, default=None, help="A step whose p99 exceeds this is not sustained")
+    parser.add_argument('--json', help="Write the step results to this file")
+    args = parser.parse_args()
+
+    process = None
+    manager = SystemManager()
+    lock = threading.Lock()
+    if args.backend == 'http':
+        process, url = start_orchestrator()
+        manager.hypervisor = HttpHypervisor(url, manager.tenant_data, pool_size=args.concurrency, lock=lock)
+    else:
+        manager.hypervisor = InMemoryHypervisor(manager.tenant_data, lock=lock)
+    try:
+        load = ProvisioningLoad(manager, lock, args.concurrency)
+        load.run(min(args.rate, 1000), 0.5)   # warm-up: connections, first full sync
+        print(STEP_HEADER)
+        if args.ramp:
+            steps, saturation = load.ramp(args.rate, args.max_rate, args.duration, args.factor, args.slo_ms)
+        else:
+            steps = [load.run(args.rate, args.duration, args.slo_ms)]
+            saturation = args.rate if steps[0].sustained else None
+        for step in steps:
+            print(format_step(step))
+        peak = max(step.achieved_rate for step in steps)
+        if saturation is None:
+            print(f"Saturated below {steps[0].target_rate:,.0f} operations/s (peak completed {peak:,.0f}/s).")
+        else:
+            print(f"Sustained up to {saturation:,.0f} operations/s at concurrency {args.concurrency} "
+                  f"(peak completed {peak:,.0f}/s).")
+        if args.json:
+            with open(args.json, 'w') as handle:
+                json.dump({'backend': args.backend, 'concurrency': args.concurrency, 'saturation_rate': saturation,
+                           'peak_rate': peak, 'steps': [step._asdict() for step in steps]}, handle, indent=2)
+    finally:
+        manager.hypervisor.close()
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -2,9 +2,8 @@ class RedundancyChecks(unittest.TestCase):
     """Test Suite for Shutdown/Restart Scenarios and High Availability."""
 
     def setUp(self):
-        self.manager = system_manager
-        # Ensure a VM is running for the failure tests
-        self.manager.provision_vm('TenantHA', {'cpu': 1, 'mem': 2})
+        # TenantHA, the VM for the failure tests, comes from the baseline fleet
+        self.manager = baseline(system_manager)
         self.initial_status = self.manager.check_vm_status('TenantHA')
 
     def test_SR_01_host_failure_ha_failover(self):
@@ -20,7 +19,7 @@ class RedundancyChecks(unittest.TestCase):
         
         # 3. Check VM Status after simulated failover (should still be running on a new host)
         # In a real test, this checks the orchestrator API for the new host ID
-        time.sleep(1) # Wait for VM to be marked running again
+        self.manager.clock.sleep(1) # Wait for VM to be marked running again
         final_status = self.manager.check_vm_status('TenantHA')
         self.assertEqual(final_status, 'running', "VM failed to restart/migrate after host failure.")
     
@@ -61,12 +60,9 @@ class RedundancyChecks(unittest.TestCase):
         # In a real environment, you'd check immediate status after the crash injection.
         
         # 2. Wait for auto-restart (Hypervisor/Orchestrator feature)
-        time.sleep(1) 
+        self.manager.clock.sleep(1)
         final_status = self.manager.check_vm_status('TenantHA')
         self.assertEqual(final_status, 'running', "VM failed to auto-restart after guest OS crash.")
         
         # 3. Verify Isolation (other tenants should be unaffected)
         self.assertEqual(self.manager.check_vm_status('TenantA'), 'running', "Tenant A was affected by Tenant HA's crash.")
-
-    def tearDown(self):
-        self.manager.deprovision_tenant('TenantHA')
\ No newline at end of file
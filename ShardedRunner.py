@@ -0,0 +1,285 @@
+# ShardedRunner.py - Duration-balanced shards of the unittest and Robot suites, merged into one JUnit XML
+#
+# Usage:
+#   python ShardedRunner.py --shards 4 --junit Reports/junit.xml
+#   python ShardedRunner.py --shards 2 --no-robot          # unittest suites only
+
+import argparse
+import heapq
+import importlib
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from ParallelSuiteRunner import run_shard
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# module -> (test case classes, unit of work, module-global manager rebound per shard)
+# test_suite's cases share one dispatcher and depend on running in order, so they stay together
+UNITTEST_SUITES = {
+    'Test_automation_Suite': (('MultiTenancy', 'Utils', 'HardwareAndVMConfig', 'RedundancyChecks', 'Components'),
+                              'method', 'system_manager'),
+    'test_suite': (('TestInfrastructureOperations',), 'class', None),
+}
+# robot_test_suite_runner.robot is left out: it wraps the unittest suites this runner already runs
+ROBOT_SUITES = ('HardwareAndVMConfig.robot', 'MultiTenancy.robot', 'RedundancyChecks.robot', 'Utils.robot')
+
+DEFAULT_JUNIT = os.path.join('Reports', 'junit.xml')
+DEFAULT_DURATIONS = os.path.join('Reports', 'test_durations.json')
+# Estimate for a unit with no history when nothing else is known
+DEFAULT_UNIT_SECONDS = 1.0
+# Weight of the latest run when updating the history; damps one-off slow runs
+SMOOTHING = 0.5
+
+_JUNIT_OUTCOMES = {'failure': 'failure', 'unexpected_success': 'failure', 'error': 'error', 'skip': 'skipped'}
+
+
+def discover_units(include_robot=True):
+    """
+    Lists the units of work: 'module:Class.method' or 'module:Class' for
+    unittest cases, 'robot:<file>' for Robot suites.
+    """
+    units = []
+    loader = unittest.defaultTestLoader
+    for module_name, (case_names, shard_by, _) in UNITTEST_SUITES.items():
+        module = importlib.import_module(module_name)
+        for case_name in case_names:
+            if shard_by == 'class':
+                units.append(f'{module_name}:{case_name}')
+            else:
+                units.extend(f'{module_name}:{case_name}.{method}'
+                             for method in loader.getTestCaseNames(getattr(module, case_name)))
+    if include_robot:
+        units.extend(f'robot:{name}' for name in ROBOT_SUITES)
+    return units
+
+
+def load_durations(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_durations(path, durations, measured):
+    """Folds this run's unit times into the history and writes it back."""
+    for unit, seconds in measured.items():
+        previous = durations.get(unit)
+        durations[unit] = seconds if previous is None else SMOOTHING * seconds + (1 - SMOOTHING) * previous
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as handle:
+        json.dump({unit: round(seconds, 4) for unit, seconds in sorted(durations.items())}, handle, indent=2)
+
+
+def balance(units, durations, shards):
+    """
+    Splits `units` into at most `shards` lists with near-equal expected time.
+
+    Longest-processing-time first: units are taken from slowest to fastest and
+    each goes to the shard with the least expected time so far, which keeps the
+    slowest shard within 4/3 of the best possible split. Units with no history
+    are estimated at the median of the known ones. Returns (expected seconds,
+    units) per shard, with the units in their discovery order.
+    """
+    known = sorted(durations[unit] for unit in units if unit in durations)
+    default = known[len(known) // 2] if known else DEFAULT_UNIT_SECONDS
+    order = {unit: index for index, unit in enumerate(units)}
+    heap = [(0.0, index, []) for index in range(max(1, min(shards, len(units))))]
+    for unit in sorted(units, key=lambda unit: (-durations.get(unit, default), order[unit])):
+        expected, index, members = heapq.heappop(heap)
+        members.append(unit)
+        heapq.heappush(heap, (expected + durations.get(unit, default), index, members))
+    return [(expected, sorted(members, key=order.get))
+            for expected, _, members in sorted(heap, key=lambda shard: shard[1])]
+
+
+# --- Worker side ---
+
+def run_units(units):
+    """
+    Worker entry point: runs one shard's units in order.
+
+    Returns (unit, cases, seconds) per unit, where cases are
+    (classname, name, outcome, detail, seconds) tuples.
+    """
+    results = []
+    batch, batch_module = [], None
+
+    def flush():
+        if batch:
+            results.extend(_run_unittest_batch(batch_module, batch))
+            batch.clear()
+
+    for unit in units:
+        kind, _, name = unit.partition(':')
+        if kind == 'robot':
+            flush()
+            results.append(_run_robot_suite(unit, name))
+        else:
+            if kind != batch_module:
+                flush()
+                batch_module = kind
+            batch.append((unit, name))
+    flush()
+    return results
+
+
+def _run_unittest_batch(module_name, batch):
+    # One run_shard call per module, so the shard shares one manager like a serial run
+    manager_attr = UNITTEST_SUITES[module_name][2]
+    started = time.perf_counter()
+    records = run_shard(module_name, [name for _, name in batch], manager_attr=manager_attr)
+    elapsed = time.perf_counter() - started
+    per_unit = {unit: [] for unit, _ in batch}
+    owners = sorted(((f'{module_name}.{name}', unit) for unit, name in batch), key=lambda owner: -len(owner[0]))
+    stray = []
+    for test_id, _name, _description, outcome, detail, duration in records:
+        owner = next((unit for prefix, unit in owners if test_id.startswith(prefix)), None)
+        case = _case_from_test_id(test_id) + (outcome, detail, duration)
+        (per_unit[owner] if owner else stray).append(case)
+    results = [(unit, cases, sum(case[4] for case in cases)) for unit, cases in per_unit.items()]
+    if stray:
+        # Module-level failures (an import error, a failing setUpClass) are charged to the batch's first unit
+        first_unit, cases, seconds = results[0]
+        results[0] = (first_unit, stray + cases, seconds)
+    if len(results) == 1:
+        # A class-level unit also pays for its setUpClass/tearDownClass
+        results[0] = (results[0][0], results[0][1], elapsed)
+    return results
+
+
+def _case_from_test_id(test_id):
+    base, _, subtest = test_id.partition(' ')
+    classname, _, name = base.rpartition('.')
+    if subtest:
+        name = f'{name} {subtest}'
+    return (classname or name, name)
+
+
+def _run_robot_suite(unit, filename):
+    started = time.perf_counter()
+    if importlib.util.find_spec('robot') is None:
+        return unit, [(os.path.splitext(filename)[0], filename, 'skip',
+                       "Robot Framework is not installed", 0.0)], 0.0
+    with tempfile.TemporaryDirectory(prefix='robot-shard-') as scratch:
+        # Robot suites keep tenant trees under ${TEMPDIR}; give each process its own
+        environment = dict(os.environ, TMPDIR=scratch, TEMP=scratch, TMP=scratch)
+        xunit = os.path.join(scratch, 'xunit.xml')
+        completed = subprocess.run(
+            [sys.executable, '-m', 'robot', '--outputdir', scratch, '--log', 'NONE', '--report', 'NONE',
+             '--xunit', xunit, '--pythonpath', HERE, '--console', 'none', os.path.join(HERE, filename)],
+            cwd=HERE, env=environment, capture_output=True, text=True)
+        elapsed = time.perf_counter() - started
+        if not os.path.exists(xunit):
+            return unit, [(os.path.splitext(filename)[0], filename, 'error',
+                           f"robot exited with {completed.returncode}:\n{completed.stdout}{completed.stderr}",
+                           elapsed)], elapsed
+        return unit, _parse_xunit(xunit), elapsed
+
+
+def _parse_xunit(path):
+    cases = []
+    for testcase in ET.parse(path).iter('testcase'):
+        outcome, detail = 'success', ''
+        for child in testcase:
+            if child.tag in ('failure', 'error', 'skipped'):
+                outcome = {'failure': 'failure', 'error': 'error', 'skipped': 'skip'}[child.tag]
+                detail = child.get('message') or child.text or ''
+                break
+        cases.append((testcase.get('classname'), testcase.get('name'), outcome, detail,
+                      float(testcase.get('time') or 0.0)))
+    return cases
+
+
+# --- Report ---
+
+def write_junit(path, shards, wall_seconds):
+    """Writes one <testsuite> per shard, so the report also shows how the shards were balanced."""
+    root = ET.Element('testsuites', name='ShardedRunner', time=f'{wall_seconds:.3f}')
+    totals = dict.fromkeys(('tests', 'failures', 'errors', 'skipped'), 0)
+    hostname = socket.gethostname()
+    for index, (started_at, seconds, results) in enumerate(shards):
+        suite = ET.SubElement(root, 'testsuite', name=f'shard-{index}', hostname=hostname,
+                              timestamp=started_at, time=f'{seconds:.3f}')
+        counts = dict.fromkeys(totals, 0)
+        for _unit, cases, _seconds in results:
+            for classname, name, outcome, detail, duration in cases:
+                testcase = ET.SubElement(suite, 'testcase', classname=classname, name=name, time=f'{duration:.3f}')
+                counts['tests'] += 1
+                tag = _JUNIT_OUTCOMES.get(outcome)
+                if tag:
+                    counts['failures' if tag == 'failure' else 'errors' if tag == 'error' else 'skipped'] += 1
+                    lines = detail.strip().splitlines()
+                    element = ET.SubElement(testcase, tag, message=lines[-1] if lines else outcome)
+                    if tag != 'skipped':
+                        element.text = detail
+        for key, value in counts.items():
+            suite.set(key, str(value))
+            totals[key] += value
+    for key, value in totals.items():
+        root.set(key, str(value))
+    ET.indent(root)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    ET.ElementTree(root).write(path, encoding='utf-8', xml_declaration=True)
+    return totals
+
+
+def _run_timed_shard(units):
+    started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    started = time.perf_counter()
+    results = run_units(units)
+    return started_at, time.perf_counter() - started, results
+
+
+def run_sharded(shards, junit_path=DEFAULT_JUNIT, durations_path=DEFAULT_DURATIONS, include_robot=True):
+    """Runs every unit across `shards` processes; returns the JUnit totals."""
+    units = discover_units(include_robot)
+    durations = load_durations(durations_path)
+    plan = balance(units, durations, shards)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=len(plan)) as pool:
+        outcomes = list(pool.map(_run_timed_shard, [members for _, members in plan]))
+    wall = time.perf_counter() - started
+
+    totals = write_junit(junit_path, outcomes, wall)
+    measured = {unit: seconds for _, _, results in outcomes for unit, _, seconds in results}
+    if durations_path:
+        save_durations(durations_path, durations, measured)
+
+    print(f"{'shard':<8} {'units':>6} {'tests':>6} {'expected s':>11} {'actual s':>9}")
+    for index, ((expected, members), (_, seconds, results)) in enumerate(zip(plan, outcomes)):
+        tests = sum(len(cases) for _, cases, _ in results)
+        print(f"{index:<8} {len(members):>6} {tests:>6} {expected:>11.2f} {seconds:>9.2f}")
+    print(f"\n{totals['tests']} tests: {totals['failures']} failures, {totals['errors']} errors, "
+          f"{totals['skipped']} skipped")
+    print(f"Wall time {wall:.2f}s for {sum(measured.values()):.2f}s of tests across {len(plan)} shard(s)")
+    print(f"JUnit report written to {junit_path}")
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs the unittest and Robot suites in duration-balanced shards")
+    parser.add_argument('--shards', type=int, default=os.cpu_count() or 1, help="Concurrent shards (default: CPUs)")
+    parser.add_argument('--junit', default=DEFAULT_JUNIT, help="Merged JUnit XML report")
+    parser.add_argument('--durations', default=DEFAULT_DURATIONS,
+                        help="Per-unit duration history used for balancing; updated after each run")
+    parser.add_argument('--no-robot', action='store_true', help="Only run the unittest suites")
+    args = parser.parse_args(argv)
+
+    totals = run_sharded(args.shards, args.junit, args.durations, include_robot=not args.no_robot)
+    return 1 if totals['failures'] or totals['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,271 @@
+# SoakRunner.py - Memory-leak soak: repeats a suite or keyword sequence under tracemalloc
+#
+# Usage:
+#   python SoakRunner.py --iterations 5000                                  # built-in provisioning churn cycle
+#   python SoakRunner.py --keywords churn.txt --library TestAutomationLibrary --iterations 20000
+#   python SoakRunner.py --suite Test_automation_Suite.Utils --iterations 200 --interval 20
+#
+# Exit status 1 when retained memory grows faster than --max-slope bytes per iteration,
+# or when a test or keyword failed.
+
+import argparse
+import fnmatch
+import gc
+import importlib
+import json
+import linecache
+import re
+import sys
+import time
+import tracemalloc
+import unittest
+from collections import namedtuple
+
+# Retained bytes per iteration above which the run counts as leaking
+DEFAULT_MAX_SLOPE = 256
+DEFAULT_TOP = 15
+
+# One churn cycle through the tenants the suites create and delete, in Robot keyword syntax
+DEFAULT_CHURN = """
+Provision VM    TenantD_Temp    cpu=1|mem=2
+Deprovision Tenant    TenantD_Temp
+Provision VM    TenantDEL    cpu=1|mem=1|storage=10
+Deprovision Tenant    TenantDEL
+Run Keyword And Expect Error    *Storage limit exceeded*    Provision VM    TenantOVER    cpu=1|mem=2|storage=600
+Check VM Status    TenantA
+"""
+
+# The soak's own bookkeeping and import machinery are not the code under test
+_IGNORED = (tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, linecache.__file__),
+            tracemalloc.Filter(False, unittest.__file__.rsplit('__init__', 1)[0] + '*'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, '<unknown>'),
+            tracemalloc.Filter(False, __file__))
+
+Sample = namedtuple('Sample', ['iteration', 'traced_bytes'])
+Growth = namedtuple('Growth', ['location', 'size_diff', 'count_diff'])
+SoakReport = namedtuple('SoakReport', [
+    'iterations', 'warmup', 'samples', 'slope', 'max_slope', 'growth', 'per_item', 'errors', 'seconds', 'leaking',
+])
+
+
+class KeywordSequence:
+    """
+    Robot-style keyword lines called on a library instance, one iteration per pass.
+
+    Each line is a keyword and its arguments separated by two or more spaces,
+    as in a .robot file; names map to methods the way Robot maps them
+    ('Provision VM' -> provision_vm). 'Run Keyword And Expect Error    <glob>'
+    is understood, so expected failures do not count as errors. Every pass
+    starts with the library's _start_test listener hook, as a Robot test would.
+    """
+
+    def __init__(self, library, text=DEFAULT_CHURN):
+        self.library = library
+        self.lines = [re.split(r' {2,}|\t+', line.strip()) for line in text.splitlines()
+                      if line.strip() and not line.lstrip().startswith('#')]
+        self.per_item = {}   # line -> [calls, retained bytes]
+        self.errors = {}     # line -> [count, first message]
+
+    def run_once(self):
+        start_test = getattr(self.library, '_start_test', None)
+        if start_test is not None:
+            start_test('soak', {})
+        for line in self.lines:
+            label = '    '.join(line)
+            before = tracemalloc.get_traced_memory()[0]
+            try:
+                self._call(line)
+            except Exception as error:
+                _count(self.errors, label, f'{type(error).__name__}: {error}')
+            stats = self.per_item.setdefault(label, [0, 0])
+            stats[0] += 1
+            stats[1] += tracemalloc.get_traced_memory()[0] - before
+
+    def _call(self, line):
+        name, *args = line
+        if _method_name(name) == 'run_keyword_and_expect_error':
+            pattern, *line = args
+            try:
+                self._call(line)
+            except Exception as error:
+                if fnmatch.fnmatchcase(str(error), pattern):
+                    return
+                raise AssertionError(f"Expected error '{pattern}' but got '{error}'.") from error
+            raise AssertionError(f"Expected error '{pattern}' did not occur.")
+        return getattr(self.library, _method_name(name))(*args)
+
+
+class SuiteIterations:
+    """A unittest suite (module, class or single test) run once per pass, measured test by test."""
+
+    def __init__(self, name):
+        self.tests = list(_flatten(unittest.defaultTestLoader.loadTestsFromName(name)))
+        self.per_item = {}   # test id -> [runs, retained bytes]
+        self.errors = {}     # test id -> [count, first message]
+
+    def run_once(self):
+        for test in self.tests:
+            result = unittest.TestResult()
+            before = tracemalloc.get_traced_memory()[0]
+            test.run(result)
+            stats = self.per_item.setdefault(test.id(), [0, 0])
+            stats[0] += 1
+            stats[1] += tracemalloc.get_traced_memory()[0] - before
+            for _, detail in result.failures + result.errors:
+                _count(self.errors, test.id(), detail.strip().splitlines()[-1])
+
+
+class Soak:
+    """
+    Runs a step (KeywordSequence or SuiteIterations) `iterations` times under
+    tracemalloc and decides whether it leaks.
+
+    The first `warmup` iterations fill caches, lazy state and interned strings
+    and are not judged. From then on, every `interval` iterations the garbage
+    collector runs and the traced size is sampled. The least-squares slope of
+    those samples, in bytes per iteration, is compared with `max_slope`. A
+    snapshot is taken at the end of warm-up and at the end of the run; their
+    difference, grouped by file and line, shows where the retained memory was
+    allocated. Per-test or per-keyword retained bytes are kept as well.
+    """
+
+    def __init__(self, step, iterations, interval=None, warmup=None, max_slope=DEFAULT_MAX_SLOPE, top=DEFAULT_TOP,
+                 frames=1, progress=None):
+        self.step = step
+        self.iterations = iterations
+        self.interval = interval or max(iterations // 20, 1)
+        self.warmup = warmup if warmup is not None else min(max(iterations // 10, 1), 1000)
+        self.max_slope = max_slope
+        self.top = top
+        self.frames = frames
+        self.progress = progress
+
+    def run(self):
+        started = time.perf_counter()
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start(self.frames)
+        try:
+            for _ in range(self.warmup):
+                self.step.run_once()
+            self.step.per_item.clear()
+            gc.collect()
+            baseline = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+            samples = [Sample(0, tracemalloc.get_traced_memory()[0])]
+            for iteration in range(1, self.iterations + 1):
+                self.step.run_once()
+                if iteration % self.interval == 0 or iteration == self.iterations:
+                    gc.collect()
+                    samples.append(Sample(iteration, tracemalloc.get_traced_memory()[0]))
+                    if self.progress:
+                        self.progress(samples[-1])
+            final = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+
+        growth = [Growth(f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}', stat.size_diff, stat.count_diff)
+                  for stat in final.compare_to(baseline, 'lineno') if stat.size_diff > 0][:self.top]
+        per_item = {name: {'runs': runs, 'retained_bytes_per_run': retained / runs}
+                    for name, (runs, retained) in self.step.per_item.items()}
+        slope = _slope(samples)
+        return SoakReport(
+            iterations=self.iterations, warmup=self.warmup, samples=samples, slope=slope, max_slope=self.max_slope,
+            growth=growth, per_item=per_item,
+            errors={name: {'count': count, 'first': first} for name, (count, first) in self.step.errors.items()},
+            seconds=time.perf_counter() - started, leaking=slope > self.max_slope)
+
+
+def format_report(report, top=DEFAULT_TOP):
+    first, last = report.samples[0], report.samples[-1]
+    lines = [f"{report.iterations:,} iterations after {report.warmup:,} warm-up in {report.seconds:.1f} s; "
+             f"traced {first.traced_bytes / 1024:,.0f} KiB -> {last.traced_bytes / 1024:,.0f} KiB",
+             f"Slope: {report.slope:,.1f} bytes/iteration (limit {report.max_slope:,}) -> "
+             f"{'LEAKING' if report.leaking else 'ok'}",
+             "", f"{'Growth by allocation site':<70} {'bytes':>12} {'blocks':>8}"]
+    lines += [f"{_shorten(growth.location):<70} {growth.size_diff:>+12,} {growth.count_diff:>+8,}"
+              for growth in report.growth]
+    ranked = sorted(report.per_item.items(), key=lambda item: -item[1]['retained_bytes_per_run'])[:top]
+    lines += ["", f"{'Retained per run, before gc':<70} {'bytes':>12} {'runs':>8}"]
+    lines += [f"{_shorten(name):<70} {stats['retained_bytes_per_run']:>+12,.0f} {stats['runs']:>8,}"
+              for name, stats in ranked]
+    if report.errors:
+        lines += ["", "Errors:"]
+        lines += [f"  {name}: {stats['count']}x, first: {stats['first']}" for name, stats in report.errors.items()]
+    return '\n'.join(lines)
+
+
+def _count(errors, name, message):
+    entry = errors.setdefault(name, [0, message])
+    entry[0] += 1
+
+
+def _method_name(keyword):
+    return keyword.strip().lower().replace(' ', '_')
+
+
+def _flatten(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _flatten(test)
+        else:
+            yield test
+
+
+def _slope(samples):
+    """Least-squares slope of traced bytes over iterations."""
+    if len(samples) < 2:
+        return 0.0
+    mean_x = sum(sample.iteration for sample in samples) / len(samples)
+    mean_y = sum(sample.traced_bytes for sample in samples) / len(samples)
+    covariance = sum((sample.iteration - mean_x) * (sample.traced_bytes - mean_y) for sample in samples)
+    variance = sum((sample.iteration - mean_x) ** 2 for sample in samples)
+    return covariance / variance if variance else 0.0
+
+
+def _shorten(text, width=70):
+    return text if len(text) <= width else '...' + text[-(width - 3):]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory-leak soak under tracemalloc")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--suite', help="unittest name to repeat: module, module.Class or module.Class.test")
+    target.add_argument('--keywords', help="File of Robot-style keyword lines (default: built-in churn cycle)")
+    parser.add_argument('--library', default='SystemManagerLibrary', help="Keyword library module (class of the same name)")
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--interval', type=int, help="Iterations between samples (default: iterations / 20)")
+    parser.add_argument('--warmup', type=int, help="Unjudged iterations first (default: iterations / 10, at most 1000)")
+    parser.add_argument('--max-slope', type=float, default=DEFAULT_MAX_SLOPE, help="Bytes per iteration")
+    parser.add_argument('--frames', type=int, default=1, help="Traceback depth recorded per allocation")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP)
+    parser.add_argument('--json', help="Write the report to this file")
+    args = parser.parse_args()
+
+    if args.suite:
+        step = SuiteIterations(args.suite)
+    else:
+        library = getattr(importlib.import_module(args.library), args.library)()
+        text = DEFAULT_CHURN
+        if args.keywords:
+            with open(args.keywords) as handle:
+                text = handle.read()
+        step = KeywordSequence(library, text)
+
+    def progress(sample):
+        sys.stderr.write(f"  iteration {sample.iteration:>8,}: {sample.traced_bytes / 1024:>10,.0f} KiB traced\n")
+
+    report = Soak(step, args.iterations, args.interval, args.warmup, args.max_slope, args.top, args.frames,
+                  progress).run()
+    print(format_report(report, args.top))
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump(report._asdict(), handle, indent=2)
+    sys.exit(1 if report.leaking or report.errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# StandInOrchestrator.py - Small local HTTP service standing in for the hypervisor/orchestrator API
+#
+# Usage: python StandInOrchestrator.py [--host 127.0.0.1] [--port 0]   (prints the URL it listens on)
+
+import argparse
+import json
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from TenantRegistry import TenantRegistry
+
+
+class _OrchestratorHandler(BaseHTTPRequestHandler):
+    """
+    JSON over HTTP/1.1 with keep-alive, one thread per connection.
+
+        GET  /health       -> {"tenants", "version", "connections", "requests"}
+        GET  /vms/<id>     -> {"status", "resources"}        (<id> percent-encoded; 'unknown' and null if absent)
+        POST /vms:status   {"ids": [...]} -> {"statuses": [...]}
+        POST /vms:sync     {"changes": [[id, status|null, resources|null], ...], "reset": bool}
+                           -> {"applied", "version"}
+
+    Requests on a connection are answered in order, so clients may pipeline them.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; with Nagle on, the body waits for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def _dispatch(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = json.loads(self.rfile.read(length)) if length else {}
+        registry = server.registry
+        with server.lock:
+            server.requests += 1
+            if self.command == 'GET' and self.path == '/health':
+                body = {'tenants': len(registry), 'version': registry.version,
+                        'connections': server.connections, 'requests': server.requests}
+            elif self.command == 'GET' and self.path.startswith('/vms/'):
+                tenant_id = unquote(self.path[len('/vms/'):])
+                body = {'status': registry.status(tenant_id),
+                        'resources': dict(registry[tenant_id]['resources']) if tenant_id in registry else None}
+            elif self.command == 'POST' and self.path == '/vms:status':
+                body = {'statuses': [registry.status(tenant_id) for tenant_id in payload['ids']]}
+            elif self.command == 'POST' and self.path == '/vms:sync':
+                body = {'applied': _apply(registry, payload['changes'], payload.get('reset', False)),
+                        'version': registry.version}
+            else:
+                body = None
+        if body is None:
+            self._respond(404, {'error': f"No route for {self.command} {self.path}"})
+        else:
+            self._respond(200, body)
+
+    def _respond(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _apply(registry, changes, reset):
+    """Applies net per-tenant states: a status creates the VM or replaces its status and resources, None deletes it."""
+    if reset:
+        for tenant_id in list(registry):
+            del registry[tenant_id]
+    for tenant_id, status, resources in changes:
+        if status is None:
+            if tenant_id in registry:
+                del registry[tenant_id]
+        else:
+            registry.add(tenant_id, resources, status)
+    return len(changes)
+
+
+class StandInOrchestrator(ThreadingHTTPServer):
+    """The stand-in service: VM records in a TenantRegistry behind one lock."""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0):
+        super().__init__((host, port), _OrchestratorHandler)
+        self.registry = TenantRegistry()
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+def start_orchestrator(host='127.0.0.1'):
+    """Runs the stand-in in a child process; returns (process, base URL). Stop it with process.terminate()."""
+    process = subprocess.Popen([sys.executable, __file__, '--host', host, '--port', '0'],
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith('Listening on '):
+        process.kill()
+        raise RuntimeError(f"Stand-in orchestrator failed to start: {line!r}")
+    return process, line.split()[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in hypervisor/orchestrator service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0, help="0 picks a free port")
+    args = parser.parse_args()
+
+    server = StandInOrchestrator(args.host, args.port)
+    print(f"Listening on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
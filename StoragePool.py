@@ -0,0 +1,151 @@
+# StoragePool.py - Aggregate storage-pool accounting behind the HC-02 checks
+
+from bisect import bisect_left, insort
+
+# Capacity of the pool every manager starts with when no pools are configured: unbounded, so only
+# the per-VM STORAGE_LIMIT applies until a test configures real pools
+DEFAULT_POOL_CAPACITY = float('inf')
+
+
+class StoragePool:
+    """One storage pool: a fixed capacity and the amount currently reserved."""
+
+    __slots__ = ('name', 'capacity', 'used')
+
+    def __init__(self, name, capacity):
+        if capacity < 0:
+            raise ValueError(f"Pool {name!r} capacity must be non-negative (got {capacity}).")
+        self.name = name
+        self.capacity = capacity
+        self.used = 0
+
+    @property
+    def free(self):
+        return self.capacity - self.used
+
+    def __repr__(self):
+        return f'StoragePool({self.name!r}, used={self.used}/{self.capacity})'
+
+
+class StoragePoolAllocator:
+    """
+    Tracks per-tenant storage reservations across one or more pools.
+
+    Pools are kept in a list sorted by free capacity, so admission is a bisect
+    (best fit: the pool with the least free space that still fits the request).
+    Reserving and releasing re-index only the one pool that changed.
+    """
+
+    def __init__(self, pools=None):
+        self._pools = {}
+        self._free_index = []      # sorted [(free, pool_name)]
+        self._reservations = {}    # tenant_id -> (pool_name, amount)
+        for name, capacity in (pools or {'default': DEFAULT_POOL_CAPACITY}).items():
+            self.add_pool(name, capacity)
+
+    def add_pool(self, name, capacity):
+        if name in self._pools:
+            raise ValueError(f"Storage pool {name!r} already exists.")
+        pool = self._pools[name] = StoragePool(name, capacity)
+        insort(self._free_index, (pool.free, name))
+        return pool
+
+    def pool(self, name):
+        return self._pools[name]
+
+    def pools(self):
+        return list(self._pools.values())
+
+    def free(self, pool_name=None):
+        """Free capacity of one pool, or of all pools together."""
+        if pool_name is not None:
+            return self._pools[pool_name].free
+        return sum(pool.free for pool in self._pools.values())
+
+    def largest_free(self):
+        """The biggest request that any single pool could currently admit."""
+        return self._free_index[-1][0] if self._free_index else 0
+
+    def reservation(self, tenant_id):
+        """Returns (pool_name, amount) reserved for `tenant_id`, or None."""
+        return self._reservations.get(tenant_id)
+
+    def reserve(self, tenant_id, amount, pool_name=None):
+        """
+        Reserves `amount` for `tenant_id` and returns the pool name, or None if no pool fits.
+
+        Re-reserving a tenant replaces its previous reservation; if the new request
+        does not fit, the previous reservation is kept. A negative amount raises ValueError.
+        """
+        _check_amount(tenant_id, amount)
+        previous = self._reservations.get(tenant_id)
+        if previous is not None:
+            self.release(tenant_id)
+        pool = self._find_pool(amount, pool_name)
+        if pool is None:
+            if previous is not None:
+                self._take(tenant_id, self._pools[previous[0]], previous[1])
+            return None
+        self._take(tenant_id, pool, amount)
+        return pool.name
+
+    def reserve_many(self, entries):
+        """
+        Reserves every (tenant_id, amount) pair, or nothing at all.
+
+        Returns the list of tenant IDs that did not fit; an empty list means
+        every reservation was committed. A negative amount raises ValueError
+        before anything is reserved.
+        """
+        entries = list(entries)
+        for tenant_id, amount in entries:
+            _check_amount(tenant_id, amount)
+        committed, rejected = [], []
+        for tenant_id, amount in entries:
+            previous = self._reservations.get(tenant_id)
+            if self.reserve(tenant_id, amount) is None:
+                rejected.append(tenant_id)
+            else:
+                committed.append((tenant_id, previous))
+        if rejected:
+            for tenant_id, previous in reversed(committed):
+                self.release(tenant_id)
+                if previous is not None:
+                    self._take(tenant_id, self._pools[previous[0]], previous[1])
+        return rejected
+
+    def release(self, tenant_id):
+        """Releases the tenant's reservation and returns the amount freed (0 if none)."""
+        reservation = self._reservations.pop(tenant_id, None)
+        if reservation is None:
+            return 0
+        pool_name, amount = reservation
+        pool = self._pools[pool_name]
+        self._reindex(pool, pool.used - amount)
+        return amount
+
+    # --- Internals ---
+
+    def _find_pool(self, amount, pool_name):
+        if pool_name is not None:
+            pool = self._pools[pool_name]
+            return pool if pool.free >= amount else None
+        position = bisect_left(self._free_index, (amount, ''))
+        if position == len(self._free_index):
+            return None
+        return self._pools[self._free_index[position][1]]
+
+    def _take(self, tenant_id, pool, amount):
+        self._reindex(pool, pool.used + amount)
+        self._reservations[tenant_id] = (pool.name, amount)
+
+    def _reindex(self, pool, used):
+        position = bisect_left(self._free_index, (pool.free, pool.name))
+        del self._free_index[position]
+        pool.used = used
+        insort(self._free_index, (pool.free, pool.name))
+
+
+def _check_amount(tenant_id, amount):
+    if amount < 0:
+        raise ValueError(f"Storage reservation for {tenant_id!r} must be non-negative (got {amount}).")
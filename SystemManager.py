@@ -0,0 +1,213 @@
+# SystemManager.py - The suite's in-process stand-in for the hypervisor, filesystem and VM APIs
+#
+# Shared by Test_automation_Suite.py and the load, churn and fault-injection tools.
+
+from BackupEngine import BackupEngine
+from CommandPolicy import COMMAND_POLICY
+from ContentionProbe import ContentionProbe
+from HypervisorBackend import HttpHypervisor, InMemoryHypervisor
+from KeywordTracer import TRACER
+from LocalTenantFilesystem import LocalTenantFilesystem
+from LogLeakageScanner import LogLeakageScanner
+from StoragePool import StoragePoolAllocator
+from TenantManifest import STORAGE_LIMIT, find_storage_violations, parse_manifest
+from TenantFilesystem import TenantFilesystem
+from TenantRegistry import TenantRegistry
+from TraversalGuard import TraversalGuard
+from VirtualClock import VirtualClock
+
+
+# --- Placeholder API/System Interaction Class ---
+# This class mocks the interaction with Hypervisor API, FS Management, and VM execution.
+class SystemManager:
+    """Mock class for interacting with the underlying system components."""
+    def __init__(self, clock=None, storage_pools=None, contention_probe=None, fs_root=None, orchestrator_url=None):
+        self.tenant_data = TenantRegistry()
+        self.clock = clock if clock is not None else VirtualClock()
+        # Hypervisor API: the registry itself, or the stand-in orchestrator over HTTP (StandInOrchestrator.py).
+        # VMs are provisioned, deprovisioned and failed through it; tenant_data is its local copy.
+        self.hypervisor = (HttpHypervisor(orchestrator_url, self.tenant_data) if orchestrator_url
+                           else InMemoryHypervisor(self.tenant_data))
+        # HC-02: aggregate pool accounting ({pool name: capacity}); deprovision_tenant releases reservations
+        self.storage = StoragePoolAllocator(storage_pools)
+        # VC-01: tenant files written by write_fs, with copy-on-write snapshots
+        self.filesystem = TenantFilesystem()
+        # UT-03: chunked, deduplicating backups (temporary local store unless one is assigned)
+        self.backups = BackupEngine()
+        # MT-01/SR-02 on disk (optional): write_fs performs real writes into fs_path trees under fs_root
+        self.local_fs = LocalTenantFilesystem(fs_root, self.tenant_data) if fs_root else None
+        # UT-07: with a local backend, traversal checks also follow symlinks in the tenant's tree
+        self.traversal_guard = TraversalGuard(self.local_fs) if fs_root else None
+        # MT-02 load mode (optional): a ContentionProbe turns check_isolation into a real QoS measurement
+        self.contention_probe = contention_probe
+        # Opt-in keyword tracing (KEYWORD_TRACE=<path>); a no-op otherwise
+        TRACER.instrument(self)
+        self.provision_vms({'TenantA': {'cpu': 2, 'mem': 4},
+                            'TenantB': {'cpu': 4, 'mem': 8},
+                            'TenantC': {'cpu': 1, 'mem': 2}})
+
+    def provision_vm(self, tenant_id, resources):
+        storage = resources.get('storage', 0)
+        if storage > STORAGE_LIMIT: # Mock per-VM storage limit for HC-02
+            return False, f"Error: VM storage limit exceeded (requested {storage}, limit {STORAGE_LIMIT})."
+        previous = {tenant_id: self.storage.reservation(tenant_id)}
+        if self.storage.reserve(tenant_id, storage) is None: # HC-02: pool overcommit
+            return False, f"Error: Pool storage limit exceeded (requested {storage}, largest free {self.storage.largest_free()})."
+        try:
+            self.hypervisor.provision(tenant_id, resources)
+        except BaseException:
+            self._restore_reservations(previous)
+            raise
+        return True, "Success"
+
+    def provision_vms(self, manifest):
+        # Bulk UT-01/HC-02: every tenant in the manifest is committed, or none is
+        entries = parse_manifest(manifest)
+        violations = find_storage_violations(entries)
+        if violations:
+            return False, f"Error: VM storage limit exceeded for {', '.join(violations)}."
+        previous = {}
+        for tenant_id, _ in entries:
+            previous.setdefault(tenant_id, self.storage.reservation(tenant_id))
+        rejected = self.storage.reserve_many((tenant_id, resources['storage']) for tenant_id, resources in entries)
+        if rejected:
+            return False, f"Error: Pool storage limit exceeded for {', '.join(rejected)}."
+        try:
+            self.hypervisor.provision_many(entries)
+        except BaseException:
+            self._restore_reservations(previous)
+            raise
+        return True, "Success"
+
+    def _restore_reservations(self, previous):
+        # The hypervisor refused: put back the reservations ({tenant_id: (pool, amount) or None}) held before
+        for tenant_id in previous:
+            self.storage.release(tenant_id)
+        for tenant_id, reservation in previous.items():
+            if reservation is not None:
+                self.storage.reserve(tenant_id, reservation[1], reservation[0])
+
+    def write_fs(self, tenant_id, path, data, target_tenant):
+        if self.local_fs is not None:
+            # SR-02: no I/O while the tenant's shared filesystem is down
+            if self.tenant_data.status(tenant_id) == 'io_suspended':
+                return False, f"I/O error: {tenant_id}'s shared filesystem is suspended."
+            # MT-01: the target must resolve inside the caller's own tree ('..' and symlinks included)
+            try:
+                self.local_fs.write(tenant_id, path, data, owner=target_tenant)
+            except PermissionError as error:
+                return False, str(error)
+            # Snapshots and backups read the in-memory store, so it is written as well
+            self.filesystem.write(tenant_id, path, data)
+            return True, "Data written successfully."
+        if target_tenant != tenant_id:
+            # MT-01: Simulate ACL/permission check failure for cross-tenant access
+            return False, f"Permission Denied: Tenant {tenant_id} cannot access {target_tenant}'s data."
+        self.filesystem.write(tenant_id, path, data)
+        return True, "Data written successfully."
+
+    def file_exists(self, tenant_id, path):
+        if self.local_fs is not None:
+            try:
+                return self.local_fs.exists(tenant_id, path)
+            except PermissionError:
+                return False
+        return self.filesystem.exists(tenant_id, path)
+
+    def take_snapshot(self, tenant_id):
+        # VC-01: O(1) copy-on-write checkpoint of the tenant's files and resource config
+        return self.filesystem.snapshot(tenant_id, dict(self.tenant_data[tenant_id]['resources']))
+
+    def rollback_vm(self, tenant_id, snapshot_id=None):
+        try:
+            resources = self.filesystem.rollback(tenant_id, snapshot_id)
+        except LookupError:
+            return False
+        self.tenant_data[tenant_id]['resources'] = resources
+        self.hypervisor.sync()   # the restored resources reach the orchestrator before the rollback returns
+        self._sync_local_fs(tenant_id)
+        return True
+
+    def backup_tenant(self, tenant_id):
+        # UT-03: content-defined chunks, stored once across tenants and generations.
+        # With an on-disk backend, the fs_path tree itself is streamed into the store.
+        if self.local_fs is not None:
+            return self.backups.backup_tree(tenant_id, self.local_fs.tenant_root(tenant_id))
+        return self.backups.backup_files(tenant_id, self.filesystem.files(tenant_id))
+
+    def restore_tenant(self, tenant_id, generation=None):
+        try:
+            if self.local_fs is not None:
+                report = self.backups.restore_tree(tenant_id, self.local_fs.tenant_root(tenant_id), generation,
+                                                   replace=True)
+                self.local_fs.edited.add(tenant_id)
+                self.filesystem.replace(tenant_id, self.local_fs.files(tenant_id))
+                return report
+            files, report = self.backups.restore_files(tenant_id, generation)
+        except LookupError:
+            return False
+        self.filesystem.replace(tenant_id, files)
+        return report
+
+    def _sync_local_fs(self, tenant_id):
+        # With an on-disk backend, the tree follows the in-memory store after a rollback
+        if self.local_fs is not None:
+            self.local_fs.replace(tenant_id, self.filesystem.files(tenant_id))
+
+    def check_isolation(self, tenant_id_a, tenant_id_b):
+        # MT-02: Simulated unless a ContentionProbe is configured
+        if self.contention_probe is None:
+            return True
+        return self.contention_probe.measure(tenant_id_a, tenant_id_b).isolated
+
+    def measure_contention(self, tenant_id_a, tenant_id_b, **probe_options):
+        # MT-02 load mode: returns the full p50/p99 ContentionReport for B while A is loaded
+        probe = self.contention_probe or ContentionProbe(**probe_options)
+        return probe.measure(tenant_id_a, tenant_id_b)
+
+    def deprovision_tenant(self, tenant_id):
+        if tenant_id in self.tenant_data:
+            if self.local_fs is not None:
+                self.local_fs.drop(tenant_id)
+            self.hypervisor.deprovision(tenant_id)
+            self.storage.release(tenant_id)
+            self.filesystem.drop(tenant_id)
+            return True
+        return False
+
+    def monitor_logs(self, tenant_id):
+        # UT-02: Simulate logging isolation
+        if tenant_id == 'TenantA':
+            return "Log for Tenant A only."
+        elif tenant_id == 'TenantB':
+            return "Log for Tenant B only."
+        return ""
+
+    def scan_logs(self, log_files, workers=None):
+        # UT-02 at scale: every registered tenant ID is matched in one pass per log file.
+        # log_files maps path -> owning tenant (or is a list of '<tenant_id>.log' paths).
+        return LogLeakageScanner(self.tenant_data).scan_files(log_files, workers=workers)
+    
+    def simulate_host_failure(self):
+        # SR-01: Simulate Host Failure and HA failover
+        self.clock.sleep(1)
+        return True 
+
+    def check_vm_status(self, tenant_id):
+        return self.hypervisor.status(tenant_id)
+
+    def check_vm_statuses(self, tenant_ids):
+        # One batched query for the whole list
+        return self.hypervisor.statuses(tenant_ids)
+
+    def status_version(self):
+        return self.tenant_data.version
+
+    def changed_since(self, version):
+        # Every tenant with a status transition after `version`, read from the journal instead of the fleet
+        return {tenant_id for _, tenant_id, _, _ in self.tenant_data.journal_since(version)}
+
+    def execute_in_vm(self, tenant_id, command):
+        """Simulates executing a Linux command inside a specific VM."""
+        # UT-05 to UT-10: mount, unmount, traverse, chmod, chown and ls rules live in CommandPolicy
+        return COMMAND_POLICY.evaluate(command, tenant_id, self.traversal_guard)
@@ -1,95 +1,125 @@
 # SystemManagerLibrary.py (Save this file in your project directory)
 
-class SystemManagerLibrary:
+from CommandPolicy import COMMAND_POLICY
+from TenantLibraryBase import TenantLibraryBase
+
+# Scenario modules that pull in asyncio or multiprocessing (AsyncSystemManager, FaultScheduler,
+# ContentionProbe, LogLeakageScanner) are imported by the keywords that use them
+
+# Keyword errors for denied guest commands, keyed by policy rule; other denials raise PermissionError
+DENIED_COMMAND_ERRORS = {
+    'UT-05': (AssertionError, "Mount failed in {tenant_id}: Permission denied or resource missing."),
+    'UT-06': (AssertionError, "Unmount failed in {tenant_id}: Critical device busy."),
+    'UT-10': (PermissionError, "Operation not permitted: Cannot change file ownership."),
+}
+
+class SystemManagerLibrary(TenantLibraryBase):
     """
     A Python Library to expose system interaction methods as Robot Framework Keywords.
+
+    One instance serves the whole run. Construction only records the options:
+    the tenant state, starting with the initial tenants, is built the first
+    time a keyword touches it, and restored before every later test by the
+    library's own listener. The state and the keywords shared with
+    TestAutomationLibrary live in TenantLibraryBase.
     """
-    
-    # --- Constructor and Internal State ---
-    def __init__(self):
-        self.tenant_data = {}
-        # Auto-provision initial tenants for testing isolation
-        self.provision_vm('TenantA', {'cpu': 2, 'mem': 4})
-        self.provision_vm('TenantB', {'cpu': 4, 'mem': 8})
-        self.provision_vm('TenantC', {'cpu': 1, 'mem': 2})
+
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+    ROBOT_LISTENER_API_VERSION = 2
 
     # --- Core Keywords (Mapping to SystemManager) ---
-    
-    def provision_vm(self, tenant_id, resources):
-        """Simulates provisioning a VM and returns a status."""
-        resources['storage'] = resources.get('storage', 0) # Ensure storage exists
-        if resources['storage'] > 500:
-            raise AssertionError(f"Provisioning failed: Storage limit exceeded for {tenant_id}.")
-        
-        self.tenant_data[tenant_id] = {
-            'vm_status': 'running', 
-            'fs_path': f'/mnt/shared/tenant_{tenant_id}/', 
-            'resources': resources
-        }
-        return "SUCCESS"
 
     def deprovision_tenant(self, tenant_id):
         """Simulates deleting a tenant and its resources."""
         if tenant_id in self.tenant_data:
+            if self.local_fs is not None:
+                self.local_fs.drop(tenant_id)
             del self.tenant_data[tenant_id]
+            self.storage.release(tenant_id)
+            self.filesystem.drop(tenant_id)
             return "SUCCESS"
         return "Tenant not found"
 
-    def write_fs_cross_tenant(self, tenant_a, tenant_b, data):
-        """Simulates Tenant A trying to write to Tenant B's filesystem."""
+    def write_fs_cross_tenant(self, tenant_a, tenant_b, data, path='/data/cross_tenant.dat'):
+        """Simulates Tenant A trying to write to Tenant B's filesystem (a real write when the library has an fs_root)."""
+        if self.local_fs is not None:
+            self.local_fs.write(tenant_a, path, data, owner=tenant_b)
+            return "Data written successfully."
         if tenant_a != tenant_b:
             raise PermissionError(f"Permission Denied: {tenant_a} cannot access {tenant_b}'s data.")
         return "Data written successfully."
 
-    def check_vm_status(self, tenant_id):
-        """Returns the current VM status."""
-        return self.tenant_data.get(tenant_id, {}).get('vm_status', 'unknown')
+    def rollback_vm(self, tenant_id, snapshot_id=None):
+        """Simulates VC-01: restores the tenant's files and resources to a snapshot (default: the latest)."""
+        self._rollback(tenant_id, snapshot_id)
+        return "Rollback complete"
 
-    def check_resource_isolation(self, tenant_id_a, tenant_id_b):
-        """Simulates checking if resource usage is isolated (MT-02)."""
-        # In a real test, this would analyze monitoring data.
-        return True
+    def measure_resource_contention(self, noisy_tenant, victim_tenant, threshold=None, samples=2000):
+        """MT-02 load mode: loads the noisy tenant, returns the victim's p50/p99 degradation report."""
+        from ContentionProbe import DEFAULT_THRESHOLD, ContentionProbe
+        threshold = DEFAULT_THRESHOLD if threshold is None else float(threshold)
+        report = ContentionProbe(threshold=threshold, samples=int(samples)).measure(noisy_tenant, victim_tenant)
+        if not report.isolated:
+            raise AssertionError(f"Resource isolation failed: {victim_tenant} p99 latency degraded "
+                                 f"{report.p99_degradation:.2f}x under load from {noisy_tenant} (limit {report.threshold}x).")
+        return report._asdict()
 
     def execute_fs_command_in_vm(self, tenant_id, command):
         """Simulates executing a Linux FS command inside a VM."""
-        if command.startswith("mount /dev/sdb /mnt/tenant_B_path"):
-            raise AssertionError(f"Mount failed in {tenant_id}: Permission denied or resource missing.")
-        
-        elif command.startswith("umount /"):
-            raise AssertionError(f"Unmount failed in {tenant_id}: Critical device busy.")
-            
-        elif "chown root:root" in command:
-            raise PermissionError("Operation not permitted: Cannot change file ownership.")
-            
+        rule = COMMAND_POLICY.match(command, tenant_id, self.traversal_guard)
+        if rule is not None and not rule.allowed:
+            if rule.rule_id in DENIED_COMMAND_ERRORS:
+                error, template = DENIED_COMMAND_ERRORS[rule.rule_id]
+                raise error(template.format(tenant_id=tenant_id))
+            raise PermissionError(rule.message)
+
         return "Command executed successfully."
-    
+
     def simulate_host_failure(self, tenant_id):
         """Simulates SR-01: Host failure leading to HA failover."""
         # In a real system, this would trigger the HA mechanism
         print(f"Simulating Host Failure for host running {tenant_id}...")
-        self.tenant_data[tenant_id]['vm_status'] = 'restarting'
-        # Assume HA is fast
-        time.sleep(1) 
-        self.tenant_data[tenant_id]['vm_status'] = 'running'
+        self.tenant_data.set_status(tenant_id, 'restarting')
+        # Assume HA is fast: the VM is back on a new host one second later
+        self.clock.call_later(1, self._set_vm_status, tenant_id, 'running')
+        self.clock.sleep(1)
+        return "HA Failover complete"
+
+    def simulate_rack_failure(self, *tenant_ids):
+        """Simulates SR-01 for a whole rack: every listed tenant's host fails at once and fails over concurrently."""
+        print(f"Simulating rack failure for {len(tenant_ids)} tenants...")
+        from AsyncSystemManager import run_sync
+        run_sync(self._fault_injector().simulate_rack_failure(tenant_ids))
         return "HA Failover complete"
 
+    def simulate_shared_fs_failure(self, *tenant_ids):
+        """Simulates SR-02: the shared filesystem fails, suspending I/O for every listed tenant until it recovers."""
+        print(f"Simulating shared FS failure for {len(tenant_ids)} tenants...")
+        self._shared_fs_outage(tenant_ids)
+        return "Shared FS recovered"
+
     def simulate_guest_crash_and_recovery(self, tenant_id):
         """Simulates SR-03: Guest OS crash and auto-restart."""
         print(f"Simulating guest crash in {tenant_id}...")
-        self.tenant_data[tenant_id]['vm_status'] = 'crashed'
-        time.sleep(0.5) 
-        self.tenant_data[tenant_id]['vm_status'] = 'running'
+        self.tenant_data.set_status(tenant_id, 'crashed')
+        self.clock.call_later(0.5, self._set_vm_status, tenant_id, 'running')
+        self.clock.sleep(0.5)
         return "Guest auto-restart successful"
-        
+
     def check_logs_for_leakage(self, tenant_id_a, tenant_id_b):
         """Simulates checking logs for UT-02."""
-        # Logs for A should not contain B's data
-        if tenant_id_b in "Log for A only.":
-            return False
-        return True
-        
+        # Logs for A should not contain B's data (or any other registered tenant's ID)
+        return not self._leak_scanner(tenant_id_b).scan_text("Log for A only.", owner=tenant_id_a)
+
     def execute_backup_restore(self, tenant_id):
-        """Simulates UT-03: Running a backup/restore job."""
+        """Simulates UT-03: Running a backup/restore job and verifying the restored files."""
+        # With an fs_root the tree on disk is what is backed up and restored, so that is what is compared
+        state = self.local_fs.files if self.local_fs is not None else self.filesystem.files
+        files = state(tenant_id)
+        self.backup_tenant(tenant_id)
+        self.restore_tenant(tenant_id)
+        if state(tenant_id) != files:
+            raise AssertionError(f"Backup/restore corrupted {tenant_id}'s files.")
         return "Backup and restore completed successfully"
 
     def check_unaffected_status(self, tenant_id):
@@ -97,4 +127,4 @@ class SystemManagerLibrary:
         status = self.check_vm_status(tenant_id)
         if status != 'running':
             raise AssertionError(f"Control tenant {tenant_id} was unexpectedly affected. Status: {status}")
-        return status
\ No newline at end of file
+        return status
@@ -0,0 +1,37 @@
+# TenantBaseline.py - Initial tenants built once per process and copied into each library instance
+
+from TenantManifest import find_storage_violations, parse_manifest
+from TenantRegistry import TenantRegistry
+
+
+class TenantBaseline:
+    """
+    The tenants a library instance starts from, pre-built once and shared.
+
+    The first instance that needs them parses the manifest and provisions it
+    into a template registry. Every instance, the first included, then gets a
+    copy of that registry (a few array and dict copies) and replays the
+    template's storage reservations into its own pools, which may differ
+    between instances. Provisioning is not repeated per instance.
+    """
+
+    def __init__(self, manifest):
+        self.manifest = manifest
+        self._template = None
+        self._reservations = None
+
+    def registry(self, storage):
+        """Reserves the baseline's storage in `storage` and returns a new registry holding it."""
+        if self._template is None:
+            entries = parse_manifest(self.manifest)
+            violations = find_storage_violations(entries)
+            if violations:
+                raise AssertionError(f"Provisioning failed: Storage limit exceeded for {', '.join(violations)}.")
+            template = TenantRegistry()
+            template.add_many(entries)
+            self._reservations = [(tenant_id, resources['storage']) for tenant_id, resources in entries]
+            self._template = template
+        rejected = storage.reserve_many(self._reservations)
+        if rejected:
+            raise AssertionError(f"Provisioning failed: Storage pool capacity exceeded for {', '.join(rejected)}.")
+        return self._template.copy()
@@ -0,0 +1,111 @@
+# TenantFilesystem.py - Per-tenant files with copy-on-write snapshots (VC-01)
+
+import itertools
+from bisect import bisect_left
+
+_DELETED = object()   # tombstone: the path was removed in this layer
+_ABSENT = object()
+
+
+class TenantFilesystem:
+    """
+    In-memory tenant files with O(1) snapshots.
+
+    Each tenant's files are a stack of layers ({path: data}); only the top layer
+    is written. A snapshot freezes the current stack by starting a new empty top
+    layer, so it copies nothing and later snapshots share every layer below
+    them. Rolling back drops the layers written since the snapshot, which costs
+    O(changes since the snapshot). Reads look through the layers top-down, so
+    they cost O(snapshots since the last write to that path) at worst.
+    """
+
+    def __init__(self):
+        self._layers = {}      # tenant_id -> [{path: data}], last one writable
+        self._snapshots = {}   # tenant_id -> [(snapshot_id, depth, metadata)], oldest first
+        self._snapshot_ids = itertools.count(1)
+        # Tenants whose files or snapshots changed; cleared by the fixture pool
+        self.edited = set()
+
+    def write(self, tenant_id, path, data):
+        self._stack(tenant_id)[-1][path] = data
+
+    def delete(self, tenant_id, path):
+        if not self.exists(tenant_id, path):
+            raise FileNotFoundError(f"{path} does not exist in {tenant_id}'s filesystem.")
+        self._stack(tenant_id)[-1][path] = _DELETED
+
+    def read(self, tenant_id, path, default=None):
+        for layer in reversed(self._layers.get(tenant_id, ())):
+            data = layer.get(path, _ABSENT)
+            if data is not _ABSENT:
+                return default if data is _DELETED else data
+        return default
+
+    def exists(self, tenant_id, path):
+        return self.read(tenant_id, path, _ABSENT) is not _ABSENT
+
+    def replace(self, tenant_id, files):
+        """Makes {path: data} the tenant's entire file set (restores); existing snapshots are kept."""
+        top = self._stack(tenant_id)[-1]
+        for path in self.files(tenant_id):
+            if path not in files:
+                top[path] = _DELETED
+        top.update(files)
+
+    def tenants(self):
+        """Tenants that have files or snapshots."""
+        return list(self._layers)
+
+    def files(self, tenant_id):
+        """Returns the tenant's current {path: data}, merged across layers."""
+        merged = {}
+        for layer in self._layers.get(tenant_id, ()):
+            merged.update(layer)
+        return {path: data for path, data in merged.items() if data is not _DELETED}
+
+    def snapshot(self, tenant_id, metadata=None):
+        """Checkpoints the tenant's files (plus optional `metadata`) and returns the snapshot ID."""
+        layers = self._stack(tenant_id)
+        if layers[-1]:
+            layers.append({})
+        snapshot_id = next(self._snapshot_ids)
+        self._snapshots.setdefault(tenant_id, []).append((snapshot_id, len(layers) - 1, metadata))
+        return snapshot_id
+
+    def snapshots(self, tenant_id):
+        return [snapshot_id for snapshot_id, _, _ in self._snapshots.get(tenant_id, ())]
+
+    def rollback(self, tenant_id, snapshot_id=None):
+        """
+        Restores the tenant's files to `snapshot_id` (default: the latest snapshot)
+        and returns that snapshot's metadata. Snapshots taken after it are discarded.
+        """
+        snapshots = self._snapshots.get(tenant_id)
+        if not snapshots:
+            raise LookupError(f"{tenant_id} has no snapshots to roll back to.")
+        if snapshot_id is None:
+            position = len(snapshots) - 1
+        else:
+            position = bisect_left(snapshots, (snapshot_id,))
+            if position == len(snapshots) or snapshots[position][0] != snapshot_id:
+                raise LookupError(f"Snapshot {snapshot_id} does not exist for {tenant_id}.")
+        del snapshots[position + 1:]
+        _, depth, metadata = snapshots[position]
+        self.edited.add(tenant_id)
+        layers = self._layers[tenant_id]
+        del layers[depth:]
+        layers.append({})
+        return metadata
+
+    def drop(self, tenant_id):
+        """Forgets the tenant's files and snapshots (deprovisioning)."""
+        self.edited.add(tenant_id)
+        self._layers.pop(tenant_id, None)
+        self._snapshots.pop(tenant_id, None)
+
+    def _stack(self, tenant_id):
+        self.edited.add(tenant_id)
+        layers = self._layers.get(tenant_id)
+        if layers is None:
+            layers = self._layers[tenant_id] = [{}]
+        return layers
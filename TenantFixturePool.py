@@ -0,0 +1,103 @@
+# TenantFixturePool.py - Session-scoped baseline fleet, restored between tests in O(tenants touched)
+
+# Journal entries a reset lets accumulate before dropping them up to the new mark
+JOURNAL_TRIM_ENTRIES = 4096
+
+
+class TenantFixturePool:
+    """
+    Provisions a baseline fleet on a manager once and puts it back before every test.
+
+    checkpoint() records each tenant's status, resources, storage reservation
+    and files, and marks the manager's change trackers. reset() only visits the
+    tenants changed since then: those with a journaled status transition
+    (including provisioning and deprovisioning) in the registry, plus the ones
+    in the registry's and filesystem's `edited` sets. Tenants that a test added
+    are deprovisioned, and baseline tenants are restored from the checkpoint.
+    Per-test cost therefore follows what the test touched, not the fleet size.
+
+    Works with any manager exposing tenant_data, storage, filesystem, clock,
+    provision_vms() and deprovision_tenant(). If the manager has an on-disk
+    backend (local_fs), trees written since the checkpoint are removed, so
+    baseline tenants start each test with an empty tree.
+
+    Once the registry journal (or its edit log) holds more than
+    JOURNAL_TRIM_ENTRIES, a reset drops it up to the new mark, so a long run
+    does not keep one entry per change it ever made. Anyone else diffing from
+    an older version (a hypervisor backend's last sync) then gets ValueError
+    and falls back to a full comparison, but only once per few thousand
+    changes rather than after every test.
+    """
+
+    def __init__(self, manager, baseline=None):
+        self.manager = manager
+        if baseline:
+            manager.provision_vms(baseline)
+        self.checkpoint()
+
+    def checkpoint(self):
+        """Makes the manager's current tenants the baseline (O(fleet), once per session)."""
+        registry = self.manager.tenant_data
+        storage = self.manager.storage
+        filesystem = self.manager.filesystem
+        self._baseline = {
+            tenant_id: (registry.status(tenant_id), dict(registry[tenant_id]['resources']),
+                        storage.reservation(tenant_id))
+            for tenant_id in registry
+        }
+        self._files = {tenant_id: filesystem.files(tenant_id) for tenant_id in filesystem.tenants()}
+        self._mark()
+
+    def reset(self):
+        """Restores the baseline; returns the number of tenants that had to be put back."""
+        manager = self.manager
+        # Let pending recoveries fire now rather than inside the next test
+        manager.clock.run_until_idle()
+        touched = self._touched()
+        registry, storage, filesystem = manager.tenant_data, manager.storage, manager.filesystem
+        local_fs = getattr(manager, 'local_fs', None)
+        if local_fs is not None:
+            for tenant_id in local_fs.edited:
+                local_fs.drop(tenant_id)
+
+        # Extra tenants go first so their storage is free before baseline reservations are retaken
+        for tenant_id in touched.difference(self._baseline):
+            if tenant_id in registry:
+                manager.deprovision_tenant(tenant_id)
+            filesystem.drop(tenant_id)
+        for tenant_id in touched.intersection(self._baseline):
+            status, resources, reservation = self._baseline[tenant_id]
+            registry.add(tenant_id, resources, status)
+            storage.release(tenant_id)
+            if reservation is not None:
+                pool_name, amount = reservation
+                storage.reserve(tenant_id, amount, pool_name)
+            filesystem.drop(tenant_id)
+            if tenant_id in self._files:
+                filesystem.replace(tenant_id, self._files[tenant_id])
+                if local_fs is not None:
+                    local_fs.replace(tenant_id, self._files[tenant_id])
+
+        self._mark()
+        if registry.journal_size > JOURNAL_TRIM_ENTRIES:
+            registry.trim_journal(self._version)
+        if registry.edit_log_size > JOURNAL_TRIM_ENTRIES:
+            registry.trim_edits(registry.edit_version)
+        return len(touched)
+
+    def _touched(self):
+        registry = self.manager.tenant_data
+        try:
+            touched = {tenant_id for _, tenant_id, _, _ in registry.journal_since(self._version)}
+        except ValueError:
+            # The journal was trimmed past the checkpoint: compare every tenant instead
+            touched = set(registry) | set(self._baseline)
+        return touched | registry.edited | self.manager.filesystem.edited
+
+    def _mark(self):
+        manager = self.manager
+        self._version = manager.tenant_data.version
+        manager.tenant_data.edited.clear()
+        manager.filesystem.edited.clear()
+        if getattr(manager, 'local_fs', None) is not None:
+            manager.local_fs.edited.clear()
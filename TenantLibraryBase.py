@@ -0,0 +1,295 @@
+# TenantLibraryBase.py - Tenant state, shared keywords and helpers of the Robot keyword libraries
+#
+# SystemManagerLibrary and TestAutomationLibrary derive from TenantLibraryBase and keep only the
+# keywords whose behaviour, return values or messages differ between them.
+
+import os
+import time
+
+from BackupEngine import BackupEngine
+from KeywordTracer import TRACER
+from LocalTenantFilesystem import LocalTenantFilesystem
+from StoragePool import StoragePoolAllocator
+from TenantBaseline import TenantBaseline
+from TenantManifest import STORAGE_LIMIT, find_storage_violations, parse_manifest, parse_resources
+from TenantFilesystem import TenantFilesystem
+from TenantFixturePool import TenantFixturePool
+from TraversalGuard import TraversalGuard
+from VirtualClock import VirtualClock
+
+# SR-02: written into each tenant's tree during and after a shared filesystem outage
+SR02_PROBE = '/.sr02_probe'
+
+# Initial tenants, provisioned once per process and copied into each library instance
+INITIAL_TENANTS = TenantBaseline({'TenantA': {'cpu': 2, 'mem': 4},
+                                  'TenantB': {'cpu': 4, 'mem': 8},
+                                  'TenantC': {'cpu': 1, 'mem': 2}})
+
+# Attributes built on first access by _materialize()
+_LAZY_STATE = frozenset(('tenant_data', 'storage', 'filesystem', 'backups', 'local_fs', 'traversal_guard',
+                         'fixtures'))
+
+
+class TenantLibraryBase:
+    """
+    Lazy tenant state plus the keywords and helpers both Robot libraries share.
+
+    Construction only records the options: the tenant state, starting with the
+    initial tenants, is built the first time a keyword touches it, and restored
+    before every later test by the library's own listener (_start_test).
+    Subclasses set the Robot scope and listener API version; _tag() lets them
+    prefix the shared error messages with the test ID they belong to.
+    """
+
+    def __init__(self, clock=None, storage_pools=None, contention_probe=None, fs_root=None):
+        self._storage_pools = storage_pools
+        self._fs_root = fs_root
+        # MT-02 load mode: with a ContentionProbe, isolation checks run real noisy-neighbour load
+        self.contention_probe = contention_probe
+        # Simulated time: failover/restart timelines run instantly unless a RealClock is injected
+        self.clock = clock if clock is not None else VirtualClock()
+        # Opt-in keyword tracing (KEYWORD_TRACE or the KeywordTracer listener); a no-op otherwise
+        TRACER.instrument(self)
+        self.ROBOT_LIBRARY_LISTENER = self
+
+    def __getattr__(self, name):
+        # Only reached while an attribute is missing, i.e. before the tenant state exists
+        if name in _LAZY_STATE:
+            self._materialize()
+            return self.__dict__[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def _materialize(self):
+        # HC-02: aggregate storage accounting per pool ({pool name: capacity})
+        self.storage = StoragePoolAllocator(self._storage_pools)
+        # VC-01: tenant files with copy-on-write snapshots
+        self.filesystem = TenantFilesystem()
+        # UT-03: chunked, deduplicating backups (temporary local store unless one is assigned)
+        self.backups = BackupEngine()
+        # Initial tenants for testing isolation, copied from the shared pre-built baseline
+        self.tenant_data = INITIAL_TENANTS.registry(self.storage)
+        # MT-01/SR-02 on disk: with an fs_root, each tenant's fs_path is a real directory under it
+        self.local_fs = LocalTenantFilesystem(self._fs_root, self.tenant_data) if self._fs_root else None
+        # UT-07: with a local backend, traversal checks also follow symlinks in the tenant's tree
+        self.traversal_guard = TraversalGuard(self.local_fs) if self._fs_root else None
+        # Checkpoint of the initial tenants, restored in O(tenants touched) at the start of each test
+        self.fixtures = TenantFixturePool(self)
+        # UT-02: Aho-Corasick scanner over every tenant ID, built on first use
+        self._leak_scanner_key = self._leak_scanner_cache = None
+
+    def _start_test(self, name, attributes):
+        # Listener hook (not a keyword): every test starts from the baseline fleet, once there is one
+        if 'fixtures' in self.__dict__:
+            self.fixtures.reset()
+
+    def _tag(self, test_id):
+        # Prefix for the shared error messages; TestAutomationLibrary tags them '[<test_id>] '
+        return ''
+
+    # --- Provisioning ---
+
+    def provision_vm(self, tenant_id, resources):
+        """[UT-01] Provisions a VM; `resources` is a dict or 'cpu=1|mem=2|storage=10'."""
+        resources = parse_resources(resources) # A copy with storage defaulted; the caller's dict is left alone
+        storage = resources['storage']
+        if storage > STORAGE_LIMIT: # HC-02 check
+            raise AssertionError(f"Provisioning failed: Storage limit exceeded for {tenant_id}.")
+        if self.storage.reserve(tenant_id, storage) is None: # HC-02 pool overcommit
+            raise AssertionError(f"Provisioning failed: Storage pool capacity exceeded for {tenant_id} "
+                                 f"(requested {storage}, largest free {self.storage.largest_free()}).")
+
+        self.tenant_data.add(tenant_id, resources)
+        return "SUCCESS"
+
+    def provision_vms(self, manifest):
+        """[UT-01] Provisions a whole manifest atomically: all tenants or none."""
+        entries = parse_manifest(manifest)
+        violations = find_storage_violations(entries) # HC-02 check, one pass for the whole manifest
+        if violations:
+            raise AssertionError(f"Provisioning failed: Storage limit exceeded for {', '.join(violations)}.")
+        rejected = self.storage.reserve_many((tenant_id, resources['storage']) for tenant_id, resources in entries)
+        if rejected:
+            raise AssertionError(f"Provisioning failed: Storage pool capacity exceeded for {', '.join(rejected)}.")
+
+        self.tenant_data.add_many(entries)
+        return "SUCCESS"
+
+    def provision_tenants(self, *manifest):
+        """[UT-01] Robot keyword: Provision Tenants    TenantX:cpu=1|mem=2    TenantY:cpu=2|mem=4"""
+        return self.provision_vms(manifest)
+
+    def check_vm_status(self, tenant_id):
+        """Returns the current VM status."""
+        return self.tenant_data.status(tenant_id)
+
+    # --- Files, snapshots and backups ---
+
+    def write_file_in_vm(self, tenant_id, path, data):
+        """[VC-01] Writes a file into the tenant's own filesystem."""
+        if self.local_fs is not None:
+            self._write_local(tenant_id, path, data)
+        self.filesystem.write(tenant_id, path, data)
+        return "Data written successfully."
+
+    def file_exists_in_vm(self, tenant_id, path):
+        """Returns True if `path` exists in the tenant's filesystem."""
+        if self.local_fs is not None:
+            return self.local_fs.exists(tenant_id, path)
+        return self.filesystem.exists(tenant_id, path)
+
+    def measure_fs_write_throughput(self, tenant_id, files=1000, size=4096):
+        """[MT-01/SR-02] Writes `files` files of `size` bytes into the tenant's own tree on disk; returns MB/s."""
+        self._require_local_fs()
+        block = bytes(int(size))
+        started = time.perf_counter()
+        written = sum(self._write_local(tenant_id, f'/throughput/file{index}.dat', block)
+                      for index in range(int(files)))
+        seconds = time.perf_counter() - started
+        return written / seconds / 1e6 if seconds else float('inf')
+
+    def get_fs_digest(self, tenant_id):
+        """[SR-02] SHA-256 of the tenant's on-disk tree, for before/after integrity checks."""
+        return self._require_local_fs().digest(tenant_id)
+
+    def take_snapshot(self, tenant_id):
+        """[VC-01] O(1) copy-on-write checkpoint of the tenant's files and resource config; returns its ID."""
+        return self.filesystem.snapshot(tenant_id, dict(self.tenant_data[tenant_id]['resources']))
+
+    def backup_tenant(self, tenant_id):
+        """[UT-03] Deduplicating backup of the tenant's files (its tree on disk with an fs_root); returns the report."""
+        if self.local_fs is not None:
+            return self.backups.backup_tree(tenant_id, self.local_fs.tenant_root(tenant_id))._asdict()
+        return self.backups.backup_files(tenant_id, self.filesystem.files(tenant_id))._asdict()
+
+    def restore_tenant(self, tenant_id, generation=None):
+        """[UT-03] Restores the tenant's files from a backup generation (default: the latest)."""
+        generation = None if generation is None else int(generation)
+        try:
+            if self.local_fs is not None:
+                report = self.backups.restore_tree(tenant_id, self.local_fs.tenant_root(tenant_id), generation,
+                                                   replace=True)
+                self.local_fs.edited.add(tenant_id)
+                self.filesystem.replace(tenant_id, self.local_fs.files(tenant_id))
+                return report._asdict()
+            files, report = self.backups.restore_files(tenant_id, generation)
+        except LookupError as error:
+            raise AssertionError(f"{self._tag('UT-03')}Restore failed: {error}") from None
+        self.filesystem.replace(tenant_id, files)
+        return report._asdict()
+
+    def _rollback(self, tenant_id, snapshot_id):
+        # VC-01: files and resources back to a snapshot, then the tree on disk follows
+        try:
+            resources = self.filesystem.rollback(tenant_id, None if snapshot_id is None else int(snapshot_id))
+        except LookupError as error:
+            raise AssertionError(f"{self._tag('VC-01')}Rollback failed: {error}") from None
+        self.tenant_data[tenant_id]['resources'] = resources
+        self._sync_local_fs(tenant_id)
+
+    def _sync_local_fs(self, tenant_id):
+        # With an fs_root, the on-disk tree follows the in-memory files after a rollback
+        if self.local_fs is not None:
+            self.local_fs.replace(tenant_id, self.filesystem.files(tenant_id))
+
+    def _require_local_fs(self):
+        if self.local_fs is None:
+            raise AssertionError(f"{self._tag('MT-01')}Filesystem I/O needs a library fs_root "
+                                 f"(a local directory for tenant trees).")
+        return self.local_fs
+
+    def _write_local(self, tenant_id, path, data):
+        if self.tenant_data.status(tenant_id) == 'io_suspended':
+            raise IOError(f"{self._tag('SR-02')}I/O error: {tenant_id}'s shared filesystem is suspended.")
+        return self.local_fs.write(tenant_id, path, data)
+
+    # --- Isolation and leakage ---
+
+    def check_resource_isolation(self, tenant_id_a, tenant_id_b):
+        """[MT-02] Checks resource contention/QoS (simulated unless a ContentionProbe is configured)."""
+        if self.contention_probe is None:
+            return True
+        return self.contention_probe.measure(tenant_id_a, tenant_id_b).isolated
+
+    def scan_logs_for_leakage(self, log_dir):
+        """[UT-02] Scans every <tenant_id>.log in log_dir for other tenants' IDs; fails listing every leak found."""
+        leaks = self._leak_scanner().scan_directory(log_dir)
+        if leaks:
+            details = '; '.join(f"{leak.tenant_id} in {leak.owner}'s log at byte {leak.offset}" for leak in leaks[:10])
+            raise AssertionError(f"{self._tag('UT-02')}Log leakage detected ({len(leaks)} occurrences): {details}")
+        return 0
+
+    def _leak_scanner(self, extra_id=None):
+        # The fleet's automaton is rebuilt only when the registry version moves (or for an unregistered ID)
+        tenant_data = self.tenant_data
+        if extra_id in tenant_data:
+            extra_id = None
+        key = (tenant_data.version, extra_id)
+        if key != self._leak_scanner_key:
+            from LogLeakageScanner import LogLeakageScanner
+            self._leak_scanner_cache = LogLeakageScanner([*tenant_data, *filter(None, (extra_id,))])
+            self._leak_scanner_key = key
+        return self._leak_scanner_cache
+
+    # --- Faults and containment ---
+
+    def get_status_version(self):
+        """Returns the status journal version; pass it to Check Blast Radius after injecting a failure."""
+        return self.tenant_data.version
+
+    def check_blast_radius(self, version, *tenant_ids):
+        """Fails if any tenant other than `tenant_ids` changed status since `version`; costs O(transitions)."""
+        transitions = self.tenant_data.journal_since(int(version))
+        spread = {}
+        for _, tenant_id, old, new in transitions:
+            if tenant_id not in tenant_ids:
+                spread.setdefault(tenant_id, []).append(f"{old} -> {new}")
+        if spread:
+            details = '; '.join(f"{tenant_id}: {', '.join(steps)}" for tenant_id, steps in list(spread.items())[:10])
+            raise AssertionError(f"{self._tag('SR')}Failure spread beyond {', '.join(tenant_ids) or 'no tenants'} "
+                                 f"to {len(spread)} tenants: {details}")
+        return len(transitions)
+
+    def run_fault_timeline(self, seed=0, events=1000, rate=1000):
+        """[SR-01/02/03] Plays a seeded fault timeline across the fleet and checks every event's blast radius."""
+        from FaultScheduler import FaultScheduler
+        report = FaultScheduler(self, seed=int(seed)).run(int(events), float(rate))
+        if report.violations:
+            raise AssertionError(f"{self._tag('SR')}Fault timeline (seed {report.seed}) broke containment "
+                                 f"{report.violations} times: {'; '.join(report.details[:10])}")
+        return report._asdict()
+
+    def _fault_injector(self):
+        # One injector per library, so faults injected by different keywords stack on the same tenant
+        injector = self.__dict__.get('_injector')
+        if injector is None:
+            from AsyncSystemManager import AsyncSystemManager
+            injector = self._injector = AsyncSystemManager(self)
+        return injector
+
+    def _set_vm_status(self, tenant_id, status):
+        # Clock callback: the tenant may have been deprovisioned while the event was pending
+        if tenant_id in self.tenant_data:
+            self.tenant_data.set_status(tenant_id, status)
+
+    def _shared_fs_outage(self, tenant_ids):
+        # SR-02: suspend I/O for the tenants until the FS recovers; with an fs_root, a real write into each
+        # tree must fail during the outage and succeed once it is over
+        from AsyncSystemManager import FS_RECOVERY_SECONDS
+        self._fault_injector().inject_failures(tenant_ids, 'io_suspended', FS_RECOVERY_SECONDS)
+        if self.local_fs is not None:
+            for tenant_id in tenant_ids:
+                try:
+                    self._write_local(tenant_id, SR02_PROBE, b'probe')
+                except IOError:
+                    continue
+                raise AssertionError(f"{self._tag('SR-02')}{tenant_id} could still write while its shared "
+                                     f"filesystem was down.")
+        self.clock.sleep(FS_RECOVERY_SECONDS)
+        if self.local_fs is not None:
+            for tenant_id in tenant_ids:
+                try:
+                    self._write_local(tenant_id, SR02_PROBE, b'probe')
+                except IOError as error:
+                    raise AssertionError(f"{self._tag('SR-02')}{tenant_id} could not write after the shared "
+                                         f"filesystem recovered: {error}") from None
+                os.remove(self.local_fs.resolve(tenant_id, SR02_PROBE))
@@ -0,0 +1,57 @@
+# TenantManifest.py - Manifest parsing and bulk capacity checks for tenant provisioning
+
+from array import array
+from itertools import compress, repeat
+from operator import lt
+
+# HC-02: largest storage allocation a single VM may request
+STORAGE_LIMIT = 500
+
+
+def parse_resources(resources):
+    """
+    Returns a new resources dict with 'storage' defaulted to 0.
+
+    Accepts a dict or the Robot-friendly 'cpu=1|mem=2|storage=10' form.
+    """
+    if isinstance(resources, str):
+        parsed = {}
+        for item in filter(None, resources.split('|')):
+            key, _, value = item.partition('=')
+            parsed[key.strip()] = int(value)
+        resources = parsed
+    else:
+        resources = dict(resources)
+    resources.setdefault('storage', 0)
+    return resources
+
+
+def parse_manifest(manifest):
+    """
+    Normalizes a provisioning manifest into a list of (tenant_id, resources) pairs.
+
+    A manifest is a {tenant_id: resources} dict, an iterable of (tenant_id, resources)
+    pairs, or an iterable of 'TenantX:cpu=1|mem=2' strings (one per Robot argument).
+    """
+    if isinstance(manifest, dict):
+        entries = manifest.items()
+    else:
+        entries = (entry.split(':', 1) if isinstance(entry, str) else entry for entry in manifest)
+    parsed = []
+    for entry in entries:
+        tenant_id, resources = (entry[0], entry[1]) if len(entry) == 2 else (entry[0], {})
+        parsed.append((tenant_id.strip(), parse_resources(resources)))
+    return parsed
+
+
+def find_storage_violations(entries, limit=STORAGE_LIMIT):
+    """
+    Returns the tenant IDs whose storage request exceeds `limit`, in manifest order.
+
+    The storage column is packed into an array and checked with max() first, so a
+    clean manifest costs one C-level pass instead of a Python loop per tenant.
+    """
+    storage = array('d', [resources['storage'] for _, resources in entries])
+    if not storage or max(storage) <= limit:
+        return []
+    return list(compress((tenant_id for tenant_id, _ in entries), map(lt, repeat(limit), storage)))
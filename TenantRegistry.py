@@ -0,0 +1,389 @@
+# TenantRegistry.py - Columnar tenant store behind the managers' tenant_data mapping
+
+from array import array
+from collections.abc import MutableMapping
+
+# Status strings are interned as one byte per tenant; unseen statuses are appended on first use
+VM_STATUSES = ('running', 'restarting', 'crashed', 'stopped', 'io_suspended')
+
+# Resource keys stored in int64 columns; anything else (or a non-int value) goes to a per-row overflow dict
+RESOURCE_COLUMNS = ('cpu', 'mem', 'storage')
+
+# Journal entries kept before the oldest half is dropped (about 10 MB at 10 bytes per entry)
+DEFAULT_JOURNAL_LIMIT = 1 << 20
+
+_MISSING = -2 ** 63   # empty int64 cell
+_INT64_MAX = 2 ** 63 - 1
+_NO_STATUS = 255      # journal code for "not provisioned"; never assigned to a status name
+_ABSENT = object()
+
+
+class TenantRegistry(MutableMapping):
+    """
+    Tenant state stored column-wise instead of as one nested dict per tenant.
+
+    Each tenant costs an index entry, a one-byte status code and three int64
+    resource cells. Every status transition is appended to a versioned journal,
+    so "what changed since version V" is answered without scanning the fleet.
+    The journal is columnar too: a reference to the tenant ID and two status
+    codes, about 10 bytes per transition. Resource and fs_path changes that are
+    not status transitions go to a second, ID-only log (edited_since), for
+    consumers that mirror the whole record. fs_path is derived from the tenant
+    ID on access. Reading registry[tenant_id] returns a TenantRecord view that
+    behaves like the old {'vm_status', 'fs_path', 'resources'} dict, so
+    existing callers keep working.
+    """
+
+    def __init__(self, fs_root='/mnt/shared', journal_limit=DEFAULT_JOURNAL_LIMIT):
+        self.fs_root = fs_root.rstrip('/')
+        self._rows = {}          # tenant_id -> row
+        self._ids = []           # row -> tenant_id (None for a free row)
+        self._free_rows = []
+        self._status = bytearray()
+        self._columns = {key: array('q') for key in RESOURCE_COLUMNS}
+        self._overflow = {}      # row -> {resource key: value} for keys/values the columns cannot hold
+        self._fs_overrides = {}  # row -> fs_path when it differs from the derived path
+        self._status_names = list(VM_STATUSES)
+        self._status_codes = {name: code for code, name in enumerate(self._status_names)}
+        # Status transitions: entry i (version _journal_floor + i + 1) is _journal_ids[i] going from status
+        # code _journal_codes[2 * i] to _journal_codes[2 * i + 1]
+        self._journal_ids = []
+        self._journal_codes = bytearray()
+        self._journal_floor = 0
+        self.journal_limit = journal_limit
+        # Tenants whose resources or fs_path changed without a status transition; cleared by the fixture pool
+        self.edited = set()
+        # The same edits in order, for consumers with a mark of their own: entry i is edit version _edit_floor + i + 1
+        self._edit_ids = []
+        self._edit_floor = 0
+
+    # --- Fast paths used by the managers ---
+
+    def add(self, tenant_id, resources=None, vm_status='running'):
+        """Inserts or replaces a tenant without building any intermediate dicts."""
+        row = self._rows.get(tenant_id)
+        code = self._status_code(vm_status)
+        if row is None:
+            row = self._allocate_row(tenant_id)
+            self._record(tenant_id, None, vm_status)
+        else:
+            self._mark_edited(tenant_id)
+            if self._status[row] != code:
+                self._record(tenant_id, self._status_names[self._status[row]], vm_status)
+        self._status[row] = code
+        self._fs_overrides.pop(row, None)
+        self._write_resources(row, resources or {})
+
+    def add_many(self, entries, vm_status='running'):
+        """Inserts every (tenant_id, resources) pair in `entries`."""
+        for tenant_id, resources in entries:
+            self.add(tenant_id, resources, vm_status)
+
+    def status(self, tenant_id, default='unknown'):
+        """Returns the VM status of `tenant_id`, or `default` when it is not registered."""
+        row = self._rows.get(tenant_id)
+        return default if row is None else self._status_names[self._status[row]]
+
+    def set_status(self, tenant_id, vm_status):
+        row = self._rows[tenant_id]
+        code = self._status_code(vm_status)
+        if self._status[row] != code:
+            self._record(tenant_id, self._status_names[self._status[row]], vm_status)
+            self._status[row] = code
+
+    @property
+    def version(self):
+        """Journal version: bumped by every status transition, including provisioning and deprovisioning."""
+        return self._journal_floor + len(self._journal_ids)
+
+    @property
+    def journal_size(self):
+        """Transitions currently kept in the journal."""
+        return len(self._journal_ids)
+
+    @property
+    def edit_version(self):
+        """Edit log version: bumped by every resource or fs_path change to an existing tenant."""
+        return self._edit_floor + len(self._edit_ids)
+
+    @property
+    def edit_log_size(self):
+        """Edits currently kept in the edit log."""
+        return len(self._edit_ids)
+
+    def edited_since(self, edit_version):
+        """Returns the set of tenants whose resources or fs_path changed after `edit_version`."""
+        if not self._edit_floor <= edit_version <= self.edit_version:
+            raise ValueError(f"Edit log covers versions {self._edit_floor}..{self.edit_version}; "
+                             f"cannot diff from {edit_version}.")
+        return set(self._edit_ids[edit_version - self._edit_floor:])
+
+    def trim_edits(self, edit_version):
+        """Forgets the edits up to `edit_version`; diffing from an earlier one then raises ValueError."""
+        self.edited_since(edit_version)
+        self._drop_edits(edit_version - self._edit_floor)
+
+    def journal_since(self, version):
+        """Returns [(version, tenant_id, old_status, new_status)] for every transition after `version`."""
+        start = self._journal_offset(version)
+        return [(self._journal_floor + index + 1, tenant_id, old, new)
+                for index, (tenant_id, old, new) in enumerate(self._journal_entries(start), start)]
+
+    def changes_since(self, version):
+        """
+        Returns {tenant_id: (status at `version`, status now)} for every tenant whose
+        status differs from what it was at `version`; None stands for "not provisioned".
+
+        Costs O(transitions since `version`), however large the fleet is.
+        """
+        changes = {}
+        for tenant_id, old, new in self._journal_entries(self._journal_offset(version)):
+            first = changes.get(tenant_id)
+            changes[tenant_id] = (old if first is None else first[0], new)
+        return {tenant_id: change for tenant_id, change in changes.items() if change[0] != change[1]}
+
+    def trim_journal(self, version):
+        """Forgets the transitions up to `version`; diffing from an earlier version then raises ValueError."""
+        self._drop_journal(self._journal_offset(version))
+
+    def copy(self):
+        """Returns an independent registry with the same tenants and journal."""
+        clone = type(self).__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._rows = dict(self._rows)
+        clone._ids = list(self._ids)
+        clone._free_rows = list(self._free_rows)
+        clone._status = bytearray(self._status)
+        clone._columns = {key: array('q', column) for key, column in self._columns.items()}
+        clone._overflow = {row: dict(overflow) for row, overflow in self._overflow.items()}
+        clone._fs_overrides = dict(self._fs_overrides)
+        clone._status_names = list(self._status_names)
+        clone._status_codes = dict(self._status_codes)
+        clone._journal_ids = list(self._journal_ids)
+        clone._journal_codes = bytearray(self._journal_codes)
+        clone._edit_ids = list(self._edit_ids)
+        clone.edited = set(self.edited)
+        return clone
+
+    def fs_path(self, tenant_id):
+        row = self._rows[tenant_id]
+        return self._fs_overrides.get(row) or f'{self.fs_root}/tenant_{tenant_id}/'
+
+    def resource(self, tenant_id, key, default=None):
+        return self._read_resource(self._rows[tenant_id], key, default)
+
+    # --- MutableMapping interface ---
+
+    def __getitem__(self, tenant_id):
+        return TenantRecord(self, tenant_id, self._rows[tenant_id])
+
+    def __setitem__(self, tenant_id, record):
+        self.add(tenant_id, record.get('resources'), record.get('vm_status', 'running'))
+        fs_path = record.get('fs_path')
+        if fs_path is not None and fs_path != self.fs_path(tenant_id):
+            self._fs_overrides[self._rows[tenant_id]] = fs_path
+
+    def __delitem__(self, tenant_id):
+        row = self._rows.pop(tenant_id)
+        self._record(tenant_id, self._status_names[self._status[row]], None)
+        self._ids[row] = None
+        self._overflow.pop(row, None)
+        self._fs_overrides.pop(row, None)
+        self._free_rows.append(row)
+
+    def __contains__(self, tenant_id):
+        return tenant_id in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({len(self)} tenants)'
+
+    # --- Internals ---
+
+    def _record(self, tenant_id, old_status, new_status):
+        codes = self._status_codes
+        self._journal_ids.append(tenant_id)
+        self._journal_codes += bytes((_NO_STATUS if old_status is None else codes[old_status],
+                                      _NO_STATUS if new_status is None else codes[new_status]))
+        if len(self._journal_ids) > self.journal_limit:
+            self._drop_journal(len(self._journal_ids) // 2)
+
+    def _journal_entries(self, start):
+        names, codes = self._status_names, self._journal_codes
+        for index in range(start, len(self._journal_ids)):
+            old, new = codes[2 * index], codes[2 * index + 1]
+            yield (self._journal_ids[index],
+                   None if old == _NO_STATUS else names[old], None if new == _NO_STATUS else names[new])
+
+    def _drop_journal(self, count):
+        del self._journal_ids[:count]
+        del self._journal_codes[:2 * count]
+        self._journal_floor += count
+
+    def _mark_edited(self, tenant_id):
+        self.edited.add(tenant_id)
+        self._edit_ids.append(tenant_id)
+        if len(self._edit_ids) > self.journal_limit:
+            self._drop_edits(len(self._edit_ids) // 2)
+
+    def _drop_edits(self, count):
+        del self._edit_ids[:count]
+        self._edit_floor += count
+
+    def _journal_offset(self, version):
+        if not self._journal_floor <= version <= self.version:
+            raise ValueError(f"Journal covers versions {self._journal_floor}..{self.version}; cannot diff from {version}.")
+        return version - self._journal_floor
+
+    def _allocate_row(self, tenant_id):
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._ids[row] = tenant_id
+        else:
+            row = len(self._ids)
+            self._ids.append(tenant_id)
+            self._status.append(0)
+            for column in self._columns.values():
+                column.append(_MISSING)
+        self._rows[tenant_id] = row
+        return row
+
+    def _status_code(self, vm_status):
+        code = self._status_codes.get(vm_status)
+        if code is None:
+            if len(self._status_names) >= _NO_STATUS:
+                raise ValueError(f"Too many distinct VM statuses to intern {vm_status!r}.")
+            code = len(self._status_names)
+            self._status_names.append(vm_status)
+            self._status_codes[vm_status] = code
+        return code
+
+    def _write_resources(self, row, resources):
+        overflow = {}
+        for column in self._columns.values():
+            column[row] = _MISSING
+        for key, value in resources.items():
+            column = self._columns.get(key)
+            if column is not None and type(value) is int and _MISSING < value <= _INT64_MAX:
+                column[row] = value
+            else:
+                overflow[key] = value
+        if overflow:
+            self._overflow[row] = overflow
+        else:
+            self._overflow.pop(row, None)
+
+    def _read_resource(self, row, key, default=None):
+        overflow = self._overflow.get(row)
+        if overflow and key in overflow:
+            return overflow[key]
+        column = self._columns.get(key)
+        if column is not None and column[row] != _MISSING:
+            return column[row]
+        return default
+
+    def _resource_keys(self, row):
+        keys = [key for key, column in self._columns.items() if column[row] != _MISSING]
+        keys.extend(self._overflow.get(row, ()))
+        return keys
+
+    def _check_row(self, tenant_id, row):
+        # A view outlives its tenant if the tenant is deleted; never let it read a reused row
+        if self._rows.get(tenant_id) != row:
+            raise KeyError(tenant_id)
+
+
+class TenantRecord(MutableMapping):
+    """Dict-like view of one tenant: 'vm_status', 'fs_path' and 'resources'."""
+
+    __slots__ = ('_registry', '_tenant_id', '_row')
+
+    _KEYS = ('vm_status', 'fs_path', 'resources')
+
+    def __init__(self, registry, tenant_id, row):
+        self._registry = registry
+        self._tenant_id = tenant_id
+        self._row = row
+
+    def __getitem__(self, key):
+        registry = self._registry
+        registry._check_row(self._tenant_id, self._row)
+        if key == 'vm_status':
+            return registry._status_names[registry._status[self._row]]
+        if key == 'fs_path':
+            return registry.fs_path(self._tenant_id)
+        if key == 'resources':
+            return ResourcesView(registry, self._tenant_id, self._row)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        registry = self._registry
+        registry._check_row(self._tenant_id, self._row)
+        if key == 'vm_status':
+            registry.set_status(self._tenant_id, value)
+        elif key == 'fs_path':
+            registry._fs_overrides[self._row] = value
+            registry._mark_edited(self._tenant_id)
+        elif key == 'resources':
+            registry._write_resources(self._row, value)
+            registry._mark_edited(self._tenant_id)
+        else:
+            raise KeyError(f"Tenant records only hold {', '.join(self._KEYS)}; cannot set {key!r}.")
+
+    def __delitem__(self, key):
+        raise TypeError("Tenant record fields cannot be deleted; deprovision the tenant instead.")
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self):
+        return len(self._KEYS)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class ResourcesView(MutableMapping):
+    """Dict-like view of one tenant's resource columns."""
+
+    __slots__ = ('_registry', '_tenant_id', '_row')
+
+    def __init__(self, registry, tenant_id, row):
+        self._registry = registry
+        self._tenant_id = tenant_id
+        self._row = row
+
+    def __getitem__(self, key):
+        self._registry._check_row(self._tenant_id, self._row)
+        value = self._registry._read_resource(self._row, key, _ABSENT)
+        if value is _ABSENT:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._registry._check_row(self._tenant_id, self._row)
+        resources = dict(self.items())
+        resources[key] = value
+        self._registry._write_resources(self._row, resources)
+        self._registry._mark_edited(self._tenant_id)
+
+    def __delitem__(self, key):
+        resources = dict(self.items())
+        del resources[key]
+        self._registry._write_resources(self._row, resources)
+        self._registry._mark_edited(self._tenant_id)
+
+    def __iter__(self):
+        self._registry._check_row(self._tenant_id, self._row)
+        return iter(self._registry._resource_keys(self._row))
+
+    def __len__(self):
+        return len(self._registry._resource_keys(self._row))
+
+    def __repr__(self):
+        return repr(dict(self.items()))
@@ -1,91 +1,107 @@
 # TestAutomationLibrary.py - This serves as the Robot Framework Library
 
-import time
-from unittest.mock import MagicMock # Keep MagicMock for simulation
+from CommandPolicy import COMMAND_POLICY
+from TenantLibraryBase import TenantLibraryBase
+# AsyncSystemManager, FaultScheduler, ContentionProbe and LogLeakageScanner (asyncio, multiprocessing)
+# are imported inside the SR/MT-02/UT-02 keywords that use them
 
-class TestAutomationLibrary:
+# Messages for denied guest commands, keyed by policy rule (all denials raise PermissionError)
+DENIED_COMMAND_MESSAGES = {
+    'UT-05': "[UT-05] Mount failed in {tenant_id}: Permission denied or resource missing.",
+    'UT-06': "[UT-06] Unmount failed in {tenant_id}: Critical device busy.",
+    'UT-10': "[UT-10] Operation not permitted: Cannot change file ownership.",
+}
+
+class TestAutomationLibrary(TenantLibraryBase):
     """
     A Robot Framework Library exposing End-to-End QA Keywords.
     This replaces the SystemManager and incorporates the scenario logic.
+
+    Global scope, lazy state: importing and constructing the library has no
+    side effects. The initial tenants are materialized when a keyword first
+    touches tenant state, and restored before every later test by the
+    library's own listener. Keywords shared with SystemManagerLibrary live in
+    TenantLibraryBase; here their errors carry the test ID they belong to.
     """
-    
-    def __init__(self):
-        self.tenant_data = {}
-        # Initial provisioning (used by MT tests)
-        self._provision_initial_tenants()
-
-    def _provision_initial_tenants(self):
-        # Internal provisioning helper
-        for tenant_id, resources in [('TenantA', {'cpu': 2, 'mem': 4}), 
-                                     ('TenantB', {'cpu': 4, 'mem': 8}), 
-                                     ('TenantC', {'cpu': 1, 'mem': 2})]:
-            self.provision_vm(tenant_id, resources)
-
-    def provision_vm(self, tenant_id, resources):
-        """[UT-01] Simulates provisioning a VM."""
-        storage = resources.get('storage', 0)
-        if storage > 500: # HC-02 check
-            raise AssertionError(f"Provisioning failed: Storage limit exceeded for {tenant_id}.")
-        
-        self.tenant_data[tenant_id] = {
-            'vm_status': 'running', 
-            'fs_path': f'/mnt/shared/tenant_{tenant_id}/', 
-            'resources': resources
-        }
-        return "SUCCESS"
+
+    ROBOT_LIBRARY_SCOPE = 'GLOBAL'
+    ROBOT_LISTENER_API_VERSION = 2
+
+    def _tag(self, test_id):
+        return f'[{test_id}] '
 
     def deprovision_tenant(self, tenant_id):
         """[MT-05] Simulates deleting a tenant and its resources."""
         if tenant_id in self.tenant_data:
+            if self.local_fs is not None:
+                self.local_fs.drop(tenant_id)
             del self.tenant_data[tenant_id]
+            self.storage.release(tenant_id)
+            self.filesystem.drop(tenant_id)
             return True
         return False
 
-    def check_vm_status(self, tenant_id):
-        """Returns the current VM status."""
-        return self.tenant_data.get(tenant_id, {}).get('vm_status', 'unknown')
+    def rollback_vm(self, tenant_id, snapshot_id=None):
+        """[VC-01] Restores the tenant's files and resources to a snapshot (default: the latest)."""
+        self._rollback(tenant_id, snapshot_id)
+        return True
 
-    def attempt_cross_tenant_write(self, tenant_a, tenant_b):
-        """[MT-01] Tenant A attempts to write to Tenant B's filesystem."""
+    def attempt_cross_tenant_write(self, tenant_a, tenant_b, data='Malicious Data', path='/data/cross_tenant.dat'):
+        """[MT-01] Tenant A attempts to write to Tenant B's filesystem (a real write when the library has an fs_root)."""
         # This keyword should be called with Run Keyword And Expect Error
+        if self.local_fs is not None:
+            self.local_fs.write(tenant_a, path, data, owner=tenant_b)
+            return "Write Succeeded (Unexpected!)"
         if tenant_a != tenant_b:
             raise PermissionError(f"Permission Denied: {tenant_a} cannot access {tenant_b}'s data.")
         return "Write Succeeded (Unexpected!)"
-    
-    def check_resource_isolation(self, tenant_id_a, tenant_id_b):
-        """[MT-02] Placeholder for checking resource contention/QoS."""
-        # In a real environment, this would call a monitoring API
-        return True
+
+    def measure_resource_contention(self, noisy_tenant, victim_tenant, threshold=None, samples=2000):
+        """[MT-02] Runs noisy-neighbour load and returns the victim's p50/p99 degradation report."""
+        from ContentionProbe import DEFAULT_THRESHOLD, ContentionProbe
+        threshold = DEFAULT_THRESHOLD if threshold is None else float(threshold)
+        report = ContentionProbe(threshold=threshold, samples=int(samples)).measure(noisy_tenant, victim_tenant)
+        if not report.isolated:
+            raise AssertionError(f"[MT-02] {victim_tenant} p99 latency degraded {report.p99_degradation:.2f}x "
+                                 f"under load from {noisy_tenant} (limit {report.threshold}x).")
+        return report._asdict()
 
     def check_logging_for_leakage(self, tenant_id_a, tenant_id_b):
         """[UT-02] Checks if Tenant A's logs contain Tenant B's data."""
         logs_a = "Log for Tenant A only."
-        if "Tenant B" in logs_a:
-            return False
-        return True
-        
+        return not self._leak_scanner(tenant_id_b).scan_text(logs_a, owner=tenant_id_a)
+
     def execute_fs_command_in_vm(self, tenant_id, command):
         """[UT-05, UT-06, UT-10] Simulates VM execution of Linux commands."""
-        if command.startswith("mount /dev/sdb /mnt/tenant_B_path"):
-            raise PermissionError(f"[UT-05] Mount failed in {tenant_id}: Permission denied or resource missing.")
-        
-        elif command.startswith("umount /"):
-            raise PermissionError(f"[UT-06] Unmount failed in {tenant_id}: Critical device busy.")
-            
-        elif "chown root:root" in command:
-            raise PermissionError(f"[UT-10] Operation not permitted: Cannot change file ownership.")
-            
+        rule = COMMAND_POLICY.match(command, tenant_id, self.traversal_guard)
+        if rule is not None and not rule.allowed:
+            template = DENIED_COMMAND_MESSAGES.get(rule.rule_id, f"[{rule.rule_id}] {rule.message}")
+            raise PermissionError(template.format(tenant_id=tenant_id))
+
         return "Command executed successfully."
 
     def simulate_host_failure(self, tenant_id):
         """[SR-01] Simulates Host failure leading to HA failover."""
-        time.sleep(1) 
+        self.tenant_data.set_status(tenant_id, 'restarting')
         # Logic assumes HA automatically recovers the VM
-        self.tenant_data[tenant_id]['vm_status'] = 'running'
+        self.clock.call_later(1, self._set_vm_status, tenant_id, 'running')
+        self.clock.sleep(1)
         return "HA Failover complete"
-        
+
+    def simulate_rack_failure(self, *tenant_ids):
+        """[SR-01] Simulates a rack outage: every listed tenant's host fails at once and fails over concurrently."""
+        from AsyncSystemManager import run_sync
+        run_sync(self._fault_injector().simulate_rack_failure(tenant_ids))
+        return "HA Failover complete"
+
+    def simulate_shared_fs_failure(self, *tenant_ids):
+        """[SR-02] Shared filesystem failure: I/O is suspended for every listed tenant until the FS recovers."""
+        self._shared_fs_outage(tenant_ids)
+        return "Shared FS recovered"
+
     def simulate_guest_crash_and_recovery(self, tenant_id):
         """[SR-03] Simulates Guest OS crash and auto-restart."""
-        time.sleep(0.5) 
-        self.tenant_data[tenant_id]['vm_status'] = 'running'
-        return "Guest auto-restart successful"
\ No newline at end of file
+        self.tenant_data.set_status(tenant_id, 'crashed')
+        self.clock.call_later(0.5, self._set_vm_status, tenant_id, 'running')
+        self.clock.sleep(0.5)
+        return "Guest auto-restart successful"
@@ -1,90 +1,51 @@
-import unittest
+import asyncio
+import io
+import os
+import posixpath
+import random
+import sys
+import tempfile
+import threading
 import time
-from unittest.mock import MagicMock
-
-# --- Placeholder API/System Interaction Class ---
-# This class mocks the interaction with Hypervisor API, FS Management, and VM execution.
-class SystemManager:
-    """Mock class for interacting with the underlying system components."""
-    def __init__(self):
-        self.tenant_data = {}
-        self.provision_vm('TenantA', {'cpu': 2, 'mem': 4})
-        self.provision_vm('TenantB', {'cpu': 4, 'mem': 8})
-        self.provision_vm('TenantC', {'cpu': 1, 'mem': 2})
-
-    def provision_vm(self, tenant_id, resources):
-        if resources.get('storage', 0) > 500: # Mock storage limit for HC-02
-            return False, "Error: Storage limit exceeded."
-        self.tenant_data[tenant_id] = {
-            'vm_status': 'running', 
-            'fs_path': f'/mnt/shared/tenant_{tenant_id}/', 
-            'resources': resources
-        }
-        return True, "Success"
-
-    def write_fs(self, tenant_id, path, data, target_tenant):
-        if target_tenant != tenant_id:
-            # MT-01: Simulate ACL/permission check failure for cross-tenant access
-            return False, f"Permission Denied: Tenant {tenant_id} cannot access {target_tenant}'s data."
-        return True, "Data written successfully."
-
-    def check_isolation(self, tenant_id_a, tenant_id_b):
-        # MT-02: Simulate checking resource usage; assumes isolation is maintained
-        return True
-
-    def deprovision_tenant(self, tenant_id):
-        if tenant_id in self.tenant_data:
-            del self.tenant_data[tenant_id]
-            return True
-        return False
-
-    def monitor_logs(self, tenant_id):
-        # UT-02: Simulate logging isolation
-        if tenant_id == 'TenantA':
-            return "Log for Tenant A only."
-        elif tenant_id == 'TenantB':
-            return "Log for Tenant B only."
-        return ""
-    
-    def simulate_host_failure(self):
-        # SR-01: Simulate Host Failure and HA failover
-        time.sleep(1)
-        return True 
-
-    def check_vm_status(self, tenant_id):
-        return self.tenant_data.get(tenant_id, {}).get('vm_status', 'unknown')
-
-    def execute_in_vm(self, tenant_id, command):
-        """Simulates executing a Linux command inside a specific VM."""
-        # UT-05: Mount Isolation
-        if command.startswith("mount /dev/sdb /mnt/tenant_B_path"):
-            return False, "Error: Mount failed. Device not found or permission denied."
-        
-        # UT-06: Unmount Protection
-        elif command.startswith("umount /"):
-            return False, "Error: umount: /: device is busy or insufficient privileges."
-            
-        # UT-07: List/Traverse Negative
-        elif command.startswith("ls -l /..") or command.startswith("cd ../.."):
-            return False, "ls: cannot access '../..': Permission denied."
-            
-        # UT-09: CHMOD Positive
-        elif "chmod 777 my_file.txt" in command:
-            return True, "Permissions changed successfully."
-            
-        # UT-10: CHOWN Negative
-        elif "chown root:root my_file.txt" in command:
-            return False, "Error: Operation not permitted: Cannot change file ownership."
-            
-        # UT-08: LS Positive
-        elif "ls -l my_file.txt" in command:
-            return True, "drwxrwxr-x tenantA_user tenantA_group my_file.txt"
-
-        return True, "Command executed successfully (simulated)."
-    
+import tracemalloc
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import quote
+
+from AsyncSystemManager import FS_RECOVERY_SECONDS, AsyncSystemManager
+from BackupEngine import BackupEngine
+from CommandPolicy import COMMAND_POLICY, CONTAINS, PREFIX, CommandPolicy, PolicyRule
+from ContentionProbe import MEASURE_ENV
+from FaultScheduler import FaultScheduler
+from HypervisorBackend import HttpHypervisor
+from KeywordTracer import KeywordTracer
+from MultiPatternMatcher import MultiPatternMatcher, PrefixTrie
+from ParallelSuiteRunner import ParallelSuite, _MergedResult
+from StandInOrchestrator import start_orchestrator
+from SystemManager import SystemManager
+from TenantFixturePool import TenantFixturePool
+from TenantRegistry import TenantRegistry, TenantRecord
+from TraversalGuard import canonicalize
+from VirtualClock import RealClock, VirtualClock
+
 # Initialize the mock system manager
 system_manager = SystemManager()
 
+# Tenants every test starts from, on top of TenantA/B/C from SystemManager itself
+BASELINE_TENANTS = {'TenantF': {'cpu': 1, 'mem': 2, 'storage': 50},
+                    'TenantHA': {'cpu': 1, 'mem': 2}}
+
+
+def baseline(manager):
+    """Session-scoped fixture: provisions BASELINE_TENANTS on first use, then restores them in O(tenants touched)."""
+    pool = getattr(manager, 'fixture_pool', None)
+    if pool is None:
+        pool = manager.fixture_pool = TenantFixturePool(manager, BASELINE_TENANTS)
+    else:
+        pool.reset()
+    return manager
+
 
 # ----------------------------------------------------------------------
 # 2. MultiTenancy Test Suit
@@ -94,7 +55,7 @@ class MultiTenancy(unittest.TestCase):
     """Test Suite for Multi-tenancy Isolation and Security."""
 
     def setUp(self):
-        self.manager = system_manager
+        self.manager = baseline(system_manager)
 
     def test_MT_01_data_isolation(self):
         """Verify Tenant A cannot read/write Tenant B's filesystem data."""
@@ -108,12 +69,68 @@ class MultiTenancy(unittest.TestCase):
         self.assertFalse(success, "Expected cross-tenant write to fail, but it succeeded.")
         self.assertIn("Permission Denied", message, "Expected permission denied message.")
 
+    def test_MT_01_local_fs_isolation_and_throughput(self):
+        """Verify cross-tenant, '..' and symlink writes are denied on disk while own-tree writes run at full speed."""
+        with tempfile.TemporaryDirectory() as fs_root:
+            manager = SystemManager(fs_root=fs_root)
+            block = os.urandom(4096)
+            started = time.perf_counter()
+            for index in range(2000):
+                success, message = manager.write_fs('TenantA', f'/data/block{index % 100}.bin', block, 'TenantA')
+                self.assertTrue(success, message)
+            throughput = 2000 * len(block) / (time.perf_counter() - started) / 1e6
+            # Reported, not asserted: disk speed on a shared CI host says nothing about isolation
+            print(f"\nMT-01 own-tree write throughput: {throughput:.1f} MB/s")
+            self.assertEqual(manager.local_fs.read('TenantA', '/data/block7.bin'), block)
+
+            tree_b = manager.local_fs.tenant_root('TenantB')
+            os.symlink(tree_b, os.path.join(manager.local_fs.tenant_root('TenantA'), 'data', 'link_to_b'))
+            for path, target in (('/data/file.txt', 'TenantB'),
+                                 ('/data/../../tenant_TenantB/file.txt', 'TenantA'),
+                                 ('//data/./../../../../etc/hosts', 'TenantA'),
+                                 ('/data/link_to_b/file.txt', 'TenantA')):
+                success, message = manager.write_fs('TenantA', path, 'Secret Data', target)
+                self.assertFalse(success, f"Write of {path!r} into {target}'s tree escaped Tenant A's tree.")
+                self.assertIn("Permission Denied", message)
+            self.assertEqual(os.listdir(tree_b), [], "Tenant B's tree was written to.")
+
+    def test_MT_01_local_fs_directory_swapped_for_symlink(self):
+        """Verify a directory replaced by a symlink after it was written to cannot redirect later writes."""
+        with tempfile.TemporaryDirectory() as fs_root:
+            manager = SystemManager(fs_root=fs_root)
+            success, message = manager.write_fs('TenantA', '/data/sub/x', 'own data', 'TenantA')
+            self.assertTrue(success, message)
+
+            tree_a = manager.local_fs.tenant_root('TenantA')
+            tree_b = manager.local_fs.tenant_root('TenantB')
+            sub = os.path.join(tree_a, 'data', 'sub')
+            os.remove(os.path.join(sub, 'x'))
+            os.rmdir(sub)
+            os.symlink(tree_b, sub)
+
+            success, message = manager.write_fs('TenantA', '/data/sub/stolen', 'Secret Data', 'TenantA')
+            self.assertFalse(success, "Write through a swapped-in symlink escaped Tenant A's tree.")
+            self.assertIn("Permission Denied", message)
+            self.assertEqual(os.listdir(tree_b), [], "Tenant B's tree was written to.")
+
     def test_MT_02_resource_contention(self):
         """Verify minimum resource guarantees during contention."""
         # Simulates a check that high load on Tenant A does not crash Tenant B
         is_isolated = self.manager.check_isolation('TenantA', 'TenantB')
         self.assertTrue(is_isolated, "Resource isolation failed.")
 
+    @unittest.skipUnless(os.environ.get(MEASURE_ENV), f"set {MEASURE_ENV}=1 to run the noisy-neighbour measurement")
+    def test_MT_02_contention_measurement(self):
+        """Verify the MT-02 load mode samples the victim under load and reports p50/p99 degradation."""
+        report = self.manager.measure_contention('TenantA', 'TenantB', cpu_workers=1, io_workers=1,
+                                                 samples=200, warmup=20, min_duration=0.05, threshold=float('inf'))
+        self.assertEqual((report.noisy_tenant, report.victim_tenant), ('TenantA', 'TenantB'))
+        self.assertGreaterEqual(report.samples, 200, "Victim latency was under-sampled.")
+        self.assertGreater(report.baseline_p99_us, 0, "No baseline latency recorded.")
+        self.assertGreaterEqual(report.baseline_p99_us, report.baseline_p50_us, "Percentiles out of order.")
+        self.assertGreater(report.p99_degradation, 0, "Degradation ratio not computed.")
+        self.assertTrue(report.isolated, "Report ignored the configured threshold.")
+
     def test_MT_05_cleanup_integrity(self):
         """Verify de-provisioning a tenant cleans up all resources without affecting others."""
         self.manager.provision_vm('TenantD_Temp', {'cpu': 1, 'mem': 2})
@@ -132,7 +149,7 @@ class Utils(unittest.TestCase):
     """Test Suite for System Utilities (Provisioning, Monitoring, Backup, and Filesystem Commands)."""
 
     def setUp(self):
-        self.manager = system_manager
+        self.manager = baseline(system_manager)
         self.test_tenant_id = 'TenantE'
 
     def test_UT_01_provisioning_tool(self):
@@ -147,16 +164,154 @@ class Utils(unittest.TestCase):
         self.assertIn("Tenant A", logs_a, "Tenant A logs not found.")
         self.assertNotIn("Tenant B", logs_a, "Tenant A logs contain data from Tenant B (Leakage detected!).")
         
+    def test_UT_02_log_scan_reports_every_leak(self):
+        """Verify the log scanner reports each foreign tenant ID with its offset, and nothing for clean logs."""
+        with tempfile.TemporaryDirectory() as log_dir:
+            clean = os.path.join(log_dir, 'TenantA.log')
+            leaky = os.path.join(log_dir, 'TenantB.log')
+            with open(clean, 'w') as handle:
+                handle.write("TenantA boot ok\n" * 100)
+            with open(leaky, 'w') as handle:
+                handle.write("TenantB boot ok\nrequest from TenantC served\nTenantCX is not a tenant\n")
+
+            leaks = self.manager.scan_logs([clean, leaky], workers=1)
+
+        self.assertEqual([(leak.owner, leak.tenant_id, leak.offset) for leak in leaks], [('TenantB', 'TenantC', 29)],
+                         f"Unexpected leak report: {leaks}")
+
     def test_UT_03_backup_restore_integrity(self):
         """Verify Backup/Restore process is tenant-specific and non-corrupting."""
-        self.manager.backup_tenant = MagicMock(return_value=True)
-        self.manager.restore_tenant = MagicMock(return_value=True)
-        
-        self.manager.backup_tenant('TenantB')
-        self.manager.restore_tenant('TenantB')
-        
+        dataset = os.urandom(256 * 1024)
+        self.manager.write_fs('TenantA', '/data/dataset.bin', dataset, 'TenantA')
+        self.manager.write_fs('TenantB', '/data/dataset.bin', dataset, 'TenantB')
+        self.manager.write_fs('TenantB', '/etc/app.conf', 'replicas=3', 'TenantB')
+
+        first = self.manager.backup_tenant('TenantA')
+        backup = self.manager.backup_tenant('TenantB')
+        self.assertEqual(backup.bytes, first.bytes + len('replicas=3'), "Backup missed some of Tenant B's files.")
+        self.assertLess(backup.new_bytes, backup.bytes / 10, "Data shared with Tenant A was stored twice.")
+        self.assertGreater(backup.dedup_ratio, 1.5, f"Unexpected dedup ratio {backup.dedup_ratio:.2f}.")
+
+        self.manager.write_fs('TenantB', '/etc/app.conf', 'replicas=0', 'TenantB')
+        self.manager.write_fs('TenantB', '/data/stray.tmp', 'partial write', 'TenantB')
+        self.assertTrue(self.manager.restore_tenant('TenantB'), "Restore failed.")
+
+        self.assertEqual(self.manager.filesystem.files('TenantB'), {'/data/dataset.bin': dataset, '/etc/app.conf': 'replicas=3'},
+                         "Restore did not bring back Tenant B's files exactly.")
+        self.assertEqual(self.manager.filesystem.files('TenantA'), {'/data/dataset.bin': dataset},
+                         "Tenant A's files were affected by Tenant B's restore.")
         self.assertEqual(self.manager.check_vm_status('TenantA'), 'running', "Tenant A was affected by Tenant B's restore.")
-        self.manager.restore_tenant.assert_called_with('TenantB')
+        self.manager.filesystem.drop('TenantA')
+        self.manager.filesystem.drop('TenantB')
+
+    def test_UT_01_bulk_provisioning_all_or_nothing(self):
+        """Verify bulk provisioning commits the whole manifest, or nothing if one entry exceeds the storage limit."""
+        manifest = {f'TenantBULK{i}': {'cpu': 1, 'mem': 2, 'storage': 10} for i in range(3)}
+        manifest['TenantBULKOVER'] = {'cpu': 1, 'mem': 2, 'storage': 600}
+        success, message = self.manager.provision_vms(manifest)
+        self.assertFalse(success, "Bulk provisioning succeeded despite an oversized entry.")
+        self.assertIn('TenantBULKOVER', message, "Oversized tenant not reported.")
+        self.assertEqual(self.manager.check_vm_status('TenantBULK0'), 'unknown', "Bulk provisioning was partially committed.")
+
+        del manifest['TenantBULKOVER']
+        success, message = self.manager.provision_vms(manifest)
+        self.assertTrue(success, f"Bulk provisioning failed unexpectedly: {message}")
+        for tenant_id in manifest:
+            self.assertEqual(self.manager.check_vm_status(tenant_id), 'running', f"{tenant_id} was not provisioned.")
+            self.manager.deprovision_tenant(tenant_id)
+
+    def test_UT_01_orchestrator_backend_round_trip(self):
+        """Verify a manager backed by the stand-in orchestrator sees its own provisioning over pooled connections."""
+        process, url = start_orchestrator()
+        manager = SystemManager(orchestrator_url=url)
+        try:
+            manifest = {f'TenantRPC{i}': {'cpu': 1, 'mem': 2, 'storage': 10} for i in range(2500)}
+            success, message = manager.provision_vms(manifest)
+            self.assertTrue(success, f"Bulk provisioning failed unexpectedly: {message}")
+            self.assertEqual(manager.hypervisor.health()['tenants'], len(manager.tenant_data),
+                             "Provisioning did not reach the orchestrator before the first query.")
+            manager.hypervisor.set_status('TenantRPC7', 'crashed')
+            manager.deprovision_tenant('TenantRPC8')
+            self.assertEqual(manager.provision_vm('Tenant RPC/9?x', {'cpu': 1, 'mem': 2}), (True, "Success"))
+            self.assertEqual(manager.check_vm_status('Tenant RPC/9?x'), 'running', "Tenant ID was not quoted in the URL.")
+
+            self.assertEqual(manager.check_vm_status('TenantRPC7'), 'crashed', "Status change did not reach the orchestrator.")
+            self.assertEqual(manager.check_vm_status('TenantRPC8'), 'unknown', "Deprovisioned VM still known to the orchestrator.")
+            statuses = manager.check_vm_statuses(list(manifest))
+            self.assertEqual(len(statuses), len(manifest), "Batched query lost answers.")
+            self.assertEqual(statuses.count('running'), len(manifest) - 2, "Batched statuses disagree with the registry.")
+            manager.tenant_data.set_status('TenantRPC10', 'stopped')
+            self.assertEqual(manager.check_vm_status('TenantRPC10'), 'stopped', "Direct registry change was not synced.")
+
+            health = manager.hypervisor.health()
+            self.assertEqual(health['tenants'], len(manager.tenant_data), "Orchestrator holds the wrong number of VMs.")
+            self.assertLessEqual(manager.hypervisor.connections_opened, 4, "Connections were not reused.")
+        finally:
+            manager.hypervisor.close()
+            process.terminate()
+            process.wait()
+
+    def test_UT_01_orchestrator_resources_and_failed_requests(self):
+        """Verify re-provisioned and rolled-back resources reach the orchestrator, and a failed request undoes the provisioning."""
+        process, url = start_orchestrator()
+        manager = SystemManager(orchestrator_url=url)
+        try:
+            remote = lambda tenant_id: manager.hypervisor.request('GET', f"/vms/{quote(tenant_id, safe='')}")
+            self.assertEqual(manager.provision_vm('TenantRES', {'cpu': 1, 'mem': 2, 'storage': 10}), (True, "Success"))
+            snapshot = manager.take_snapshot('TenantRES')
+            self.assertEqual(manager.provision_vm('TenantRES', {'cpu': 8, 'mem': 16, 'storage': 20}), (True, "Success"))
+            self.assertEqual(remote('TenantRES'), {'status': 'running', 'resources': {'cpu': 8, 'mem': 16, 'storage': 20}},
+                             "Re-provisioned resources did not reach the orchestrator.")
+            self.assertTrue(manager.rollback_vm('TenantRES', snapshot))
+            self.assertEqual(remote('TenantRES')['resources'], {'cpu': 1, 'mem': 2, 'storage': 10},
+                             "Rolled-back resources did not reach the orchestrator.")
+            self.assertEqual(manager.storage.reservation('TenantRES')[1], 20)
+
+            free = manager.storage.free()
+            process.terminate()
+            process.wait()
+            with self.assertRaises(OSError):
+                manager.provision_vm('TenantRES', {'cpu': 4, 'mem': 8, 'storage': 30})
+            with self.assertRaises(OSError):
+                manager.provision_vms({'TenantRES': {'cpu': 2, 'mem': 4, 'storage': 5},
+                                       'TenantNEW': {'cpu': 2, 'mem': 4, 'storage': 5}})
+            self.assertEqual(manager.storage.reservation('TenantRES')[1], 20, "Failed provisioning leaked its reservation.")
+            self.assertIsNone(manager.storage.reservation('TenantNEW'), "Failed provisioning leaked its reservation.")
+            self.assertEqual(manager.storage.free(), free, "Failed provisioning changed the pool's free space.")
+            self.assertEqual(manager.tenant_data['TenantRES']['resources'], {'cpu': 1, 'mem': 2, 'storage': 10},
+                             "Failed provisioning left its resources in the registry.")
+            self.assertNotIn('TenantNEW', manager.tenant_data, "Failed provisioning left its tenant in the registry.")
+        finally:
+            manager.hypervisor.close()
+            process.terminate()
+            process.wait()
+
+    def test_UT_01_orchestrator_non_json_error(self):
+        """Verify an HTML error page from the orchestrator's address surfaces as a clear error, not a JSON traceback."""
+        class HtmlErrors(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                body = b'<html><body><h1>400 Bad Request</h1></body></html>'
+                self.send_response(400)
+                self.send_header('Content-Type', 'text/html')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), HtmlErrors)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        client = HttpHypervisor(f'http://127.0.0.1:{server.server_address[1]}', TenantRegistry())
+        try:
+            with self.assertRaisesRegex(ConnectionError, r"400 to GET /health with a non-JSON body: b'<html>"):
+                client.health()
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
 
     # --- New Filesystem Command Scenarios ---
     def test_UT_05_mount_isolation(self):
@@ -173,6 +328,62 @@ class Utils(unittest.TestCase):
         )
         self.assertFalse(success, "Critical mount point was successfully unmounted by a tenant VM.")
     
+    def test_UT_07_traversal_denial(self):
+        """Verify any path argument that climbs out of the tenant's tree is denied, however it is spelled."""
+        for command in ('ls -l /..', 'cd ../..', 'cat ./a/../../../etc/hosts', 'cp my_file.txt data//.//../../x',
+                        'tar -C ../ -xf backup.tar', 'dd if=/data/../../dev/sda of=disk.img', 'ls; cat "../secret"'):
+            success, output = self.manager.execute_in_vm(tenant_id='TenantA', command=command)
+            self.assertFalse(success, f"Traversal was not denied: {command!r}")
+            self.assertIn("permission denied", output.lower())
+        for command in ('cat ./a/../b/file.txt', 'ls -l data/./logs//today', 'cat ...hidden/notes', 'ls -l /'):
+            success, output = self.manager.execute_in_vm(tenant_id='TenantA', command=command)
+            self.assertTrue(success, f"In-tree command was denied: {command!r} ({output})")
+
+    def test_UT_07_canonicalization_matches_posix(self):
+        """Fuzz the memoized resolver against posixpath.normpath on a tenant root."""
+        rng = random.Random(7)
+        components = ('a', 'b', '.', '..', '', '...', 'etc')
+        for _ in range(20000):
+            path = '/' * rng.randrange(3) + '/'.join(rng.choice(components) for _ in range(rng.randrange(1, 9)))
+            depth, escaped = 0, False
+            for part in path.split('/'):
+                depth += -1 if part == '..' else part not in ('', '.')
+                escaped = escaped or depth < 0
+            expected = None if escaped else posixpath.normpath('/tenant/' + path)[len('/tenant/'):]
+            self.assertEqual(canonicalize(path), expected, f"Resolver disagrees on {path!r}")
+
+    def test_UT_07_symlink_escape_on_disk(self):
+        """Verify a symlink in the tenant's tree cannot be used to reach another tenant's files."""
+        with tempfile.TemporaryDirectory() as fs_root:
+            manager = SystemManager(fs_root=fs_root)
+            manager.write_fs('TenantB', '/secret.txt', 'Tenant B data', 'TenantB')
+            tree_a = manager.local_fs.tenant_root('TenantA')
+            os.symlink(manager.local_fs.tenant_root('TenantB'), os.path.join(tree_a, 'shared'))
+            os.symlink(os.path.join(manager.local_fs.tenant_root('TenantB'), 'secret.txt'), os.path.join(tree_a, 'notes'))
+            for command in ('cat shared/secret.txt', 'cat /notes', 'ls -l ./shared/'):
+                success, _ = manager.execute_in_vm('TenantA', command)
+                self.assertFalse(success, f"Symlink escape was not denied: {command!r}")
+            self.assertTrue(manager.execute_in_vm('TenantA', 'cat data/file.txt')[0])
+            self.assertTrue(manager.execute_in_vm('TenantB', 'cat /secret.txt')[0])
+
+    def test_UT_07_symlink_then_dotdot_on_disk(self):
+        """Verify '..' after a symlink is resolved from the link's target, not folded away beside the link."""
+        with tempfile.TemporaryDirectory() as fs_root:
+            manager = SystemManager(fs_root=fs_root)
+            manager.write_fs('TenantA', '/data/own.txt', 'Tenant A data', 'TenantA')
+            manager.write_fs('TenantB', '/sub/inner.txt', 'Tenant B data', 'TenantB')
+            manager.write_fs('TenantB', '/secret', 'Tenant B data', 'TenantB')
+            tree_a, tree_b = manager.local_fs.tenant_root('TenantA'), manager.local_fs.tenant_root('TenantB')
+            os.symlink(os.path.join(tree_b, 'sub'), os.path.join(tree_a, 'data', 'lnk'))
+            os.mkdir(os.path.join(tree_a, 'data', 'inner'))
+            os.symlink(os.path.join(tree_a, 'data', 'inner'), os.path.join(tree_a, 'data', 'own_lnk'))
+            for command in ('cat data/lnk/../secret', 'cat /data/lnk/..', 'ls data/./lnk/../../tenant_TenantB'):
+                success, _ = manager.execute_in_vm('TenantA', command)
+                self.assertFalse(success, f"Symlink followed by '..' was not denied: {command!r}")
+            for command in ('cat data/own_lnk/../own.txt', 'ls data/inner/..', 'cat data/missing/../own.txt'):
+                success, output = manager.execute_in_vm('TenantA', command)
+                self.assertTrue(success, f"In-tree path was denied: {command!r}: {output}")
+
     def test_UT_09_give_remove_permission_positive(self):
         """Verify a tenant can change permissions (chmod) on its own files."""
         success_grant, _ = self.manager.execute_in_vm(tenant_id='TenantA', command='chmod 777 my_file.txt')
@@ -185,9 +396,84 @@ class Utils(unittest.TestCase):
         success, output = self.manager.execute_in_vm(tenant_id='TenantA', command='chown root:root my_file.txt')
         self.assertFalse(success, "Tenant A successfully changed ownership to 'root'.")
         self.assertIn("operation not permitted", output.lower(), "Expected permission denial on chown attempt.")
-        
-    def tearDown(self):
-        self.manager.deprovision_tenant(self.test_tenant_id)
+
+    def test_UT_command_policy_rule_outcomes(self):
+        """Verify each UT-05..UT-10 rule decides its own commands, and unmatched commands fall through."""
+        cases = (('mount /dev/sdb /mnt/tenant_B_path', 'UT-05', False),
+                 ('umount /', 'UT-06', False),
+                 ('ls -l /..', 'UT-07', False),
+                 ('cd ../..', 'UT-07', False),
+                 ('cat --file=../x', 'UT-07', False),
+                 ('ls -l my_file.txt', 'UT-08', True),
+                 ('chmod 777 my_file.txt', 'UT-09', True),
+                 ('chown root:root my_file.txt', 'UT-10', False),
+                 ('echo hello', None, True))
+        for command, rule_id, allowed in cases:
+            rule = COMMAND_POLICY.match(command)
+            self.assertEqual(rule and rule.rule_id, rule_id, f"Wrong rule for {command!r}")
+            self.assertEqual(COMMAND_POLICY.evaluate(command)[0], allowed, f"Wrong outcome for {command!r}")
+
+    def test_UT_command_policy_overlapping_rules(self):
+        """Verify the earliest rule wins when several match, whichever matcher found them."""
+        cases = (('chmod 777 my_file.txt && chown root:root my_file.txt', 'UT-10'),
+                 ('umount / && ls -l my_file.txt', 'UT-06'),
+                 ('ls -l my_file.txt ../../etc', 'UT-07'),
+                 ('mount /dev/sdb /mnt/tenant_B_path/../..', 'UT-05'))
+        for command, rule_id in cases:
+            self.assertEqual(COMMAND_POLICY.match(command).rule_id, rule_id, f"Wrong rule won for {command!r}")
+
+        first = PolicyRule('FIRST', CONTAINS, ('ab',), True, '')
+        second = PolicyRule('SECOND', CONTAINS, ('b',), False, '')
+        anchored = PolicyRule('ANCHORED', PREFIX, ('x',), True, '')
+        self.assertEqual(CommandPolicy((first, second)).match('xab').rule_id, 'FIRST')
+        self.assertEqual(CommandPolicy((second, first)).match('xab').rule_id, 'SECOND')
+        self.assertEqual(CommandPolicy((second, anchored)).match('xab').rule_id, 'SECOND')
+        self.assertEqual(CommandPolicy((anchored, second)).match('xab').rule_id, 'ANCHORED')
+        with self.assertRaises(ValueError):
+            CommandPolicy((PolicyRule('BAD', 'regex', ('x',), True, ''),))
+
+    def test_UT_multi_pattern_matcher_overlaps(self):
+        """Verify the automaton reports every overlapping occurrence in end order, and the trie every prefix."""
+        matcher = MultiPatternMatcher(['he', 'she', 'his', 'hers'])
+        self.assertEqual(list(matcher.iter_matches('ushers')), [(1, 1), (2, 0), (2, 3)])
+        self.assertEqual(list(matcher.iter_matches('ahishers', offset=10)), [(11, 2), (13, 1), (14, 0), (14, 3)])
+        self.assertEqual(matcher.matched_indices('this'), {2})
+        self.assertEqual(matcher.first_characters(), {'h', 's'})
+        with self.assertRaises(ValueError):
+            MultiPatternMatcher(['ok', ''])
+        self.assertEqual(PrefixTrie(['ls', 'ls -l', 'l', 'cd']).prefixes_of('ls -la'), [2, 0, 1])
+        self.assertEqual(PrefixTrie(['ls']).prefixes_of('cd ..'), [])
+
+    def test_UT_baseline_fixture_reset(self):
+        """Verify the fixture pool restores a large baseline fleet by visiting only the tenants a test touched."""
+        manager = SystemManager(storage_pools={'default': 10 ** 6})
+        pool = TenantFixturePool(manager, {f'Fleet{index}': {'cpu': 1, 'mem': 2, 'storage': 10} for index in range(20000)})
+
+        manager.tenant_data.set_status('Fleet1', 'crashed')
+        manager.tenant_data['Fleet2']['resources']['cpu'] = 16
+        manager.write_fs('Fleet3', '/etc/app.conf', 'drift', 'Fleet3')
+        manager.deprovision_tenant('Fleet4')
+        manager.provision_vm('TenantExtra', {'cpu': 1, 'mem': 2, 'storage': 10})
+        AsyncSystemManager(manager).inject_failure('Fleet5', 'restarting', 1)
+        free = manager.storage.free()
+
+        self.assertEqual(pool.reset(), 6, "Reset visited tenants the test never touched.")
+        self.assertEqual(manager.check_vm_status('Fleet1'), 'running')
+        self.assertEqual(manager.tenant_data['Fleet2']['resources']['cpu'], 1)
+        self.assertFalse(manager.file_exists('Fleet3', '/etc/app.conf'))
+        self.assertEqual(manager.storage.reservation('Fleet4'), ('default', 10))
+        self.assertNotIn('TenantExtra', manager.tenant_data)
+        self.assertEqual(manager.check_vm_status('Fleet5'), 'running')
+        self.assertEqual(manager.storage.free(), free, "Storage reservations were not restored.")
+        with self.assertRaises(ValueError, msg="Reset kept a long journal from before the checkpoint."):
+            manager.tenant_data.journal_since(0)
+        self.assertEqual(pool.reset(), 0, "An untouched fleet was not already at baseline.")
+
+        version = manager.tenant_data.version
+        manager.tenant_data.set_status('Fleet1', 'crashed')
+        self.assertEqual(pool.reset(), 1)
+        self.assertEqual(len(manager.tenant_data.journal_since(version)), 2,
+                         "A short journal was trimmed, so readers behind the mark would resend the fleet.")
 
 # ----------------------------------------------------------------------
 # 4. HardwareAndVMConfig Test Suit
@@ -197,9 +483,8 @@ class HardwareAndVMConfig(unittest.TestCase):
     """Test Suite for Hardware and VM/Container Configuration Changes."""
 
     def setUp(self):
-        self.manager = system_manager
+        self.manager = baseline(system_manager)
         self.config_tenant_id = 'TenantF'
-        self.manager.provision_vm(self.config_tenant_id, {'cpu': 1, 'mem': 2, 'storage': 50})
 
     def test_HC_02_storage_pool_limit(self):
         """Verify provisioning fails when storage capacity is exceeded."""
@@ -208,20 +493,93 @@ class HardwareAndVMConfig(unittest.TestCase):
         self.assertFalse(success, "VM provisioning succeeded despite exceeding storage limit.")
         self.assertIn("storage limit exceeded", message, "Did not receive expected resource limit error message.")
 
+    def test_HC_02_storage_pool_overcommit(self):
+        """Verify the pool rejects overcommit across tenants and deprovisioning returns capacity."""
+        manager = SystemManager(storage_pools={'default': 1000})
+        for index in range(2):
+            success, message = manager.provision_vm(f'TenantPOOL{index}', {'cpu': 1, 'mem': 2, 'storage': 400})
+            self.assertTrue(success, f"Provisioning within pool capacity failed: {message}")
+
+        success, message = manager.provision_vm('TenantPOOLOVER', {'cpu': 1, 'mem': 2, 'storage': 400})
+        self.assertFalse(success, "Pool was overcommitted.")
+        self.assertIn("storage limit exceeded", message, "Did not receive expected pool capacity error message.")
+
+        manager.deprovision_tenant('TenantPOOL0')
+        success, message = manager.provision_vm('TenantPOOLOVER', {'cpu': 1, 'mem': 2, 'storage': 400})
+        self.assertTrue(success, f"Capacity was not released by deprovisioning: {message}")
+
+        free = manager.storage.free()
+        with self.assertRaises(ValueError, msg="A negative reservation was accepted."):
+            manager.storage.reserve('TenantNEG', -500)
+        with self.assertRaises(ValueError, msg="A negative bulk reservation was accepted."):
+            manager.storage.reserve_many([('TenantPOS', 10), ('TenantNEG', -500)])
+        self.assertEqual(manager.storage.free(), free, "A rejected reservation changed the pool.")
+
     def test_VC_01_snapshot_and_rollback(self):
         """Verify Snapshot/Checkpoint and Rollback is tenant-local and non-disruptive."""
-        self.manager.take_snapshot = MagicMock(return_value=True)
-        self.manager.rollback_vm = MagicMock(return_value=True)
-        
-        self.manager.take_snapshot(self.config_tenant_id)
-        self.manager.rollback_vm(self.config_tenant_id)
-        
+        self.manager.write_fs('TenantB', '/control_file', 'untouched', 'TenantB')
+        self.assertTrue(self.manager.take_snapshot(self.config_tenant_id), "Snapshot failed.")
+
+        self.manager.write_fs(self.config_tenant_id, '/new_file', 'pre_rollback', self.config_tenant_id)
+        self.assertTrue(self.manager.file_exists(self.config_tenant_id, '/new_file'), "Write before rollback was lost.")
+        self.assertTrue(self.manager.rollback_vm(self.config_tenant_id), "Rollback failed.")
+
+        self.assertFalse(self.manager.file_exists(self.config_tenant_id, '/new_file'), "/new_file survived the rollback.")
         self.assertEqual(self.manager.check_vm_status('TenantB'), 'running', "Tenant B was affected by Tenant F's rollback.")
-        self.manager.take_snapshot.assert_called_with(self.config_tenant_id)
-        
-    def tearDown(self):
-        self.manager.deprovision_tenant(self.config_tenant_id)
-        self.manager.deprovision_tenant('TenantOVER')
+        self.assertTrue(self.manager.file_exists('TenantB', '/control_file'), "Tenant B's files were affected by the rollback.")
+        self.manager.filesystem.drop('TenantB')
+
+    def test_VC_01_nested_snapshots(self):
+        """Verify many checkpoints per tenant share state and roll back to the chosen one."""
+        snapshots = []
+        for step in range(1000):
+            self.manager.write_fs(self.config_tenant_id, f'/drift_{step}', step, self.config_tenant_id)
+            self.manager.write_fs(self.config_tenant_id, '/etc/app.conf', f'version={step}', self.config_tenant_id)
+            snapshots.append(self.manager.take_snapshot(self.config_tenant_id))
+
+        self.assertTrue(self.manager.rollback_vm(self.config_tenant_id, snapshots[499]), "Rollback to checkpoint failed.")
+        files = self.manager.filesystem.files(self.config_tenant_id)
+        self.assertEqual(files['/etc/app.conf'], 'version=499', "Rollback restored the wrong checkpoint.")
+        self.assertEqual(len(files), 501, "Files written after the checkpoint survived the rollback.")
+        self.assertFalse(self.manager.rollback_vm(self.config_tenant_id, snapshots[500]),
+                         "Rolled back to a checkpoint discarded by an earlier rollback.")
+
+    def test_VC_01_rollback_and_restore_on_disk(self):
+        """Verify snapshots, rollback, backup and restore see what write_fs put on disk, and disk follows them."""
+        with tempfile.TemporaryDirectory() as fs_root:
+            manager = SystemManager(fs_root=fs_root)
+            local_fs = manager.local_fs
+            self.assertTrue(manager.write_fs('TenantA', '/etc/app.conf', 'version=1', 'TenantA')[0])
+            self.assertTrue(manager.file_exists('TenantA', '/etc/app.conf'), "Written file is not reported.")
+            snapshot = manager.take_snapshot('TenantA')
+            backup = manager.backup_tenant('TenantA')
+            self.assertEqual(backup.files, 1, "Backup missed the file written to disk.")
+
+            manager.write_fs('TenantA', '/etc/app.conf', 'version=2', 'TenantA')
+            manager.write_fs('TenantA', '/new_file', 'pre_rollback', 'TenantA')
+            self.assertTrue(manager.rollback_vm('TenantA', snapshot), "Rollback failed.")
+            self.assertEqual(local_fs.read('TenantA', '/etc/app.conf'), b'version=1', "Disk was not rolled back.")
+            self.assertFalse(manager.file_exists('TenantA', '/new_file'), "/new_file survived the rollback on disk.")
+
+            manager.write_fs('TenantA', '/etc/app.conf', 'corrupted', 'TenantA')
+            self.assertTrue(manager.restore_tenant('TenantA'), "Restore failed.")
+            self.assertEqual(local_fs.read('TenantA', '/etc/app.conf'), b'version=1', "Disk was not restored.")
+
+            # Backups stream the tree on disk: a file the guest wrote there directly is included, a symlink is not
+            tree = local_fs.tenant_root('TenantA')
+            with open(os.path.join(tree, 'guest.log'), 'wb') as handle:
+                handle.write(b'written by the guest')
+            os.symlink('/etc/hostname', os.path.join(tree, 'host_link'))
+            backup = manager.backup_tenant('TenantA')
+            self.assertEqual(backup.files, 2, "Backup did not stream the tenant's tree on disk.")
+            manager.write_fs('TenantA', '/stray.tmp', 'partial write', 'TenantA')
+            self.assertTrue(manager.restore_tenant('TenantA'), "Restore failed.")
+            self.assertEqual(sorted(os.listdir(tree)), ['etc', 'guest.log'], "Restore did not replace the tree.")
+            self.assertEqual(manager.filesystem.files('TenantA'),
+                             {'/etc/app.conf': b'version=1', '/guest.log': b'written by the guest'},
+                             "In-memory files did not follow the restored tree.")
+            self.assertFalse(manager.restore_tenant('TenantA', generation=99), "Restored a missing generation.")
+            self.assertEqual(sorted(os.listdir(tree)), ['etc', 'guest.log'], "A failed restore emptied the tree.")
 
 # ----------------------------------------------------------------------
 # 5. RedundancyChecks Test Suit
@@ -231,8 +589,7 @@ class RedundancyChecks(unittest.TestCase):
     """Test Suite for Shutdown/Restart Scenarios and High Availability."""
 
     def setUp(self):
-        self.manager = system_manager
-        self.manager.provision_vm('TenantHA', {'cpu': 1, 'mem': 2})
+        self.manager = baseline(system_manager)
 
     def test_SR_01_host_failure_ha_failover(self):
         """Verify High Availability (HA) mechanism on physical host failure."""
@@ -245,43 +602,400 @@ class RedundancyChecks(unittest.TestCase):
     
     def test_SR_02_shared_fs_failure_recovery(self):
         """Verify data integrity and recovery after Shared Filesystem failure."""
-        self.manager.check_fs_integrity = MagicMock(return_value=True)
-        
-        # Simulate recovery
-        fs_ok = self.manager.check_fs_integrity('TenantHA')
-        self.assertTrue(fs_ok, "Filesystem integrity check failed after recovery (Data corruption!).")
-        
-        # Check if the VM has resumed normal I/O operations
-        write_success, _ = self.manager.write_fs('TenantHA', '/data/resumed.log', 'Recovery Success', 'TenantHA')
-        self.assertTrue(write_success, "VM failed to resume normal write operations after FS recovery.")
-        
+        with tempfile.TemporaryDirectory() as fs_root:
+            manager = SystemManager(fs_root=fs_root)
+            manager.provision_vm('TenantHA', {'cpu': 1, 'mem': 2})
+            for index in range(200):
+                manager.write_fs('TenantHA', f'/data/block{index}.bin', os.urandom(4096), 'TenantHA')
+            digest = manager.local_fs.digest('TenantHA')
+
+            AsyncSystemManager(manager).inject_failure('TenantHA', 'io_suspended', FS_RECOVERY_SECONDS)
+            write_success, _ = manager.write_fs('TenantHA', '/data/during_outage.log', 'Lost write', 'TenantHA')
+            self.assertFalse(write_success, "Write succeeded while the shared filesystem was down.")
+
+            # Simulate recovery
+            manager.clock.sleep(FS_RECOVERY_SECONDS)
+            self.assertEqual(manager.check_vm_status('TenantHA'), 'running', "VM did not resume after FS recovery.")
+            self.assertEqual(manager.local_fs.digest('TenantHA'), digest,
+                             "Filesystem integrity check failed after recovery (Data corruption!).")
+
+            # Check if the VM has resumed normal I/O operations
+            write_success, _ = manager.write_fs('TenantHA', '/data/resumed.log', 'Recovery Success', 'TenantHA')
+            self.assertTrue(write_success, "VM failed to resume normal write operations after FS recovery.")
+            self.assertEqual(manager.local_fs.read('TenantHA', '/data/resumed.log'), b'Recovery Success')
+
     def test_SR_03_tenant_guest_crash_restart(self):
         """Verify single tenant crash containment and auto-restart."""
         # Simulate crash and wait for auto-restart
-        time.sleep(1) 
+        self.manager.clock.sleep(1)
         final_status = self.manager.check_vm_status('TenantHA')
         self.assertEqual(final_status, 'running', "VM failed to auto-restart after guest OS crash.")
         self.assertEqual(self.manager.check_vm_status('TenantA'), 'running', "Tenant A was affected by Tenant HA's crash.")
 
-    def tearDown(self):
-        self.manager.deprovision_tenant('TenantHA')
+    def test_SR_01_rack_failure_concurrent_failover(self):
+        """Verify a 200-tenant rack outage fails over concurrently, in the time of one failover."""
+        manager = AsyncSystemManager(SystemManager())
+        rack = [f'RackTenant{index}' for index in range(200)]
+
+        async def scenario():
+            await manager.provision_vms({tenant_id: {'cpu': 1, 'mem': 2} for tenant_id in rack})
+            started = manager.clock.now()
+            failover = asyncio.ensure_future(manager.simulate_rack_failure(rack))
+            crash = asyncio.ensure_future(manager.simulate_guest_crash_and_recovery('TenantA'))
+            await asyncio.sleep(0)
+            during = await asyncio.gather(*(manager.check_vm_status(tenant_id) for tenant_id in rack[:3]))
+            await asyncio.gather(failover, crash)
+            statuses = await asyncio.gather(*(manager.check_vm_status(tenant_id) for tenant_id in rack))
+            return during, statuses, manager.clock.now() - started
+
+        during, statuses, elapsed = asyncio.run(scenario())
+        self.assertEqual(during, ['restarting'] * 3, "Rack tenants were not failed before the check.")
+        self.assertEqual(set(statuses), {'running'}, "Not every rack tenant failed over.")
+        self.assertEqual(elapsed, 1, "Rack failover ran sequentially instead of concurrently.")
+        self.assertEqual(manager.manager.check_vm_status('TenantA'), 'running', "Guest crash did not recover.")
+
+    def test_SR_03_crash_blast_radius_from_journal(self):
+        """Verify a guest crash touches only the crashed tenant, using the status journal instead of a fleet scan."""
+        manager = SystemManager()
+        manager.provision_vms((f'Fleet{index}', {'cpu': 1, 'mem': 2}) for index in range(20000))
+        version = manager.status_version()
+
+        AsyncSystemManager(manager).inject_failure('Fleet42', 'crashed', 0.5)
+        self.assertEqual(manager.check_vm_status('Fleet42'), 'crashed', "Guest crash was not injected.")
+        manager.clock.sleep(1)
+
+        self.assertEqual(manager.changed_since(version), {'Fleet42'}, "Guest crash spread beyond Fleet42.")
+        self.assertEqual([(old, new) for _, _, old, new in manager.tenant_data.journal_since(version)],
+                         [('running', 'crashed'), ('crashed', 'running')], "Crash/restart transitions not journaled.")
+        self.assertEqual(manager.tenant_data.changes_since(version), {}, "Fleet42 did not return to running.")
+
+    def test_SR_fault_timeline_blast_radius(self):
+        """Verify a seeded fleet-wide fault timeline never spreads beyond the targeted tenants."""
+        def fleet():
+            manager = SystemManager()
+            manager.provision_vms((f'Fleet{index}', {'cpu': 1, 'mem': 2}) for index in range(2000))
+            return manager
+
+        report = FaultScheduler(fleet(), seed=7).run(3000)
+        self.assertEqual(report.violations, 0, f"Containment broken: {report.details[:5]}")
+        self.assertEqual(FaultScheduler(fleet(), seed=7).generate(100), FaultScheduler(fleet(), seed=7).generate(100),
+                         "The same seed produced different fault timelines.")
+
+        # A regression where any recovery marks the tenant running, ignoring overlapping faults, must be caught
+        def naive_recover(injector, tenant_ids, fault):
+            for tenant_id in tenant_ids:
+                injector.manager.tenant_data.set_status(tenant_id, 'running')
+
+        with patch.object(AsyncSystemManager, '_recover', naive_recover):
+            report = FaultScheduler(fleet(), seed=7).run(3000)
+        self.assertGreater(report.violations, 0, "Premature recovery under overlapping faults went undetected.")
 
 
 # ----------------------------------------------------------------------
-# 6. Execution Block
+# 6. Components Test Suit
+# ----------------------------------------------------------------------
+
+class Components(unittest.TestCase):
+    """Unit tests for the building blocks the suites and libraries share."""
+
+    def test_registry_mapping_interface(self):
+        """Verify TenantRegistry behaves as a dict of tenant records: add, replace, delete, iterate."""
+        registry = TenantRegistry()
+        registry.add('TenantA', {'cpu': 2, 'mem': 4})
+        registry['TenantB'] = {'vm_status': 'stopped', 'resources': {'cpu': 1}, 'fs_path': '/mnt/other/b/'}
+        registry.add_many([('TenantC', None), ('TenantD', {'storage': 5})])
+
+        self.assertEqual(list(registry), ['TenantA', 'TenantB', 'TenantC', 'TenantD'])
+        self.assertEqual(len(registry), 4)
+        self.assertIn('TenantB', registry)
+        self.assertEqual(registry['TenantB']['vm_status'], 'stopped')
+        self.assertEqual(registry['TenantB']['fs_path'], '/mnt/other/b/')
+        self.assertEqual(dict(registry['TenantB']['resources']), {'cpu': 1})
+        self.assertEqual(registry['TenantA']['fs_path'], '/mnt/shared/tenant_TenantA/')
+        self.assertEqual(registry.status('TenantX'), 'unknown')
+        with self.assertRaises(KeyError):
+            registry['TenantX']
+
+        stale = registry['TenantB']
+        del registry['TenantB']
+        self.assertNotIn('TenantB', registry)
+        self.assertEqual(list(registry), ['TenantA', 'TenantC', 'TenantD'])
+        registry.add('TenantE', {'cpu': 8})  # takes over TenantB's row
+        with self.assertRaises(KeyError, msg="A view of a deleted tenant read the row's new owner."):
+            stale['vm_status']
+        self.assertEqual(registry['TenantE']['resources']['cpu'], 8)
+        self.assertEqual(registry['TenantE']['fs_path'], '/mnt/shared/tenant_TenantE/')
+        with self.assertRaises(KeyError):
+            del registry['TenantB']
+
+    def test_registry_record_views_write_through(self):
+        """Verify writes through TenantRecord and its resources view land in the registry and mark it edited."""
+        registry = TenantRegistry()
+        registry.add('TenantA', {'cpu': 2, 'mem': 4})
+        record = registry['TenantA']
+        self.assertIsInstance(record, TenantRecord)
+
+        record['vm_status'] = 'crashed'
+        self.assertEqual(registry.status('TenantA'), 'crashed')
+        self.assertEqual(registry.changes_since(0), {'TenantA': (None, 'crashed')})
+        record['vm_status'] = 'migrating'  # statuses outside VM_STATUSES are interned on first use
+        self.assertEqual(registry['TenantA']['vm_status'], 'migrating')
+
+        resources = record['resources']
+        resources['cpu'] = 16
+        resources['gpu'] = 'a100'      # not a column: kept in the row's overflow
+        resources['mem'] = 2 ** 70     # too large for int64: overflow as well
+        self.assertEqual(registry.resource('TenantA', 'cpu'), 16)
+        self.assertEqual(dict(registry['TenantA']['resources']), {'cpu': 16, 'mem': 2 ** 70, 'gpu': 'a100'})
+        del resources['gpu']
+        self.assertNotIn('gpu', registry['TenantA']['resources'])
+        record['resources'] = {'cpu': 1}
+        self.assertEqual(dict(record['resources']), {'cpu': 1})
+        record['fs_path'] = '/mnt/moved/a/'
+        self.assertEqual(registry.fs_path('TenantA'), '/mnt/moved/a/')
+        self.assertEqual(registry.edited, {'TenantA'})
+
+        with self.assertRaises(KeyError):
+            record['owner'] = 'root'
+        with self.assertRaises(TypeError):
+            del record['vm_status']
+
+    def test_registry_memory_per_tenant(self):
+        """Verify the columnar registry holds a fleet in a fraction of the memory of nested dicts."""
+        tenant_ids = [f'Tenant{index}' for index in range(20000)]
+
+        def traced(build):
+            before = tracemalloc.get_traced_memory()[0]
+            kept = build()
+            return (tracemalloc.get_traced_memory()[0] - before) / len(tenant_ids), kept
+
+        tracemalloc.start()
+        try:
+            dict_bytes, _ = traced(lambda: {tenant_id: {'vm_status': 'running',
+                                                        'fs_path': f'/mnt/shared/tenant_{tenant_id}/',
+                                                        'resources': {'cpu': 1, 'mem': 2, 'storage': 10}}
+                                            for tenant_id in tenant_ids})
+            registry = TenantRegistry()
+            registry_bytes, _ = traced(lambda: registry.add_many(
+                (tenant_id, {'cpu': 1, 'mem': 2, 'storage': 10}) for tenant_id in tenant_ids) or registry)
+        finally:
+            tracemalloc.stop()
+        print(f"\nTenantRegistry: {registry_bytes:.0f} B/tenant (journal included), nested dicts: {dict_bytes:.0f} B/tenant")
+        self.assertLess(registry_bytes, 128, "Registry grew past its per-tenant budget.")
+        self.assertLess(registry_bytes, dict_bytes / 3, "Registry is not much smaller than nested dicts.")
+
+    def test_virtual_clock_fires_events_in_due_order(self):
+        """Verify VirtualClock fires due events in order, at their due time, skipping cancelled ones."""
+        clock = VirtualClock(start=100)
+        fired = []
+        clock.call_later(2, lambda: fired.append(('b', clock.now())))
+        clock.call_later(1, lambda: fired.append(('a', clock.now())))
+        clock.call_later(2, lambda: fired.append(('c', clock.now())))   # same due time: scheduling order
+        dropped = clock.call_later(1.5, fired.append, 'dropped')
+        clock.call_later(10, fired.append, 'later')
+        dropped.cancel()
+        self.assertEqual(clock.pending(), 4)
+
+        started = time.perf_counter()
+        clock.sleep(5)
+        self.assertLess(time.perf_counter() - started, 0.5, "VirtualClock.sleep waited in wall-clock time.")
+        self.assertEqual(fired, [('a', 101), ('b', 102), ('c', 102)])
+        self.assertEqual(clock.now(), 105)
+        self.assertEqual(clock.pending(), 1)
+
+        # Events scheduled by a callback fire within the same sleep when they fall due in it
+        clock.call_later(1, lambda: clock.call_later(1, fired.append, 'chained'))
+        clock.run_until_idle()
+        self.assertEqual(fired[3:], ['chained', 'later'])
+        self.assertEqual(clock.now(), 110)
+        with self.assertRaises(ValueError):
+            clock.call_later(-1, fired.append, 'past')
+        with self.assertRaises(ValueError):
+            clock.sleep(-1)
+
+    def test_virtual_clock_async_sleepers_share_one_timeline(self):
+        """Verify overlapping sleep_async calls finish after the longest one in simulated time, not their sum."""
+        clock = VirtualClock()
+        woke = []
+
+        async def sleeper(name, seconds):
+            await clock.sleep_async(seconds)
+            woke.append((name, clock.now()))
+
+        async def scenario():
+            await asyncio.gather(*(sleeper(f'one{index}', 1) for index in range(50)), sleeper('three', 3))
+            await sleeper('after', 0.5)
+
+        started = time.perf_counter()
+        asyncio.run(scenario())
+        self.assertLess(time.perf_counter() - started, 0.5, "sleep_async waited in wall-clock time.")
+        self.assertEqual(clock.now(), 3.5)
+        self.assertEqual({when for name, when in woke if name.startswith('one')}, {1})
+        self.assertEqual(woke[-2:], [('three', 3), ('after', 3.5)])
+        self.assertEqual(clock.pending(), 0)
+
+    def test_real_clock_follows_wall_time(self):
+        """Verify RealClock keeps the VirtualClock interface but waits in wall-clock time."""
+        clock = RealClock()
+        fired = []
+        clock.call_later(0.02, lambda: fired.append(time.monotonic()))
+        clock.call_later(5, fired.append, 'never')
+        started = time.monotonic()
+        clock.sleep(0.05)
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertEqual(len(fired), 1)
+        self.assertGreaterEqual(fired[0] - started, 0.02)
+        self.assertAlmostEqual(clock.now(), time.monotonic(), delta=0.05)
+
+        clock.call_later(0.01, fired.append, 'async')
+        asyncio.run(clock.sleep_async(0.03))
+        self.assertEqual(fired[1:], ['async'])
+
+    def test_parallel_suite_isolates_shards_and_merges_results(self):
+        """Verify ParallelSuite gives each shard a fresh manager and replays every outcome into one report."""
+        fixture = (
+            "import os\n"
+            "import unittest\n\n"
+            "class SystemManager:\n"
+            "    def __init__(self):\n"
+            "        self.pid = os.getpid()\n"
+            "        self.tenant_data = {}\n\n"
+            "system_manager = None\n\n"
+            "class Shard(unittest.TestCase):\n"
+            "    def test_a_fresh_manager(self):\n"
+            "        system_manager.tenant_data[self.id()] = 1\n"
+            "        self.assertEqual(len(system_manager.tenant_data), 1)\n"
+            "        self.assertEqual(system_manager.pid, os.getpid())\n\n"
+            "    def test_b_fresh_manager_again(self):\n"
+            "        self.test_a_fresh_manager()\n\n"
+            "    def test_c_failure(self):\n"
+            "        self.fail('boom in worker')\n\n"
+            "    def test_d_error(self):\n"
+            "        raise RuntimeError('kaput in worker')\n\n"
+            "    @unittest.skip('not on this host')\n"
+            "    def test_e_skip(self):\n"
+            "        pass\n")
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'parallel_shard_fixture.py'), 'w') as handle:
+                handle.write(fixture)
+            sys.path.insert(0, directory)
+            try:
+                suite = ParallelSuite('parallel_shard_fixture', ['Shard'], workers=2, shard_by='method')
+                self.assertEqual(len(suite.shards()), 5)
+                self.assertEqual(suite.countTestCases(), 5)
+                stream = io.StringIO()
+                result = unittest.TextTestRunner(stream=stream, resultclass=_MergedResult).run(suite)
+            finally:
+                sys.path.remove(directory)
+                sys.modules.pop('parallel_shard_fixture', None)
+
+        self.assertEqual(result.testsRun, 5)
+        self.assertEqual([str(test).split()[0] for test, _ in result.failures], ['test_c_failure'])
+        self.assertIn('boom in worker', result.failures[0][1])
+        self.assertEqual([str(test).split()[0] for test, _ in result.errors], ['test_d_error'])
+        self.assertIn('RuntimeError: kaput in worker', result.errors[0][1])
+        self.assertEqual([reason for _, reason in result.skipped], ['not on this host'])
+        self.assertIn('FAILED (failures=1, errors=1, skipped=1)', stream.getvalue())
+        with self.assertRaises(ValueError):
+            ParallelSuite('parallel_shard_fixture', ['Shard'], shard_by='file')
+
+    def test_backup_engine_reopened_store_and_tenant_ids(self):
+        """Verify a reopened backup store keeps its dedup accounting and confines manifests to the store."""
+        files = {'/data/dataset.bin': os.urandom(128 * 1024), '/etc/app.conf': 'replicas=3'}
+        with tempfile.TemporaryDirectory() as scratch:
+            store = os.path.join(scratch, 'store')
+            first = BackupEngine(store).backup_files('TenantA', files)
+            self.assertAlmostEqual(first.dedup_ratio, 1.0, places=2)
+
+            reopened = BackupEngine(store)
+            again = reopened.backup_files('TenantB', files)
+            self.assertEqual(again.new_bytes, 0, "Chunks already in the store were written again.")
+            self.assertAlmostEqual(again.dedup_ratio, 2.0, places=2,
+                                   msg="Dedup ratio ignored the backups made before the store was reopened.")
+            self.assertEqual(reopened.logical_bytes, 2 * first.bytes)
+
+            for tenant_id in ('../../escape', '..', 'Tenant RPC/9?x', '.hidden'):
+                report = reopened.backup_files(tenant_id, files)
+                self.assertEqual(reopened.generations(tenant_id), [report.generation])
+                self.assertEqual(reopened.restore_files(tenant_id)[0], files)
+            self.assertEqual(sorted(os.listdir(scratch)), ['store'], "A manifest was written outside the store.")
+            self.assertEqual(sorted(os.listdir(store)), ['chunks', 'manifests'], "A manifest left manifests/.")
+            self.assertEqual(len(os.listdir(os.path.join(store, 'manifests'))), 6)
+            with self.assertRaises(ValueError):
+                reopened.backup_files('', files)
+
+    def test_keyword_tracer_ring_wraps_and_counts_drops(self):
+        """Verify KeywordTracer keeps the newest spans when its ring wraps and reports how many it overwrote."""
+        class Keywords:
+            def check(self, tenant_id):
+                return self.inner(tenant_id)
+
+            def inner(self, tenant_id):
+                return tenant_id
+
+            def fleet(self, *tenant_ids):
+                return len(tenant_ids)
+
+        disabled = KeywordTracer(capacity=8)
+        untouched = disabled.instrument(Keywords())
+        self.assertNotIn('check', vars(untouched), "A disabled tracer wrapped a method.")
+        self.assertEqual(disabled.spans(), ([], 0))
+
+        tracer = KeywordTracer(capacity=8, enabled=True)
+        keywords = tracer.instrument(Keywords())
+        keywords.check('TenantA')   # spans: inner (depth 1), then check (depth 0)
+        spans, dropped = tracer.spans()
+        self.assertEqual([(name, tenant_id, depth) for _, name, _, tenant_id, _, _, _, depth, _ in spans],
+                         [('Keywords.inner', 'TenantA', 1), ('Keywords.check', 'TenantA', 0)])
+        self.assertEqual(dropped, 0)
+
+        for index in range(10):
+            keywords.fleet(f'Tenant{index}', 'TenantZ')
+        spans, dropped = tracer.spans()
+        self.assertEqual(len(spans), 8)
+        self.assertEqual(dropped, 4)
+        self.assertEqual([span[0] for span in spans], list(range(4, 12)))
+        self.assertEqual(spans[-1][3], 'Tenant9,TenantZ')
+        trace = tracer.chrome_trace()
+        self.assertEqual(len(trace['traceEvents']), 8)
+        self.assertEqual(trace['otherData'], {'dropped_spans': 4})
+        self.assertEqual(tracer.summary()['keyword:Keywords.fleet']['calls'], 8)
+
+        tracer.clear()
+        self.assertEqual(tracer.spans(), ([], 0))
+        with self.assertRaises(ValueError):
+            KeywordTracer(capacity=12)
+
+
+# ----------------------------------------------------------------------
+# 7. Execution Block
 # ----------------------------------------------------------------------
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="End-to-End QA Automation Suite")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Worker processes; each gets its own SystemManager (default: 1, in-process)")
+    parser.add_argument('--shard-by', choices=('class', 'method'), default='class',
+                        help="Unit of work handed to a worker when --workers > 1")
+    args = parser.parse_args()
+
     print("\n--- Starting End-to-End QA Automation Suite ---")
-    
-    # Create a test suite encompassing all test cases
-    loader = unittest.TestLoader()
-    suite = unittest.TestSuite()
-    
-    suite.addTests(loader.loadTestsFromTestCase(MultiTenancy))
-    suite.addTests(loader.loadTestsFromTestCase(Utils))
-    suite.addTests(loader.loadTestsFromTestCase(HardwareAndVMConfig))
-    suite.addTests(loader.loadTestsFromTestCase(RedundancyChecks))
-    
-    runner = unittest.TextTestRunner(verbosity=2)
-    runner.run(suite)
\ No newline at end of file
+    test_cases = [MultiTenancy, Utils, HardwareAndVMConfig, RedundancyChecks, Components]
+
+    if args.workers > 1:
+        # Each shard runs in its own process against a fresh SystemManager
+        from ParallelSuiteRunner import run_parallel
+        run_parallel('Test_automation_Suite', [case.__name__ for case in test_cases],
+                     workers=args.workers, shard_by=args.shard_by)
+    else:
+        # Create a test suite encompassing all test cases
+        loader = unittest.TestLoader()
+        suite = unittest.TestSuite()
+
+        for case in test_cases:
+            suite.addTests(loader.loadTestsFromTestCase(case))
+
+        runner = unittest.TextTestRunner(verbosity=2)
+        runner.run(suite)
\ No newline at end of file
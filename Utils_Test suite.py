@@ -2,11 +2,9 @@ class Utils(unittest.TestCase):
     """Test Suite for System Utilities (Provisioning, Monitoring, Backup, and Filesystem Commands)."""
 
     def setUp(self):
-        self.manager = system_manager
+        # Base tenants A and B come from the baseline fleet; TenantD is removed by the next reset
+        self.manager = baseline(system_manager)
         self.test_tenant_id = 'TenantD'
-        # Ensure base tenants A and B are running
-        self.manager.provision_vm('TenantA', {'cpu': 2, 'mem': 4})
-        self.manager.provision_vm('TenantB', {'cpu': 4, 'mem': 8})
 
     # --- Existing Utils Scenarios (UT-01 to UT-04) remain here ---
     
@@ -89,12 +87,6 @@ class Utils(unittest.TestCase):
         self.assertFalse(success, "Tenant A successfully changed ownership to 'root'/'external' user.")
         self.assertIn("operation not permitted", output.lower(), "Expected permission denial on chown attempt.")
 
-    def tearDown(self):
-        """Cleanup after the Utils test suit."""
-        self.manager.deprovision_tenant('TenantD')
-        self.manager.deprovision_tenant('TenantA')
-        self.manager.deprovision_tenant('TenantB')
-
 # --- Next Step (Execution Block) ---
 if __name__ == '__main__':
     # To run only the Utils test suit:
@@ -0,0 +1,157 @@
+# VirtualClock.py - Simulated time engine used by the SystemManager classes
+
+import heapq
+import itertools
+import time
+
+
+class ScheduledEvent:
+    """A callback queued on a clock. Call cancel() to drop it before it fires."""
+
+    __slots__ = ('due', 'callback', 'args', 'cancelled')
+
+    def __init__(self, due, callback, args):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class VirtualClock:
+    """
+    A virtual clock plus an event queue.
+
+    Scenario timelines (HA failover, guest auto-restart) are modeled as events
+    scheduled with call_later(). sleep() advances simulated time instantly and
+    fires every event that falls due on the way, in due-time order, so a
+    "2 second" failover completes in microseconds of wall time.
+    """
+
+    def __init__(self, start=0.0):
+        self._now = float(start)
+        self._queue = []
+        self._sequence = itertools.count()
+        # asyncio sleepers: how many are waiting, how many have ever started, and whether a drive is queued
+        self._waiting = 0
+        self._sleeps_started = 0
+        self._drive_scheduled = False
+
+    def now(self):
+        """Returns the current simulated time in seconds."""
+        return self._now
+
+    def call_later(self, delay, callback, *args):
+        """Schedules callback(*args) to run `delay` seconds from now."""
+        if delay < 0:
+            raise ValueError(f"Cannot schedule an event in the past (delay={delay}).")
+        event = ScheduledEvent(self.now() + delay, callback, args)
+        heapq.heappush(self._queue, (event.due, next(self._sequence), event))
+        return event
+
+    def pending(self):
+        """Returns the number of events that have not fired or been cancelled."""
+        return sum(1 for _, _, event in self._queue if not event.cancelled)
+
+    def sleep(self, seconds):
+        """Advances the clock by `seconds`, firing every event that falls due."""
+        if seconds < 0:
+            raise ValueError(f"Sleep length must be non-negative (got {seconds}).")
+        target = self._now + seconds
+        while self._queue and self._queue[0][0] <= target:
+            due, _, event = heapq.heappop(self._queue)
+            if event.cancelled:
+                continue
+            self._now = due
+            event.callback(*event.args)
+        self._now = target
+
+    def run_until_idle(self):
+        """Fires every queued event, advancing the clock to the last one."""
+        while self._queue:
+            self.sleep(max(self._queue[0][0] - self.now(), 0))
+
+    async def sleep_async(self, seconds):
+        """
+        Awaitable sleep in simulated time.
+
+        Coroutines sleeping concurrently share one timeline, so N overlapping
+        1 second waits finish after 1 simulated second rather than N. Time
+        advances, only as far as the earliest wake-up, once the event loop has
+        run a full round of callbacks in which no coroutine started a new
+        sleep. Sleepers are counted, other coroutines are not: one that is
+        waiting on I/O, an executor or another task's future when that happens
+        does not hold simulated time back.
+        """
+        if seconds < 0:
+            raise ValueError(f"Sleep length must be non-negative (got {seconds}).")
+        import asyncio  # already loaded by whoever runs the event loop; keeps plain imports light
+        loop = asyncio.get_running_loop()
+        woken = loop.create_future()
+        event = self.call_later(seconds, _wake, woken)
+        self._waiting += 1
+        self._sleeps_started += 1
+        self._schedule_drive(loop)
+        try:
+            await woken
+        finally:
+            self._waiting -= 1
+            event.cancel()
+
+    def _schedule_drive(self, loop):
+        if not self._drive_scheduled:
+            self._drive_scheduled = True
+            loop.call_soon(self._drive, loop, self._sleeps_started)
+
+    def _drive(self, loop, sleeps_seen):
+        if self._sleeps_started != sleeps_seen:
+            # Someone started sleeping since the last hop; give the remaining coroutines a turn first
+            loop.call_soon(self._drive, loop, self._sleeps_started)
+            return
+        self._drive_scheduled = False
+        while self._queue and self._queue[0][2].cancelled:
+            heapq.heappop(self._queue)
+        if self._waiting and self._queue:
+            self.sleep(max(self._queue[0][0] - self.now(), 0))
+            self._schedule_drive(loop)
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class RealClock(VirtualClock):
+    """
+    Drop-in replacement for VirtualClock that follows wall-clock time.
+
+    Use it when the harness drives real infrastructure and the timeline has to
+    line up with what the hypervisor is actually doing.
+    """
+
+    def __init__(self):
+        super().__init__(start=time.monotonic())
+
+    def now(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds < 0:
+            raise ValueError(f"Sleep length must be non-negative (got {seconds}).")
+        target = time.monotonic() + seconds
+        while self._queue and self._queue[0][0] <= target:
+            due, _, event = heapq.heappop(self._queue)
+            if event.cancelled:
+                continue
+            time.sleep(max(due - time.monotonic(), 0))
+            event.callback(*event.args)
+        time.sleep(max(target - time.monotonic(), 0))
+
+    async def sleep_async(self, seconds):
+        if seconds < 0:
+            raise ValueError(f"Sleep length must be non-negative (got {seconds}).")
+        import asyncio
+        await asyncio.sleep(seconds)
+        self.sleep(0)  # fire whatever fell due while we were waiting
@@ -0,0 +1,275 @@
+# benchmark_keywords.py - Per-keyword latency/throughput benchmarks for the Robot libraries
+#
+# Usage:
+#   python benchmark_keywords.py                                   # all libraries, scales 10 / 10k / 1M
+#   python benchmark_keywords.py --scales 10 10000 --output new.json
+#   python benchmark_keywords.py --compare baseline.json --threshold 1.25   # exit 1 on regression
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from SystemManagerLibrary import SystemManagerLibrary
+from TestAutomationLibrary import TestAutomationLibrary
+
+LIBRARIES = {
+    'SystemManagerLibrary': SystemManagerLibrary,
+    'TestAutomationLibrary': TestAutomationLibrary,
+}
+
+DEFAULT_SCALES = (10, 10000, 1000000)
+DEFAULT_ITERATIONS = 2000
+DEFAULT_THRESHOLD = 1.25
+DEFAULT_OUTPUT = 'benchmark_results.json'
+
+_ALLOWED_COMMANDS = ('chmod 777 my_file.txt', 'ls -l my_file.txt', 'touch notes.txt')
+
+
+def _fleet_ids(scale, count, rng):
+    return [f'Fleet{rng.randrange(scale)}' for _ in range(count)]
+
+
+def _new_tenants(prefix):
+    return lambda library, scale, count, rng: [(f'{prefix}{i}', {'cpu': 1, 'mem': 2}) for i in range(count)]
+
+
+def _existing_tenant(library, scale, count, rng):
+    return [(tenant_id,) for tenant_id in _fleet_ids(scale, count, rng)]
+
+
+def _tenant_pair(library, scale, count, rng):
+    return list(zip(_fleet_ids(scale, count, rng), _fleet_ids(scale, count, rng)))
+
+
+def _same_tenant_write(library, scale, count, rng):
+    return [(tenant_id, tenant_id, 'benchmark data') for tenant_id in _fleet_ids(scale, count, rng)]
+
+
+def _same_tenant_attempt(library, scale, count, rng):
+    return [(tenant_id, tenant_id) for tenant_id in _fleet_ids(scale, count, rng)]
+
+
+def _fs_command(library, scale, count, rng):
+    return [(tenant_id, rng.choice(_ALLOWED_COMMANDS)) for tenant_id in _fleet_ids(scale, count, rng)]
+
+
+def _no_arguments(library, scale, count, rng):
+    return [()] * count
+
+
+def _current_version(library, scale, count, rng):
+    return [(library.tenant_data.version,)] * count
+
+
+def _file_write(library, scale, count, rng):
+    return [(tenant_id, f'/bench/file{index % 64}', 'benchmark data')
+            for index, tenant_id in enumerate(_fleet_ids(scale, count, rng))]
+
+
+def _file_lookup(library, scale, count, rng):
+    return [(tenant_id, '/bench/file0') for tenant_id in _fleet_ids(scale, count, rng)]
+
+
+def _snapshotted_tenant(library, scale, count, rng):
+    arguments = _existing_tenant(library, scale, count, rng)
+    for tenant_id, in arguments:
+        library.write_file_in_vm(tenant_id, '/bench/drift', 'pre_rollback')
+        library.take_snapshot(tenant_id)
+    return arguments
+
+
+def _backed_up_tenant(library, scale, count, rng):
+    arguments = _existing_tenant(library, scale, count, rng)
+    for tenant_id, in arguments:
+        library.backup_tenant(tenant_id)
+    return arguments
+
+
+def _tenant_group(library, scale, count, rng):
+    return [tuple(_fleet_ids(scale, 10, rng)) for _ in range(count)]
+
+
+def _bulk_manifest(library, scale, count, rng):
+    return [({f'BenchBulk{i}_{j}': {'cpu': 1, 'mem': 2} for j in range(10)},) for i in range(count)]
+
+
+def _bulk_strings(library, scale, count, rng):
+    return [tuple(f'BenchTenants{i}_{j}:cpu=1|mem=2' for j in range(10)) for i in range(count)]
+
+
+def _deprovision(library, scale, count, rng):
+    library.provision_vms([(f'BenchDel{i}', {'cpu': 1, 'mem': 2}) for i in range(count)])
+    return [(f'BenchDel{i}',) for i in range(count)]
+
+
+# keyword -> (argument factory, iteration cap or None, largest scale it is run at or None)
+KEYWORD_SPECS = {
+    'provision_vm': (_new_tenants('BenchNew'), None, None),
+    'provision_vms': (_bulk_manifest, 200, None),
+    'provision_tenants': (_bulk_strings, 200, None),
+    'deprovision_tenant': (_deprovision, None, None),
+    'check_vm_status': (_existing_tenant, None, None),
+    'check_unaffected_status': (_existing_tenant, None, None),
+    'get_status_version': (_no_arguments, None, None),
+    'check_blast_radius': (_current_version, None, None),
+    'execute_fs_command_in_vm': (_fs_command, None, None),
+    'write_fs_cross_tenant': (_same_tenant_write, None, None),
+    'attempt_cross_tenant_write': (_same_tenant_attempt, None, None),
+    'check_resource_isolation': (_tenant_pair, None, None),
+    'write_file_in_vm': (_file_write, None, None),
+    'file_exists_in_vm': (_file_lookup, None, None),
+    'take_snapshot': (_existing_tenant, None, None),
+    'rollback_vm': (_snapshotted_tenant, None, None),
+    'backup_tenant': (_existing_tenant, 200, None),
+    'restore_tenant': (_backed_up_tenant, 200, None),
+    'simulate_host_failure': (_existing_tenant, None, None),
+    'simulate_guest_crash_and_recovery': (_existing_tenant, None, None),
+    'simulate_rack_failure': (_tenant_group, 200, None),
+    'simulate_shared_fs_failure': (_existing_tenant, None, None),
+    'execute_backup_restore': (_existing_tenant, 200, None),
+    # These compile an automaton over every registered tenant on each call
+    'check_logs_for_leakage': (_tenant_pair, 20, 10000),
+    'check_logging_for_leakage': (_tenant_pair, 20, 10000),
+}
+
+# Keywords that need external load or a filesystem fixture; they have their own benchmarks
+NOT_BENCHMARKED = {
+    'measure_resource_contention': "spawns load-generator processes (see ContentionProbe)",
+    'scan_logs_for_leakage': "needs a log directory fixture",
+    'measure_fs_write_throughput': "needs an fs_root for real disk I/O; reports its own MB/s",
+    'get_fs_digest': "needs an fs_root; O(tenant data) per call",
+    'run_fault_timeline': "scenario driver; FaultScheduler.py reports its own events/s",
+}
+
+
+def public_keywords(library_class):
+    return sorted(name for name in dir(library_class)
+                  if not name.startswith('_') and callable(getattr(library_class, name)))
+
+
+def build_library(library_class, scale):
+    library = library_class()
+    # Storage is left at 0 so the default pool admits any fleet size
+    library.provision_vms((f'Fleet{index}', {'cpu': 1, 'mem': 2}) for index in range(scale))
+    return library
+
+
+def time_keyword(method, arguments):
+    """Calls method(*args) once per argument tuple; returns sorted per-call latencies in ns."""
+    clock = time.perf_counter_ns
+    latencies = []
+    for args in arguments:
+        started = clock()
+        method(*args)
+        latencies.append(clock() - started)
+    latencies.sort()
+    return latencies
+
+
+def run_benchmarks(library_names, scales, iterations, seed=0, log=sys.stderr):
+    results, skipped = [], []
+    for library_name in library_names:
+        library_class = LIBRARIES[library_name]
+        for scale in scales:
+            log.write(f"{library_name} @ {scale} tenants: building fleet...\n")
+            library = build_library(library_class, scale)
+            for keyword in public_keywords(library_class):
+                if keyword in NOT_BENCHMARKED:
+                    skipped.append({'library': library_name, 'keyword': keyword, 'scale': scale,
+                                    'reason': NOT_BENCHMARKED[keyword]})
+                    continue
+                if keyword not in KEYWORD_SPECS:
+                    skipped.append({'library': library_name, 'keyword': keyword, 'scale': scale,
+                                    'reason': "no benchmark spec; add one to KEYWORD_SPECS"})
+                    continue
+                factory, cap, max_scale = KEYWORD_SPECS[keyword]
+                if max_scale is not None and scale > max_scale:
+                    skipped.append({'library': library_name, 'keyword': keyword, 'scale': scale,
+                                    'reason': f"O(tenants) per call; only run up to {max_scale} tenants"})
+                    continue
+                count = min(iterations, cap) if cap else iterations
+                arguments = factory(library, scale, count, random.Random(seed))
+                with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+                    latencies = time_keyword(getattr(library, keyword), arguments)
+                total = sum(latencies)
+                results.append({
+                    'library': library_name, 'keyword': keyword, 'scale': scale,
+                    'iterations': len(latencies),
+                    'mean_ns': total / len(latencies),
+                    'p50_ns': latencies[len(latencies) // 2],
+                    'p99_ns': latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)],
+                    'ops_per_sec': len(latencies) / (total / 1e9) if total else float('inf'),
+                })
+            del library
+    return {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                 'iterations': iterations, 'scales': list(scales), 'seed': seed},
+        'results': results,
+        'skipped': skipped,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Returns (rows, regressions); a regression is a p50 latency ratio above `threshold`."""
+    previous = {(row['library'], row['keyword'], row['scale']): row for row in baseline['results']}
+    rows, regressions = [], []
+    for row in current['results']:
+        key = (row['library'], row['keyword'], row['scale'])
+        if key not in previous:
+            continue
+        ratio = row['p50_ns'] / previous[key]['p50_ns'] if previous[key]['p50_ns'] else float('inf')
+        rows.append((key, previous[key]['p50_ns'], row['p50_ns'], ratio))
+        if ratio > threshold:
+            regressions.append(key)
+    return rows, regressions
+
+
+def print_results(report, stream=sys.stdout):
+    stream.write(f"{'library':<22} {'keyword':<34} {'tenants':>8} {'p50 us':>10} {'p99 us':>10} {'ops/s':>12}\n")
+    for row in report['results']:
+        stream.write(f"{row['library']:<22} {row['keyword']:<34} {row['scale']:>8} "
+                     f"{row['p50_ns'] / 1e3:>10.2f} {row['p99_ns'] / 1e3:>10.2f} {row['ops_per_sec']:>12,.0f}\n")
+    for row in report['skipped']:
+        stream.write(f"{row['library']:<22} {row['keyword']:<34} {row['scale']:>8}   skipped: {row['reason']}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-keyword micro-benchmarks for the Robot libraries")
+    parser.add_argument('--libraries', nargs='+', choices=sorted(LIBRARIES), default=sorted(LIBRARIES))
+    parser.add_argument('--scales', nargs='+', type=int, default=list(DEFAULT_SCALES))
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Where to write the JSON results")
+    parser.add_argument('--compare', metavar='BASELINE', help="Fail if any keyword regresses against this JSON file")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Largest allowed p50 latency ratio (current / baseline) in compare mode")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.libraries, args.scales, args.iterations, args.seed)
+    with open(args.output, 'w') as handle:
+        json.dump(report, handle, indent=2)
+    print_results(report)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        rows, regressions = compare(report, baseline, args.threshold)
+        print(f"\nComparison against {args.compare} (threshold {args.threshold:.2f}x on p50):")
+        for (library, keyword, scale), before, after, ratio in rows:
+            flag = '  REGRESSION' if (library, keyword, scale) in regressions else ''
+            print(f"  {library:<22} {keyword:<34} {scale:>8} {before / 1e3:>9.2f} -> {after / 1e3:>9.2f} us "
+                  f"({ratio:.2f}x){flag}")
+        if regressions:
+            print(f"\n{len(regressions)} keyword(s) regressed past {args.threshold:.2f}x.")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# benchmark_storage_pool.py - Provision/deprovision churn benchmark for the HC-02 storage pools
+#
+# Usage: python benchmark_storage_pool.py [--tenants 50000] [--pools 16] [--cycles 5]
+
+import argparse
+import random
+import time
+
+from StoragePool import StoragePoolAllocator
+from SystemManager import SystemManager
+
+
+def churn_allocator(tenants, pools, cycles, seed):
+    """Fills the pools to ~90%, then repeatedly releases and re-admits a random half of the fleet."""
+    rng = random.Random(seed)
+    sizes = [rng.randint(1, 100) for _ in range(tenants)]
+    capacity = int(sum(sizes) / 0.9 / pools) + 1
+    allocator = StoragePoolAllocator({f'pool{index}': capacity for index in range(pools)})
+
+    start = time.perf_counter()
+    for tenant, size in enumerate(sizes):
+        allocator.reserve(tenant, size)
+    fill_seconds = time.perf_counter() - start
+
+    operations = 0
+    rejected = 0
+    start = time.perf_counter()
+    for _ in range(cycles):
+        victims = rng.sample(range(tenants), tenants // 2)
+        for tenant in victims:
+            allocator.release(tenant)
+        for tenant in victims:
+            if allocator.reserve(tenant, rng.randint(1, 100)) is None:
+                rejected += 1
+        operations += 2 * len(victims)
+    churn_seconds = time.perf_counter() - start
+    return fill_seconds, churn_seconds, operations, rejected
+
+
+def churn_manager(tenants, cycles, seed):
+    """Same churn through SystemManager.provision_vm / deprovision_tenant."""
+    rng = random.Random(seed)
+    manager = SystemManager(storage_pools={'default': tenants * 60})
+    for tenant in range(tenants):
+        manager.provision_vm(f'T{tenant}', {'cpu': 1, 'mem': 2, 'storage': rng.randint(1, 100)})
+
+    operations = 0
+    start = time.perf_counter()
+    for _ in range(cycles):
+        victims = rng.sample(range(tenants), tenants // 2)
+        for tenant in victims:
+            manager.deprovision_tenant(f'T{tenant}')
+        for tenant in victims:
+            manager.provision_vm(f'T{tenant}', {'cpu': 1, 'mem': 2, 'storage': rng.randint(1, 100)})
+        operations += 2 * len(victims)
+    return time.perf_counter() - start, operations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage pool provision/deprovision churn benchmark")
+    parser.add_argument('--tenants', type=int, default=50000)
+    parser.add_argument('--pools', type=int, default=16)
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    fill, churn, operations, rejected = churn_allocator(args.tenants, args.pools, args.cycles, args.seed)
+    print(f"Allocator: {args.tenants} tenants over {args.pools} pools")
+    print(f"  initial fill : {fill * 1e3:9.1f} ms ({args.tenants / fill:,.0f} reservations/s)")
+    print(f"  churn        : {churn * 1e3:9.1f} ms ({operations / churn:,.0f} ops/s, {rejected} rejected)")
+
+    seconds, operations = churn_manager(args.tenants, args.cycles, args.seed)
+    print("SystemManager: provision_vm/deprovision_tenant churn")
+    print(f"  churn        : {seconds * 1e3:9.1f} ms ({operations / seconds:,.0f} ops/s)")
+
+
+if __name__ == '__main__':
+    main()
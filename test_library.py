@@ -0,0 +1,144 @@
+# test_library.py - Dispatcher for the infrastructure operations used by test_suite.py
+#
+# Three ways to drive it:
+#   In-process:   InfrastructureDispatcher().dispatch("mount_file xyz")
+#   One-shot CLI: python test_library.py mount_file xyz
+#   Persistent:   python test_library.py --serve   (one command per stdin line, one JSON reply per line)
+#
+# Add --state-dir DIR to keep the VM's persistent mounts in DIR/mounts.log across processes.
+
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+
+from MountTable import MountTable
+
+MOUNT_ROOT = '/mnt/data'
+
+# Mount names recorded in the VM's fstab survive restart_vm; everything else is dropped.
+FSTAB = ('xyz',)
+
+USAGE = "usage: test_library.py {create_tenants N | mount_file NAME | unmount_file NAME | restart_vm | check_mount NAME}"
+
+
+class InfrastructureDispatcher:
+    """
+    Long-lived command dispatcher holding the simulated tenant and mount state.
+
+    dispatch() returns a subprocess.CompletedProcess, so callers see the same
+    returncode/stdout/stderr they would get from running the script.
+    """
+
+    def __init__(self, state_dir=None):
+        self.tenants = []
+        # Without a state_dir, the mount log lives in a temporary directory removed with the dispatcher
+        self._temporary = None
+        if state_dir is None:
+            self._temporary = tempfile.TemporaryDirectory(prefix='vm_state_')
+            state_dir = self._temporary.name
+        os.makedirs(state_dir, exist_ok=True)
+        self.mounts = MountTable(os.path.join(state_dir, 'mounts.log'))
+        # command name -> (handler, number of arguments)
+        self._commands = {
+            'create_tenants': (self.create_tenants, 1),
+            'mount_file': (self.mount_file, 1),
+            'unmount_file': (self.unmount_file, 1),
+            'restart_vm': (self.restart_vm, 0),
+            'check_mount': (self.check_mount, 1),
+        }
+
+    # --- Commands: each returns (exit_code, stdout_lines) ---
+
+    def create_tenants(self, num_tenants):
+        try:
+            count = int(num_tenants)
+        except ValueError:
+            return 1, ["ERROR: 'num_tenants' must be an integer."]
+        lines = []
+        for index in range(1, count + 1):
+            tenant_id = f'tenant_{index:03d}'
+            self.tenants.append(tenant_id)
+            lines.append(f"Successfully created tenant {tenant_id}")
+        lines.append("Tenant creation complete.")
+        return 0, lines
+
+    def mount_file(self, name):
+        path = f'{MOUNT_ROOT}/{name}'
+        if not self.mounts.mount(name, path, persistent=name in FSTAB):
+            return 1, [f"MOUNT_FAILED: {path} is already mounted."]
+        return 0, [f"MOUNT_SUCCESS: {path}"]
+
+    def unmount_file(self, name):
+        path = f'{MOUNT_ROOT}/{name}'
+        if not self.mounts.unmount(name):
+            return 1, [f"UNMOUNT_FAILED: {path} is not mounted."]
+        return 0, [f"UNMOUNT_SUCCESS: {path}"]
+
+    def restart_vm(self):
+        self.mounts.restart()
+        return 0, ["RESTART_INITIATED: VM is going down.", "RESTART_COMPLETE: VM is back online."]
+
+    def check_mount(self, name):
+        path = f'{MOUNT_ROOT}/{name}'
+        if name in self.mounts:
+            return 0, [f"MOUNT_EXISTS: {path}"]
+        return 1, [f"MOUNT_NOT_FOUND: {path}"]
+
+    # --- Dispatch ---
+
+    def dispatch(self, command):
+        """Runs one command line and returns a CompletedProcess-style result."""
+        argv = shlex.split(command) if isinstance(command, str) else list(command)
+        if not argv or argv[0] not in self._commands:
+            return subprocess.CompletedProcess(argv, 2, '', USAGE + '\n')
+        handler, arity = self._commands[argv[0]]
+        if len(argv) - 1 != arity:
+            return subprocess.CompletedProcess(argv, 2, '', USAGE + '\n')
+        code, lines = handler(*argv[1:])
+        return subprocess.CompletedProcess(argv, code, ''.join(line + '\n' for line in lines), '')
+
+    def dispatch_batch(self, commands):
+        """Runs several command lines in order and returns one result per command."""
+        return [self.dispatch(command) for command in commands]
+
+
+def serve(dispatcher=None, stdin=None, stdout=None):
+    """
+    Line protocol for a persistent worker process.
+
+    Each input line holds one command, or several separated by ';'. For every
+    command, one JSON object {"returncode", "stdout", "stderr"} is written on its
+    own line, and the output is flushed after each input line.
+    """
+    dispatcher = dispatcher or InfrastructureDispatcher()
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in stdin:
+        commands = [part.strip() for part in line.split(';') if part.strip()]
+        for result in dispatcher.dispatch_batch(commands):
+            stdout.write(json.dumps({'returncode': result.returncode,
+                                     'stdout': result.stdout,
+                                     'stderr': result.stderr}) + '\n')
+        stdout.flush()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    state_dir = None
+    if argv[:1] == ['--state-dir'] and len(argv) > 1:
+        state_dir, argv = argv[1], argv[2:]
+    dispatcher = InfrastructureDispatcher(state_dir)
+    if argv == ['--serve']:
+        serve(dispatcher)
+        return 0
+    result = dispatcher.dispatch(argv)
+    sys.stdout.write(result.stdout)
+    sys.stderr.write(result.stderr)
+    return result.returncode
+
+
+if __name__ == '__main__':
+    sys.exit(main())
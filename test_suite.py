@@ -1,28 +1,28 @@
-import unittest
+import json
+import os
 import subprocess
+import tempfile
+import unittest
 import sys
 
-# Define the path to the dispatcher script
 # NOTE: This assumes 'test_library.py' is in the same directory.
-LIBRARY_SCRIPT = sys.executable + " test_library.py" 
+from test_library import InfrastructureDispatcher, FSTAB
 
 class TestInfrastructureOperations(unittest.TestCase):
     """
     Test suite for infrastructure operations (tenants, mounts, VM restart)
-    by calling the 'test_library.py' script via subprocess.
+    driven through the long-lived dispatcher in 'test_library.py'.
     """
 
+    @classmethod
+    def setUpClass(cls):
+        # One dispatcher for the whole suite: mount state carries over between tests, like the VM's would
+        cls.dispatcher = InfrastructureDispatcher()
+
     def _run_test(self, command, expected_code=0, expected_output=None):
         """Helper to run the command and check return code and output."""
-        full_command = f"{LIBRARY_SCRIPT} {command}"
-        
-        # Use shell=True for convenience, though generally discouraged for user input
-        result = subprocess.run(
-            full_command, 
-            shell=True, 
-            capture_output=True, 
-            text=True
-        )
+        # Same returncode/stdout/stderr as running 'test_library.py <command>', without the process start
+        result = self.dispatcher.dispatch(command)
 
         # Check the exit code
         self.assertEqual(
@@ -84,6 +84,84 @@ class TestInfrastructureOperations(unittest.TestCase):
         # Expect failure (return code 1) for non-persistent files
         self._run_test("check_mount file1", expected_code=1, expected_output="MOUNT_NOT_FOUND: /mnt/data/file1")
 
+    def test_09_restart_with_thousands_of_mounts(self):
+        """Verify a VM with thousands of mounts keeps exactly its fstab mounts across restarts and new processes."""
+        print("\n--- Running Test 9: Restart With Thousands of Mounts ---")
+        with tempfile.TemporaryDirectory() as state_dir:
+            dispatcher = InfrastructureDispatcher(state_dir)
+            for index in range(5000):
+                self.assertEqual(dispatcher.dispatch(f"mount_file scratch{index}").returncode, 0)
+            for name in FSTAB:
+                self.assertEqual(dispatcher.dispatch(f"mount_file {name}").returncode, 0)
+            self.assertEqual(dispatcher.dispatch("restart_vm").returncode, 0)
+            self.assertEqual(dispatcher.dispatch("check_mount scratch42").returncode, 1)
+            self.assertEqual(sorted(dispatcher.mounts), sorted(FSTAB))
+
+            # A new process replays the log: same persistent mounts, nothing else
+            dispatcher.mounts.close()
+            reopened = InfrastructureDispatcher(state_dir)
+            self.assertEqual(sorted(reopened.mounts), sorted(FSTAB))
+            reopened.mounts.close()
+
+    def test_10_mount_log_compaction(self):
+        """Verify the mount log is compacted to the live persistent mounts and survives a torn final record."""
+        print("\n--- Running Test 10: Mount Log Compaction ---")
+        with tempfile.TemporaryDirectory() as state_dir:
+            dispatcher = InfrastructureDispatcher(state_dir)
+            for _ in range(2000):
+                dispatcher.dispatch("mount_file xyz")
+                dispatcher.dispatch("unmount_file xyz")
+            dispatcher.dispatch("mount_file xyz")
+            dispatcher.mounts.close()
+            log_path = os.path.join(state_dir, 'mounts.log')
+            with open(log_path) as handle:
+                self.assertLess(len(handle.readlines()), 1100, "Mount log was never compacted.")
+            with open(log_path, 'a') as handle:
+                handle.write('["-", "xy')
+            reopened = InfrastructureDispatcher(state_dir)
+            self._run_test_on(reopened, "check_mount xyz", "MOUNT_EXISTS: /mnt/data/xyz")
+            reopened.mounts.close()
+
+    def test_11_serve_protocol(self):
+        """Verify '--serve' answers one JSON line per command, batches ';'-separated commands and matches the CLI."""
+        print("\n--- Running Test 11: Persistent --serve Worker ---")
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_library.py')
+        with tempfile.TemporaryDirectory() as state_dir:
+            worker = subprocess.Popen([sys.executable, script, '--state-dir', state_dir, '--serve'],
+                                      stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+            try:
+                def ask(line, replies):
+                    worker.stdin.write(line + '\n')
+                    worker.stdin.flush()
+                    return [json.loads(worker.stdout.readline()) for _ in range(replies)]
+
+                created, = ask("create_tenants 2", 1)
+                self.assertEqual(created, {'returncode': 0, 'stderr': '',
+                                           'stdout': "Successfully created tenant tenant_001\n"
+                                                     "Successfully created tenant tenant_002\n"
+                                                     "Tenant creation complete.\n"})
+                # The worker keeps its state between lines, and answers every command of a batch in order
+                batch = ask("mount_file xyz; mount_file xyz ;check_mount xyz; bogus", 4)
+                self.assertEqual([reply['returncode'] for reply in batch], [0, 1, 0, 2])
+                self.assertEqual(batch[1]['stdout'], "MOUNT_FAILED: /mnt/data/xyz is already mounted.\n")
+                self.assertIn("usage: test_library.py", batch[3]['stderr'])
+                self.assertEqual(ask("   ", 0), [])
+            finally:
+                worker.stdin.close()
+                self.assertEqual(worker.wait(timeout=10), 0)
+                worker.stdout.close()
+
+            # A one-shot run over the same state sees what the worker left behind, with the same output
+            one_shot = subprocess.run([sys.executable, script, '--state-dir', state_dir, 'check_mount', 'xyz'],
+                                      capture_output=True, text=True, timeout=10)
+            self.assertEqual((one_shot.returncode, one_shot.stdout, one_shot.stderr),
+                             (batch[2]['returncode'], batch[2]['stdout'], batch[2]['stderr']))
+
+    def _run_test_on(self, dispatcher, command, expected_output):
+        result = dispatcher.dispatch(command)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertIn(expected_output, result.stdout)
+
 
 if __name__ == '__main__':
     # To use this, you would run: python test_suite.py